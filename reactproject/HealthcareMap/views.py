@@ -16,7 +16,7 @@ from .models import (
     FavoriteClinic,
 )
 from dashboard.models import DbrPatients
-from dashboard.authentication import PatientJWTAuthentication
+from dashboard.authentication import PatientJWTAuthentication, PatientPrincipal
 from .serializers import (
     HospitalLiteSerializer, ClinicLiteSerializer, PharmacyLiteSerializer,
     DepartmentOfTreatmentSerializer,
@@ -161,6 +161,20 @@ class HealthcareSearchView(APIView):
         return Response(results)
 
 
+def get_request_patient(request):
+    """로그인한 환자(request.user)의 DbrPatients (삭제된 환자면 ValidationError)"""
+    user = request.user
+    if isinstance(user, PatientPrincipal):
+        patient = user.patient
+    elif isinstance(user, DbrPatients):
+        patient = user
+    else:
+        patient = None
+    if patient is None:
+        raise ValidationError({'detail': '환자 정보를 찾을 수 없습니다.'})
+    return patient
+
+
 class FavoriteHospitalListCreateView(generics.ListCreateAPIView):
     serializer_class = FavoriteHospitalSerializer
     authentication_classes = [PatientJWTAuthentication]
@@ -179,18 +193,7 @@ class FavoriteHospitalListCreateView(generics.ListCreateAPIView):
             raise ValidationError({'detail': '이미 즐겨찾기에 등록되어 있습니다.'})
 
     def _get_patient(self):
-        user = self.request.user
-        if isinstance(user, DbrPatients):
-            return user
-
-        username = getattr(user, 'username', None)
-        if not username:
-            raise ValidationError({'detail': '환자 정보를 찾을 수 없습니다.'})
-
-        try:
-            return DbrPatients.objects.get(user_id=username)
-        except DbrPatients.DoesNotExist:
-            raise ValidationError({'detail': '환자 정보를 찾을 수 없습니다.'})
+        return get_request_patient(self.request)
 
 
 class FavoriteHospitalDetailView(generics.DestroyAPIView):
@@ -203,18 +206,7 @@ class FavoriteHospitalDetailView(generics.DestroyAPIView):
         return FavoriteHospital.objects.filter(patient=patient)
 
     def _get_patient(self):
-        user = self.request.user
-        if isinstance(user, DbrPatients):
-            return user
-
-        username = getattr(user, 'username', None)
-        if not username:
-            raise ValidationError({'detail': '환자 정보를 찾을 수 없습니다.'})
-
-        try:
-            return DbrPatients.objects.get(user_id=username)
-        except DbrPatients.DoesNotExist:
-            raise ValidationError({'detail': '환자 정보를 찾을 수 없습니다.'})
+        return get_request_patient(self.request)
 
 
 class FavoriteClinicListCreateView(generics.ListCreateAPIView):
@@ -234,6 +226,9 @@ class FavoriteClinicListCreateView(generics.ListCreateAPIView):
         except IntegrityError:
             raise ValidationError({'detail': '이미 즐겨찾기에 등록되어 있습니다.'})
 
+    def _get_patient(self):
+        return get_request_patient(self.request)
+
 
 class FavoriteClinicDetailView(generics.DestroyAPIView):
     serializer_class = FavoriteClinicSerializer
@@ -245,13 +240,4 @@ class FavoriteClinicDetailView(generics.DestroyAPIView):
         return FavoriteClinic.objects.filter(patient=patient)
 
     def _get_patient(self):
-        try:
-            return DbrPatients.objects.get(user_id=self.request.user.username)
-        except DbrPatients.DoesNotExist:
-            raise ValidationError({'detail': '환자 정보를 찾을 수 없습니다.'})
-
-    def _get_patient(self):
-        try:
-            return DbrPatients.objects.get(user_id=self.request.user.username)
-        except DbrPatients.DoesNotExist:
-            raise ValidationError({'detail': '환자 정보를 찾을 수 없습니다.'})
+        return get_request_patient(self.request)
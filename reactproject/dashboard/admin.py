@@ -1,8 +1,9 @@
 from django.contrib import admin
 from .models import (
     DbrPatients, DbrBloodResults, DbrAppointments,
-    DbrBloodTestReferences,
+    DbrBloodTestReferences, DbrRenderJobs,
 )
+from .blood_export import export_response
 
 
 @admin.register(DbrPatients)
@@ -20,6 +21,16 @@ class BloodResultsAdmin(admin.ModelAdmin):
     search_fields = ['patient_id__name']
     readonly_fields = ['created_at']
     date_hierarchy = 'taken_at'
+    actions = ['export_csv', 'export_ndjson']
+
+    # 목록에서 "전체 선택" 하면 조건에 맞는 전체 결과(코호트)를 스트리밍으로 내보냄
+    @admin.action(description="선택한 혈액검사 결과 CSV 내보내기")
+    def export_csv(self, request, queryset):
+        return export_response(queryset, 'csv', 'blood_results', order=('blood_result_id',))
+
+    @admin.action(description="선택한 혈액검사 결과 NDJSON 내보내기")
+    def export_ndjson(self, request, queryset):
+        return export_response(queryset, 'ndjson', 'blood_results', order=('blood_result_id',))
 
 
 @admin.register(DbrAppointments)
@@ -37,3 +48,8 @@ class BloodTestReferencesAdmin(admin.ModelAdmin):
     search_fields = ['name']
 
 
+@admin.register(DbrRenderJobs)
+class RenderJobsAdmin(admin.ModelAdmin):
+    list_display = ['job_id', 'blood_result_id', 'status', 'attempts', 'enqueued_at', 'finished_at', 'render_ms', 'chart_count']
+    list_filter = ['status']
+    readonly_fields = ['enqueued_at', 'started_at', 'finished_at', 'render_ms', 'chart_count', 'error']
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class DashboardConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "dashboard"
+
+    def ready(self):
+        """앱이 준비될 때 signals를 import하여 등록"""
+        import dashboard.signals  # noqa: F401
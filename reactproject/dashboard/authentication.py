@@ -1,25 +1,128 @@
 # dashboard/authentication.py
 
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from dashboard.models import DbrPatients
+from dashboard.principal_cache import get_patient
+
+# 로그인/토큰 재발급 시 토큰에 넣는 환자 정보 (patient_id 는 simplejwt 의 USER_ID_CLAIM)
+PATIENT_CLAIMS = ('user_id', 'name', 'sex')
+
+
+def add_patient_claims(token, patient):
+    """토큰에 PATIENT_CLAIMS 추가 (refresh 토큰에 넣으면 access 토큰에도 복사됨)"""
+    for claim in PATIENT_CLAIMS:
+        token[claim] = getattr(patient, claim)
+    return token
+
+
+# -------------------- 검증된 토큰 캐시 --------------------
+# 앱은 같은 access 토큰을 수명(30분) 동안 계속 보내므로 서명 검증/디코딩 결과를 프로세스 안에 저장
+# - 키는 토큰 원문이 아닌 digest, 값은 (검증된 토큰, exp) → exp 가 지나면 다시 검증(만료로 거절)
+# - 서명 키를 바꾸면 이미 검증된 토큰은 exp 까지 통과하므로 키 교체 시에는 프로세스 재시작
+VERIFIED_TOKEN_CACHE_SIZE = getattr(settings, "VERIFIED_TOKEN_CACHE_SIZE", 4096)
+
+_verified = OrderedDict()  # digest → (검증된 토큰, exp)
+_verified_lock = threading.Lock()
+
+
+def _token_digest(raw_token):
+    if isinstance(raw_token, str):
+        raw_token = raw_token.encode()
+    return hashlib.blake2b(raw_token, digest_size=16).digest()
+
+
+def clear_verified_tokens():
+    with _verified_lock:
+        _verified.clear()
+
+
+class PatientPrincipal:
+    """
+    인증된 환자 (request.user)
+    토큰에 들어 있는 patient_id / user_id / name / sex 만 가지고 있고,
+    그 밖의 속성에 처음 접근할 때 DbrPatients 를 불러옴 (principal_cache)
+    → patient_id 로 필터링만 하는 대부분의 API 는 인증에 DB/캐시 조회가 없음
+
+    name / sex 는 토큰 발급 시점 값이므로 최신 값이 필요하면 .patient 를 쓴다.
+    FK 에 저장할 때도 DbrPatients 인스턴스가 필요하므로 .patient 를 쓴다.
+    """
+    __slots__ = ('patient_id',) + PATIENT_CLAIMS + ('_patient',)
+
+    is_authenticated = True
+    is_anonymous = False
+    is_active = True
+
+    def __init__(self, patient_id, **claims):
+        self.patient_id = patient_id
+        self._patient = None
+        for claim in PATIENT_CLAIMS:
+            # 토큰에 없는 값(이전에 발급된 토큰)은 비워 두면 __getattr__ 에서 불러옴
+            if claims.get(claim) is not None:
+                setattr(self, claim, claims[claim])
+
+    @property
+    def pk(self):
+        return self.patient_id
+
+    @property
+    def patient(self):
+        """DbrPatients 인스턴스 (처음 접근할 때 한 번 불러옴, 없으면 None)"""
+        if self._patient is None:
+            self._patient = get_patient(self.patient_id)
+        return self._patient
+
+    def __getattr__(self, name):
+        # 슬롯에 값이 없거나 슬롯에 없는 속성 → DbrPatients 에서
+        patient = self.patient
+        if patient is None:
+            raise AttributeError(name)
+        return getattr(patient, name)
+
+    def __str__(self):
+        return f"{self.name} ({self.user_id})"
+
 
 class PatientJWTAuthentication(JWTAuthentication):
     """
     DbrPatients 모델 기반으로 동작하는 커스텀 JWT 인증 클래스
     (기본 User 모델이 아닌 환자 전용 JWT 검증용)
+    DB 를 조회하지 않고 토큰의 정보로 PatientPrincipal 을 만듦
+    한 번 검증한 토큰은 exp 까지 서명 검증 없이 사용 (VERIFIED_TOKEN_CACHE_SIZE 개까지, LRU)
     """
-    def get_user(self, validated_token):
-        try:
-            patient_id = validated_token.get("patient_id")
-            print("[DEBUG] patient_id from token:", patient_id)
+    def get_validated_token(self, raw_token):
+        if not VERIFIED_TOKEN_CACHE_SIZE:
+            return super().get_validated_token(raw_token)
+
+        digest = _token_digest(raw_token)
+        with _verified_lock:
+            entry = _verified.get(digest)
+            if entry is not None:
+                if entry[1] > time.time():
+                    _verified.move_to_end(digest)
+                    return entry[0]
+                del _verified[digest]
 
-            user = DbrPatients.objects.get(patient_id=patient_id)
-            print("[DEBUG] Authenticated user:", user)
-            return user
+        # 검증 실패(InvalidToken)는 저장하지 않음
+        validated_token = super().get_validated_token(raw_token)
+        exp = validated_token.get('exp')
+        if exp is not None:
+            with _verified_lock:
+                _verified[digest] = (validated_token, exp)
+                _verified.move_to_end(digest)
+                while len(_verified) > VERIFIED_TOKEN_CACHE_SIZE:
+                    _verified.popitem(last=False)
+        return validated_token
 
-        except DbrPatients.DoesNotExist:
-            print("[DEBUG] DbrPatients.DoesNotExist")
+    def get_user(self, validated_token):
+        patient_id = validated_token.get("patient_id")
+        if not patient_id:
+            print("[DEBUG] patient_id 가 없는 토큰")
             return None
-        except Exception as e:
-            print("[DEBUG] Unexpected error in get_user:", e)
-            return None
\ No newline at end of file
+        return PatientPrincipal(
+            patient_id, **{claim: validated_token.get(claim) for claim in PATIENT_CLAIMS}
+        )
@@ -0,0 +1,99 @@
+# dashboard/blood_export.py
+# 혈액검사 결과 내보내기 (CSV / NDJSON 스트리밍 응답)
+# - serializer/모델 인스턴스 없이 values_list 튜플을 바로 한 줄씩 씀
+# - 기본 키 범위(keyset)로 페이지를 나눠 읽으므로 결과가 몇 건이든 메모리 사용량이 일정하고,
+#   첫 페이지를 읽는 즉시 응답이 시작됨
+#   (MySQL 드라이버는 QuerySet.iterator() 도 결과 전체를 메모리에 받아 두므로 페이지를 직접 나눔)
+
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+
+from .blood_ingest import NUMERIC_FIELDS
+
+EXPORT_FIELDS = (
+    ('blood_result_id', 'patient_id', 'taken_at')
+    + NUMERIC_FIELDS
+    + ('albi', 'albi_grade', 'risk_level', 'created_at')
+)
+EXPORT_PAGE_SIZE = 2000
+# 이만큼의 행을 모아 한 번에 내보냄 (행마다 yield 하면 WSGI 쓰기 호출이 너무 많아짐)
+ROWS_PER_WRITE = 200
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+
+def iter_rows(queryset, order=('taken_at', 'blood_result_id'), page_size=EXPORT_PAGE_SIZE):
+    """
+    queryset → EXPORT_FIELDS 튜플 스트림 (order 순서, order 의 마지막은 기본 키)
+    (a, pk) > (마지막 a, 마지막 pk) 조건으로 다음 페이지를 읽으므로 OFFSET 없이 인덱스를 탐
+    """
+    fields = list(EXPORT_FIELDS)
+    positions = [fields.index(field) for field in order]
+    queryset = queryset.order_by(*order).values_list(*fields)
+
+    last = None
+    while True:
+        page = queryset
+        if last is not None:
+            after = Q()
+            for i in range(len(order)):
+                # (a, b) > (x, y) → a > x OR (a = x AND b > y)
+                condition = Q(**{f"{order[i]}__gt": last[i]})
+                for j in range(i):
+                    condition &= Q(**{order[j]: last[j]})
+                after |= condition
+            page = page.filter(after)
+        rows = list(page[:page_size])
+        yield from rows
+        if len(rows) < page_size:
+            return
+        last = [rows[-1][position] for position in positions]
+
+
+class _Echo:
+    """csv.writer 가 쓴 줄을 그대로 돌려주는 가짜 파일"""
+
+    def write(self, value):
+        return value
+
+
+def csv_chunks(rows):
+    writer = csv.writer(_Echo())
+    # 엑셀에서 한글이 깨지지 않도록 BOM
+    yield '\ufeff' + writer.writerow(EXPORT_FIELDS)
+    buffer = []
+    for row in rows:
+        buffer.append(writer.writerow(row))
+        if len(buffer) >= ROWS_PER_WRITE:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def ndjson_chunks(rows):
+    # Decimal 은 API 응답(DRF DecimalField)과 같이 문자열로
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    buffer = []
+    for row in rows:
+        buffer.append(encoder.encode(dict(zip(EXPORT_FIELDS, row))) + '\n')
+        if len(buffer) >= ROWS_PER_WRITE:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def export_response(queryset, fmt, filename, order=('taken_at', 'blood_result_id')):
+    """혈액검사 결과 queryset → 다운로드용 스트리밍 응답 (fmt: csv / ndjson)"""
+    chunks = csv_chunks if fmt == 'csv' else ndjson_chunks
+    response = StreamingHttpResponse(chunks(iter_rows(queryset, order)), content_type=CONTENT_TYPES[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    response['Cache-Control'] = 'no-store'
+    return response
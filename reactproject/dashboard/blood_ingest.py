@@ -0,0 +1,245 @@
+# dashboard/blood_ingest.py
+# 혈액검사 결과 일괄 등록 (검사기관에서 여러 건을 한 번에 보내는 경우)
+# - JSON 배열 또는 NDJSON(한 줄에 결과 하나) 본문
+# - 행마다 serializer/save() 를 거치지 않고 컬럼 단위로 검증, ALBI 는 NumPy 로 한 번에 계산
+# - 잘못된 행은 인덱스별 오류로 돌려주고 나머지만 bulk_create
+
+import json
+import uuid
+import datetime
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from .models import DbrPatients, DbrBloodResults
+from .clinical_rules import albi_scores, albi_grades, to_array
+from .chart_cache import bump_patient_generation
+from .render_jobs import enqueue_renders
+
+# DecimalField(max_digits=6, decimal_places=2) 검사 수치
+NUMERIC_FIELDS = (
+    'ast', 'alt', 'alp', 'ggt', 'bilirubin', 'albumin', 'inr', 'platelet', 'afp',
+    'r_gtp', 'total_protein', 'pt',
+)
+MAX_VALUE = 10 ** 4  # max_digits 6 - decimal_places 2 → 9999.99 까지
+MAX_ROWS = 10000
+BULK_CHUNK = 1000
+
+
+class InvalidLine:
+    """NDJSON 에서 JSON 으로 읽을 수 없는 줄 (다른 행은 계속 처리)"""
+
+    def __init__(self, message):
+        self.message = message
+
+
+class NDJSONParser(BaseParser):
+    """application/x-ndjson 본문 → 행 목록 (빈 줄은 무시, 잘못된 줄은 InvalidLine)"""
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding') or 'utf-8'
+        rows = []
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(json.loads(line.decode(encoding)))
+            except (UnicodeDecodeError, ValueError) as e:
+                rows.append(InvalidLine(f"JSON 형식 오류: {e}"))
+            if len(rows) > MAX_ROWS:
+                raise ParseError(f"한 번에 최대 {MAX_ROWS}건까지 등록할 수 있습니다.")
+        return rows
+
+
+def _column(rows, field):
+    """행 목록의 한 필드 → float 배열 + 숫자가 아닌 값 마스크 (None/빈 문자열은 NaN, 오류 아님)"""
+    raw = [row.get(field) for row in rows]
+    try:
+        return to_array([None if value == '' else value for value in raw]), np.zeros(len(raw), dtype=bool)
+    except (TypeError, ValueError):
+        pass
+    # 숫자로 바꿀 수 없는 값이 섞인 경우만 원소별로
+    values = np.full(len(raw), np.nan)
+    invalid = np.zeros(len(raw), dtype=bool)
+    for i, value in enumerate(raw):
+        if value is None or value == '':
+            continue
+        try:
+            values[i] = float(value)
+        except (TypeError, ValueError):
+            invalid[i] = True
+    return values, invalid
+
+
+def _parse_date(value):
+    if isinstance(value, str):
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            return None
+    return None
+
+
+def validate_rows(rows, default_patient_id=None, known_patients=None, owner_patient_id=None):
+    """
+    컬럼 단위 검증
+
+    Args:
+        known_patients: 존재하는 patient_id(문자열) 집합 (없으면 DB 에서 조회)
+        owner_patient_id: 주면 모든 행을 이 환자로 등록하고, 다른 patient_id 를 적은 행은 오류 (API)
+
+    Returns:
+        (유효한 행 인덱스 배열, {필드: float 배열}, taken_at 목록, patient_id 목록, {인덱스: {필드: 오류}})
+    """
+    n = len(rows)
+    errors = {}
+
+    def add_errors(mask, field, message):
+        for i in np.flatnonzero(mask):
+            errors.setdefault(int(i), {})[field] = message
+
+    for i, row in enumerate(rows):
+        if isinstance(row, InvalidLine):
+            errors[i] = {'non_field_errors': row.message}
+        elif not isinstance(row, dict):
+            errors[i] = {'non_field_errors': "결과는 JSON 객체여야 합니다."}
+    # 이후 검증은 객체인 행만 (나머지는 빈 행으로 취급)
+    rows = [row if isinstance(row, dict) else {} for row in rows]
+
+    columns = {}
+    for field in NUMERIC_FIELDS:
+        values, invalid = _column(rows, field)
+        add_errors(invalid, field, "숫자가 아닙니다.")
+        with np.errstate(invalid='ignore'):
+            add_errors(~invalid & (np.isinf(values) | (np.abs(values) >= MAX_VALUE)), field,
+                       f"{MAX_VALUE} 미만이어야 합니다.")
+            add_errors(np.abs(np.round(values, 2) - values) > 1e-9, field, "소수점 둘째 자리까지 입력할 수 있습니다.")
+        columns[field] = values
+
+    taken_at = [_parse_date(row.get('taken_at')) for row in rows]
+    add_errors(np.array([date is None for date in taken_at], dtype=bool), 'taken_at',
+               "검사일자(YYYY-MM-DD)가 필요합니다.")
+
+    if owner_patient_id is not None:
+        owner_patient_id = str(owner_patient_id)
+        add_errors(np.array([str(row.get('patient_id') or owner_patient_id) != owner_patient_id for row in rows],
+                            dtype=bool), 'patient_id', "다른 환자의 결과는 등록할 수 없습니다.")
+        default_patient_id = owner_patient_id
+    patient_ids = [
+        owner_patient_id or str(row.get('patient_id') or default_patient_id or '') for row in rows
+    ]
+    if known_patients is None:
+        known_patients = {
+            str(pid) for pid in DbrPatients.objects.filter(
+                patient_id__in=[pid for pid in set(patient_ids) if _is_uuid(pid)]
+            ).values_list('patient_id', flat=True)
+        }
+    add_errors(np.array([pid not in known_patients and 'patient_id' not in errors.get(i, {})
+                         for i, pid in enumerate(patient_ids)], dtype=bool), 'patient_id',
+               "존재하지 않는 환자입니다.")
+
+    # 객체가 아니었던 행은 필드 오류 대신 행 오류만 남김
+    for i, row in enumerate(rows):
+        if not row and 'non_field_errors' in errors.get(i, {}):
+            errors[i] = {'non_field_errors': errors[i]['non_field_errors']}
+
+    valid = np.setdiff1d(np.arange(n), np.fromiter(errors, dtype=np.intp, count=len(errors)))
+    return valid, columns, taken_at, patient_ids, errors
+
+
+def _is_uuid(value):
+    try:
+        uuid.UUID(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _decimal(value):
+    return None if np.isnan(value) else Decimal(f"{value:.2f}")
+
+
+# build_records 가 돌려주는 값 순서 (DbrBloodResults 필드 이름)
+RECORD_FIELDS = ('patient_id', 'taken_at', 'albi', 'albi_grade', 'risk_level') + NUMERIC_FIELDS
+
+
+def build_records(rows, default_patient_id=None, known_patients=None, owner_patient_id=None):
+    """
+    검증 → ALBI 일괄 계산 → 저장할 값 튜플 목록 (RECORD_FIELDS 순서, patient_id 는 문자열)
+    모델 인스턴스를 만들지 않으므로 프로세스 간에 주고받거나 executemany 로 바로 넣을 수 있음
+
+    Returns:
+        (값 튜플 목록, {인덱스: {필드: 오류}})
+    """
+    valid, columns, taken_at, patient_ids, errors = validate_rows(
+        rows, default_patient_id, known_patients, owner_patient_id
+    )
+
+    # ALBI / grade / risk_level (DbrBloodResults.save() 와 같은 식, 계산할 수 없는 행은 None)
+    scores = albi_scores(columns['bilirubin'][valid], columns['albumin'][valid])
+    grades, risk_levels = albi_grades(scores)
+    numeric = [columns[field][valid] for field in NUMERIC_FIELDS]
+
+    records = []
+    for k, i in enumerate(valid):
+        records.append((
+            patient_ids[i],
+            taken_at[i],
+            _decimal(scores[k]),
+            f'Grade {grades[k]}' if grades[k] else None,
+            risk_levels[k],
+            *(_decimal(values[k]) for values in numeric),
+        ))
+    return records, errors
+
+
+def build_results(rows, default_patient_id=None, known_patients=None, owner_patient_id=None):
+    """build_records → 저장하지 않은 DbrBloodResults 목록"""
+    records, errors = build_records(rows, default_patient_id, known_patients, owner_patient_id)
+    objs = [
+        DbrBloodResults(patient_id_id=record[0], **dict(zip(RECORD_FIELDS[1:], record[1:])))
+        for record in records
+    ]
+    return objs, errors
+
+
+def ingest(rows, owner_patient_id):
+    """
+    build_results → bulk_create (한 트랜잭션) → 캐시 무효화, 렌더링 작업 등록
+    모든 행을 owner_patient_id 환자로 등록 (다른 환자를 적은 행은 오류, API 에서 로그인한 환자)
+
+    Returns:
+        {'created': 건수, 'ids': 생성된 blood_result_id 목록, 'errors': [{'index', 'errors'}]}
+    """
+    objs, errors = build_results(rows, owner_patient_id=owner_patient_id)
+    patient_ids = {obj.patient_id_id for obj in objs}
+
+    started = timezone.now()
+    with transaction.atomic():
+        created = DbrBloodResults.objects.bulk_create(objs, batch_size=BULK_CHUNK)
+
+    ids = [obj.blood_result_id for obj in created]
+    if objs and ids[0] is None:
+        # MySQL 은 bulk_create 후 기본 키를 돌려주지 않음 → 방금 만든 행을 다시 조회
+        # (같은 시각에 다른 경로로 들어온 결과가 섞여도 렌더링 작업이 하나 더 생길 뿐)
+        ids = list(DbrBloodResults.objects.filter(
+            patient_id__in=patient_ids, created_at__gte=started,
+        ).values_list('blood_result_id', flat=True))
+
+    # bulk_create 는 시그널이 없으므로 캐시 무효화, 렌더링 작업 등록을 직접
+    for patient_id in patient_ids:
+        bump_patient_generation(patient_id)
+    enqueue_renders(ids)
+
+    print(f"[BULK] {len(objs)}건 등록, {len(errors)}건 오류")
+    return {
+        'created': len(objs),
+        'ids': ids,
+        'errors': [{'index': i, 'errors': errors[i]} for i in sorted(errors)],
+    }
@@ -0,0 +1,188 @@
+# dashboard/chart_cache.py
+# 환자와 무관한 지표 그래프 캐시
+# 키 = (렌더러 버전, 포맷, 지표, 성별, 표시 정밀도로 반올림한 값)
+# 같은 값이면 어느 환자든 같은 이미지이므로 환자/워커 간에 공유된다.
+#
+# 환자별 응답 캐시 (default 캐시: 대시보드 그래프, 시계열)
+# 환자마다 세대(generation) 번호를 두고, 혈액검사 결과/환자 정보가 바뀌면 signals 에서 올린다.
+# 캐시된 값은 계산 당시의 세대 번호와 함께 저장되어 세대가 바뀌면 바로 무효 → TTL 을 길게 가져갈 수 있음
+
+import math
+import time
+import random
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache, caches
+
+from .dashboard_bar import INDICATORS, RENDERER_VERSION, to_numeric_value
+from .render_pool import render_batch
+
+CHART_CACHE_ALIAS = "charts"
+
+# [FIRE] 핵심 지표 우선순위 (중요한 순서대로)
+PRIMARY_INDICATORS = [
+    'afp',         # 1. 종양 표지자
+    'ast',         # 2. 간세포 손상
+    'alt',         # 3. 간세포 손상
+    'albi_grade',  # 4. 간 기능 종합
+]
+
+SECONDARY_INDICATORS = [
+    'ggt',         # 5. 담도/알코올
+    'r_gtp',       # 6. 알코올
+    'bilirubin',   # 7. 황달
+    'albumin',     # 8. 간 합성
+]
+
+
+def quantize(indicator, value):
+    """버블에 표시되는 정밀도로 값 반올림 (이 값으로 렌더링하므로 캐시가 정확히 일치)"""
+    if INDICATORS[indicator].get('discrete'):
+        return int(value)
+    return float(f"{value:.1f}")
+
+
+def chart_key(indicator, value, gender, fmt='png'):
+    return f"chart:v{RENDERER_VERSION}:{fmt}:{indicator}:{gender}:{value}"
+
+
+def chart_etag(indicator, value, gender, fmt='png'):
+    """캐시 키로 만든 strong ETag (이미지 내용이 키로 결정되므로)"""
+    return '"%s"' % hashlib.sha1(chart_key(indicator, value, gender, fmt).encode('utf-8')).hexdigest()
+
+
+def result_chart_jobs(blood_result):
+    """
+    혈액검사 결과 하나에서 대시보드에 표시할 지표 값 추출
+
+    Returns:
+        [(group, indicator, value), ...]  # group: 'primary' / 'secondary', 값이 없는 지표는 제외
+    """
+    jobs = []
+    for group, indicators in (('primary', PRIMARY_INDICATORS), ('secondary', SECONDARY_INDICATORS)):
+        for indicator in indicators:
+            value = getattr(blood_result, indicator, None)
+            if value is None:
+                continue
+            try:
+                value = float(to_numeric_value(indicator, value))
+            except (TypeError, ValueError):
+                print(f"[ERROR] Invalid {indicator} value: {value}")
+                continue
+            jobs.append((group, indicator, value))
+    return jobs
+
+
+def get_charts(jobs, fmt='png'):
+    """
+    여러 지표 그래프를 캐시에서 가져오고, 없는 것만 렌더링해 캐시에 저장
+
+    Args:
+        jobs: [(indicator, value, gender), ...]
+        fmt: 'png' 또는 'svg'
+
+    Returns:
+        jobs 와 같은 순서의 이미지 bytes 리스트 (렌더링 실패 시 None)
+    """
+    chart_cache = caches[CHART_CACHE_ALIAS]
+    jobs = [(indicator, quantize(indicator, value), gender) for indicator, value, gender in jobs]
+    keys = [chart_key(*job, fmt) for job in jobs]
+
+    images = chart_cache.get_many(keys)
+    missing = [i for i, key in enumerate(keys) if key not in images]
+    if missing:
+        rendered = render_batch([jobs[i] for i in missing], fmt)
+        new_images = {keys[i]: image for i, image in zip(missing, rendered) if image is not None}
+        if new_images:
+            chart_cache.set_many(new_images)
+        images.update(new_images)
+
+    return [images.get(key) for key in keys]
+
+
+# -------------------- 환자별 세대 번호 --------------------
+# 세대 번호로 무효화되므로 길게 (7일)
+# 로컬 메모리 캐시면 다른 프로세스가 올린 세대 번호가 보이지 않으므로 짧게 (1분)
+PATIENT_CACHE_TIMEOUT = 60 * 60 * 24 * 7 if getattr(settings, "SHARED_CACHE", False) else 60
+
+
+def _generation_key(patient_id):
+    return f"patient_generation_{patient_id}"
+
+
+def bump_patient_generation(patient_id):
+    """환자의 캐시 무효화 (DbrBloodResults 생성/수정/삭제, 환자 정보 수정 시)"""
+    key = _generation_key(patient_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # 세대 키가 없으면(eviction) 이전 값과 겹치지 않도록 현재 시각으로 시작
+        cache.set(key, time.time_ns(), None)
+
+
+# -------------------- Single-flight 캐시 --------------------
+LEASE_TIMEOUT = 30   # 계산 중 표시(lease) 유지 시간 (계산하던 요청이 죽어도 풀리도록)
+STALE_GRACE = 300    # 만료 후에도 이 시간 동안은 갱신 중에 이전 값 제공
+EARLY_EXPIRY_BETA = 1.0
+
+
+def get_or_compute(key, compute, timeout, patient_id=None, wait=3.0, backend=None):
+    """
+    캐시 조회 + cache stampede 방지
+
+    - 값은 (value, 만료 시각, 계산 시간, 세대 번호) 로 저장하고 캐시 TTL 은 timeout + STALE_GRACE
+    - patient_id 를 주면 환자 세대 번호를 같은 get_many 로 읽어서, 세대가 다른 값은 절대 쓰지 않음
+    - 만료가 가까우면 계산 시간에 비례한 확률로 미리 갱신 (probabilistic early expiry)
+      → 많이 조회되는 키가 한꺼번에 만료되지 않음
+    - 갱신은 cache.add 로 lease 를 얻은 한 요청만 수행
+      나머지는 (같은 세대의) 이전 값이 있으면 그대로 쓰고, 없으면 wait 초까지 결과를 기다림
+    """
+    backend = backend or cache
+    generation_key = _generation_key(patient_id) if patient_id is not None else None
+
+    values = backend.get_many([key, generation_key] if generation_key else [key])
+    generation = None
+    if generation_key:
+        # 세대 번호는 계산 전에 읽어야 계산 중 바뀐 결과가 새 세대로 저장되지 않음
+        generation = values.get(generation_key)
+        if generation is None:
+            backend.add(generation_key, time.time_ns(), None)
+            generation = backend.get(generation_key)
+    lease_key = f"{key}:lease:{generation}"
+
+    entry = values.get(key)
+    if entry is not None and entry[3] != generation:
+        entry = None  # 이전 세대 값은 stale 로도 쓰지 않음 (수정 전 검사 수치)
+
+    now = time.time()
+    if entry is not None:
+        value, expires_at, delta, _ = entry
+        # XFetch: now - delta * beta * log(rand) >= expires_at 이면 갱신
+        if now - delta * EARLY_EXPIRY_BETA * math.log(1.0 - random.random()) < expires_at:
+            return value
+        if not backend.add(lease_key, 1, LEASE_TIMEOUT):
+            return value  # 다른 요청이 갱신 중 → 이전 값 사용
+        owns_lease = True
+    else:
+        owns_lease = backend.add(lease_key, 1, LEASE_TIMEOUT)
+        if not owns_lease:
+            # 다른 요청이 계산 중 → 잠깐 기다렸다가 결과 사용
+            deadline = now + wait
+            while time.time() < deadline:
+                time.sleep(0.05)
+                entry = backend.get(key)
+                if entry is not None and entry[3] == generation:
+                    return entry[0]
+            # lease 는 계산 중인 요청의 것이므로 지우지 않음 (지우면 이후 요청이 모두 동시에 계산)
+            print(f"[WARN] Waited {wait}s for {key}, computing anyway")
+
+    try:
+        start = time.time()
+        value = compute()
+        delta = time.time() - start
+        backend.set(key, (value, time.time() + timeout, delta, generation), timeout + STALE_GRACE)
+        return value
+    finally:
+        if owns_lease:
+            backend.delete(lease_key)
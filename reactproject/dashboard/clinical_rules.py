@@ -0,0 +1,254 @@
+# dashboard/clinical_rules.py
+# 혈액검사 지표 판정 규칙 (지표 × 성별 → 기준값, 단계, 메시지)
+# 규칙 표를 한 번 컴파일해 두고 NumPy searchsorted 로 판정하므로
+# 결과 1건(대시보드)이든 수백만 건(코호트 분석)이든 같은 함수로 한 번에 처리한다.
+
+import numpy as np
+
+# 판정 단계 (코드 = 인덱스, 0 은 정상)
+LEVELS = ('safe', 'warning', 'danger', 'critical')
+LEVEL_CODES = {level: code for code, level in enumerate(LEVELS)}
+SEXES = ('male', 'female')
+
+# cuts: 오름차순 기준값 (성별이 같으면 하나만)
+# bands: 기준값으로 나뉜 구간별 단계 (len(cuts) + 1 개), 값이 기준값과 같으면 위쪽 구간 (x >= cut)
+# messages: 구간별 메시지 ({threshold}: 해당 구간의 성별 기준값)
+RULES = {
+    'afp': {
+        'cuts': [10, 100, 400],
+        'bands': ['safe', 'warning', 'danger', 'critical'],
+        'messages': [
+            None,
+            'AFP가 약간 높습니다 (10 ng/mL 이상). 추적 관찰이 필요합니다.',
+            'AFP가 높습니다 (100 ng/mL 이상). 간암 의심 - 정밀 검사가 필요합니다.',
+            'AFP가 매우 높습니다 (400 ng/mL 이상). 즉시 전문의 상담이 필요합니다.',
+        ],
+    },
+    'ast': {
+        'cuts': {'male': [40, 50], 'female': [32, 50]},
+        'bands': ['safe', 'warning', 'danger'],
+        'messages': [
+            None,
+            'AST가 경계선입니다 ({threshold} U/L 이상). 주의가 필요합니다.',
+            'AST가 높습니다 (50 U/L 이상). 간세포 손상이 의심됩니다.',
+        ],
+    },
+    'alt': {
+        'cuts': {'male': [40, 50], 'female': [35, 50]},
+        'bands': ['safe', 'warning', 'danger'],
+        'messages': [
+            None,
+            'ALT가 경계선입니다 ({threshold} U/L 이상). 주의가 필요합니다.',
+            'ALT가 높습니다 (50 U/L 이상). 간세포 손상이 의심됩니다.',
+        ],
+    },
+    'ggt': {
+        'cuts': {'male': [71, 100], 'female': [42, 100]},
+        'bands': ['safe', 'warning', 'danger'],
+        'messages': [
+            None,
+            'GGT가 약간 높습니다 ({threshold} U/L 이상). 음주량 조절이 필요합니다.',
+            'GGT가 높습니다 (100 U/L 이상). 담도 질환 또는 알코올성 간질환 의심.',
+        ],
+    },
+    'r_gtp': {
+        'cuts': {'male': [63, 77], 'female': [35, 77]},
+        'bands': ['safe', 'warning', 'danger'],
+        'messages': [
+            None,
+            'r-GTP가 약간 높습니다 ({threshold} U/L 이상). 음주량 조절이 필요합니다.',
+            'r-GTP가 높습니다 (77 U/L 이상). 알코올성 간손상 의심.',
+        ],
+    },
+    'bilirubin': {
+        'cuts': [1.2, 2.5],
+        'bands': ['safe', 'warning', 'danger'],
+        'messages': [
+            None,
+            'Bilirubin이 약간 높습니다 (1.2 mg/dL 이상). 추적 관찰이 필요합니다.',
+            'Bilirubin이 높습니다 (2.5 mg/dL 이상). 황달 증상 확인 필요.',
+        ],
+    },
+    # 낮을수록 위험
+    'albumin': {
+        'cuts': [2.0, 2.5, 3.5],
+        'bands': ['critical', 'danger', 'warning', 'safe'],
+        'messages': [
+            'Albumin이 매우 낮습니다 (2.0 g/dL 미만). 즉시 전문의 상담이 필요합니다.',
+            'Albumin이 낮습니다 (2.5 g/dL 미만). 간 기능 저하가 의심됩니다.',
+            'Albumin이 약간 낮습니다 (3.5 g/dL 미만). 영양 상태 개선이 필요합니다.',
+            None,
+        ],
+    },
+    'alp': {
+        'cuts': {'male': [120, 160], 'female': [104, 160]},
+        'bands': ['safe', 'warning', 'danger'],
+        'messages': [
+            None,
+            'ALP가 약간 높습니다 ({threshold} U/L 이상). 추적 관찰이 필요합니다.',
+            'ALP가 높습니다 (160 U/L 이상). 담도 질환 의심.',
+        ],
+    },
+    'pt': {
+        'cuts': [13],
+        'bands': ['safe', 'warning'],
+        'messages': [None, 'PT가 연장되었습니다 (13초 이상). 응고 기능 저하 의심.'],
+    },
+    'platelet': {
+        'cuts': [150],
+        'bands': ['warning', 'safe'],
+        'messages': ['Platelet이 낮습니다 (150×10³/μL 미만). 간경화 또는 비장 비대 의심.', None],
+    },
+}
+
+RULE_FIELDS = list(RULES)
+
+# ALBI score = 0.66 × log10(bilirubin μmol/L) − 0.085 × albumin g/L
+# 저장 단위(bilirubin mg/dL, albumin g/dL)로 환산한 계수 (0003_add_albi_trigger 트리거와 같은 식)
+ALBI_LOG_COEF = 0.66
+BILIRUBIN_UMOL_PER_MG_DL = 17.1
+ALBI_ALBUMIN_COEF = 0.85
+
+# ALBI grade: score <= -2.60 → 1, <= -1.39 → 2, 그 외 3
+ALBI_GRADE_CUTS = np.array([-2.60, -1.39])
+ALBI_RISK_LEVELS = ('safe', 'warning', 'danger')
+
+
+def _compile(rule):
+    """규칙 하나 → (성별 × 기준값) 배열, 구간별 단계 코드, (성별 × 구간) 메시지"""
+    cuts = rule['cuts']
+    if not isinstance(cuts, dict):
+        cuts = {sex: cuts for sex in SEXES}
+    cut_table = np.array([cuts[sex] for sex in SEXES], dtype=float)
+    codes = np.array([LEVEL_CODES[band] for band in rule['bands']], dtype=np.int8)
+
+    messages = []
+    for sex in SEXES:
+        row = []
+        for i, message in enumerate(rule['messages']):
+            # 높을수록 위험한 구간은 아래쪽 기준값, 낮을수록 위험한 구간은 위쪽 기준값이 threshold
+            threshold = cuts[sex][i - 1] if i > 0 else cuts[sex][0]
+            row.append(message.format(threshold=threshold) if message else None)
+        messages.append(row)
+    return cut_table, codes, messages
+
+
+_COMPILED = {field: _compile(rule) for field, rule in RULES.items()}
+
+
+def sex_codes(sexes, n):
+    """성별 문자열(하나 또는 배열) → 0(male)/1(female) 배열 (male 이 아니면 female 기준)"""
+    if isinstance(sexes, str):
+        return np.full(n, 0 if sexes == 'male' else 1, dtype=np.int8)
+    return (np.asarray(sexes) != 'male').astype(np.int8)
+
+
+def to_array(values):
+    """Decimal/None 이 섞인 값 → float 배열 (None 은 NaN)"""
+    if isinstance(values, np.ndarray) and values.dtype.kind == 'f':
+        return values
+    array = np.array(values, dtype=object)
+    array[array == None] = np.nan  # noqa: E711 (원소별 비교)
+    return array.astype(float)
+
+
+def classify(field, values, sexes='male'):
+    """
+    한 지표의 값 배열 판정
+
+    Args:
+        values: 값 배열 (NaN/None = 검사하지 않음)
+        sexes: 'male'/'female' 또는 값마다 성별 배열
+
+    Returns:
+        (단계 코드 배열: LEVELS 인덱스, 값이 없으면 -1,  구간 인덱스 배열: 메시지 조회용)
+    """
+    cut_table, codes, _ = _COMPILED[field]
+    x = to_array(values)
+    sex = sex_codes(sexes, len(x))
+
+    bins = np.zeros(len(x), dtype=np.intp)
+    for s in range(len(SEXES)):
+        mask = sex == s
+        if mask.any():
+            bins[mask] = np.searchsorted(cut_table[s], x[mask], side='right')
+    levels = np.where(np.isnan(x), -1, codes[bins]).astype(np.int8)
+    return levels, bins
+
+
+def classify_many(matrix, sexes='male', fields=RULE_FIELDS):
+    """
+    여러 결과 × 여러 지표 한 번에 판정 (코호트 분석용)
+
+    Args:
+        matrix: (결과 수, len(fields)) 값 배열 (values_list 결과 그대로 가능)
+
+    Returns:
+        {field: (단계 코드 배열, 구간 인덱스 배열)}
+    """
+    matrix = to_array(matrix).reshape(-1, len(fields))
+    return {field: classify(field, matrix[:, i], sexes) for i, field in enumerate(fields)}
+
+
+def message(field, sex, band):
+    return _COMPILED[field][2][0 if sex == 'male' else 1][band]
+
+
+def level_name(code):
+    return LEVELS[code] if code >= 0 else None
+
+
+def warning_status(result, gender='male'):
+    """
+    검사 결과 1건의 지표별 경고 (정상인 지표는 제외)
+
+    Returns:
+        {field: {'level', 'value', 'message'}}
+    """
+    values = [getattr(result, field, None) for field in RULE_FIELDS]
+    judged = classify_many([values], gender)
+
+    warnings = {}
+    for field, value in zip(RULE_FIELDS, values):
+        levels, bins = judged[field]
+        if levels[0] > 0:
+            warnings[field] = {
+                'level': LEVELS[levels[0]],
+                'value': float(value),
+                'message': message(field, gender, bins[0]),
+            }
+    return warnings
+
+
+def status(field, value, gender='male'):
+    """지표 하나의 단계 ('safe'/'warning'/'danger'/'critical', 값이 없거나 0 이면 None)"""
+    if not value:
+        return None
+    levels, _ = classify(field, [value], gender)
+    return level_name(levels[0])
+
+
+def albi_scores(bilirubin, albumin):
+    """
+    bilirubin(mg/dL), albumin(g/dL) 배열 → ALBI score 배열
+    albi 컬럼 정밀도(소수 둘째 자리)로 반올림, 계산할 수 없으면(값 없음, bilirubin <= 0) NaN
+    """
+    bilirubin = to_array(bilirubin)
+    albumin = to_array(albumin)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = (ALBI_LOG_COEF * np.log10(BILIRUBIN_UMOL_PER_MG_DL * bilirubin)
+                  - ALBI_ALBUMIN_COEF * albumin)
+    scores[~(bilirubin > 0) | np.isnan(albumin)] = np.nan
+    return np.round(scores, 2)
+
+
+def albi_grades(scores):
+    """
+    ALBI score 배열 → (grade 1~3 배열, risk_level 배열)
+    값이 없으면 grade 0 / risk_level None
+    """
+    x = to_array(scores)
+    grades = np.searchsorted(ALBI_GRADE_CUTS, x, side='left') + 1
+    grades[np.isnan(x)] = 0
+    risk_levels = np.array((None,) + ALBI_RISK_LEVELS, dtype=object)[grades]
+    return grades, risk_levels
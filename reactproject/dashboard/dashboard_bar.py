@@ -2,13 +2,17 @@
 # Style mimics the sample: rounded gradient bar with soft shadow and a black value bubble with a small pointer.
 # Supports both normal direction (higher = more dangerous) and reverse direction (lower = more dangerous).
 
-import matplotlib
-matplotlib.use('Agg')  # Use non-GUI backend for server-side rendering
+# pyplot 의 전역 상태를 쓰지 않고 Figure + FigureCanvasAgg 로만 렌더링 (스레드 워커에서도 안전)
 
+import threading
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.patches import FancyBboxPatch
 import matplotlib as mpl
+from matplotlib import font_manager
+from PIL import Image, ImageDraw, ImageFont
+from functools import lru_cache
 import io
 import base64
 
@@ -157,201 +161,288 @@ INDICATORS = {
 def lerp(a, b, t):
     return a + (b - a) * t
 
-def gradient_colors(n=600, reverse=False, custom_colors=None):
-    """Return an (n,1,3) RGB gradient: green → yellow → red (left→right).
-    If reverse=True, flip the gradient (red → yellow → green)."""
-    
+def _segment(start_color, end_color, length):
+    """start_color → end_color 선형 보간 (length, 3), 양 끝 포함"""
+    t = np.linspace(0.0, 1.0, length)[:, None]
+    return lerp(np.asarray(start_color), np.asarray(end_color), t)
+
+@lru_cache(maxsize=None)
+def _gradient(n, reverse, custom_colors):
     if custom_colors:
-        # 커스텀 컬러 사용
+        # 커스텀 컬러 사용: 구간을 균등 분할하고 마지막 구간이 나머지를 채움
         num_sections = len(custom_colors) - 1
-        arr = np.zeros((n, 1, 3), dtype=float)
         section_size = n // num_sections
-        
-        for i in range(num_sections):
-            start_idx = i * section_size
-            end_idx = (i + 1) * section_size if i < num_sections - 1 else n
-            start_color = np.array(mpl.colors.to_rgb(custom_colors[i]))
-            end_color = np.array(mpl.colors.to_rgb(custom_colors[i + 1]))
-            
-            for j in range(start_idx, end_idx):
-                t = (j - start_idx) / max(1, end_idx - start_idx - 1)
-                arr[j, 0, :] = lerp(start_color, end_color, t)
-        return arr
-    
-    # 기본: 녹색 → 노랑 → 빨강
-    left  = np.array(mpl.colors.to_rgb("#2ecc71"))
-    mid   = np.array(mpl.colors.to_rgb("#f1c40f"))
-    right = np.array(mpl.colors.to_rgb("#e74c3c"))
-    
-    if reverse:
-        left, right = right, left
-    
-    arr = np.zeros((n, 1, 3), dtype=float)
-    half = n // 2
-    for i in range(half):
-        t = i / max(1, half - 1)
-        arr[i, 0, :] = lerp(left, mid, t)
-    for i in range(half, n):
-        t = (i - half) / max(1, n - half - 1)
-        arr[i, 0, :] = lerp(mid, right, t)
+        rgb = [mpl.colors.to_rgb(c) for c in custom_colors]
+        bounds = [i * section_size for i in range(num_sections)] + [n]
+        segments = [
+            _segment(rgb[i], rgb[i + 1], bounds[i + 1] - bounds[i])
+            for i in range(num_sections)
+        ]
+    else:
+        # 기본: 녹색 → 노랑 → 빨강
+        left  = mpl.colors.to_rgb("#2ecc71")
+        mid   = mpl.colors.to_rgb("#f1c40f")
+        right = mpl.colors.to_rgb("#e74c3c")
+
+        if reverse:
+            left, right = right, left
+
+        half = n // 2
+        segments = [_segment(left, mid, half), _segment(mid, right, n - half)]
+
+    arr = np.concatenate(segments)[:, None, :]
+    arr.setflags(write=False)  # 캐시된 배열이므로 읽기 전용
     return arr
 
-def draw_value_bubble(ax, x, y, text, fontsize=14, color="black"):
-    """값 표시 버블"""
-    w, h = 70, 34
-    bubble = FancyBboxPatch(
-        (x - w/2, y), w, h, 
-        boxstyle="round,pad=0.02,rounding_size=8",
-        ec="none", fc=color, zorder=5
-    )
-    ax.add_patch(bubble)
-    
-    # 삼각형 포인터
-    tri = mpl.patches.Polygon(
-        [[x-6, y], [x+6, y], [x, y-8]], 
-        closed=True, fc=color, ec="none", zorder=5
-    )
-    ax.add_patch(tri)
-    
-    ax.text(
-        x, y + h*0.55, text, 
-        color="white", fontsize=fontsize, fontweight="bold",
-        ha="center", va="center", zorder=6
-    )
+def gradient_colors(n=600, reverse=False, custom_colors=None):
+    """Return an (n,1,3) RGB gradient: green → yellow → red (left→right).
+    If reverse=True, flip the gradient (red → yellow → green).
+    The result is cached per configuration and read-only; copy it before modifying."""
+    return _gradient(n, bool(reverse), tuple(custom_colors) if custom_colors else None)
 
-def generate_risk_bar(indicator, value, gender='male'):
-    """
-    간 검사 지표 그래프 생성
-    
-    Args:
-        indicator: 'afp', 'ast', 'alt', 'albi_grade', 'ggt', 'r_gtp', etc.
-        value: 수치
-        gender: 'male' 또는 'female' (성별 기준 적용)
-    """
-    if indicator not in INDICATORS:
-        raise ValueError(f"Invalid indicator: {indicator}")
-    
+# -------------------- Canvas geometry --------------------
+# 축 좌표(0~800 x 0~250)와 픽셀 좌표 사이 변환에 쓰이는 고정값
+DPI = 150
+FIG_SIZE = (8, 2.5)
+XLIM, YLIM = 800, 250
+PX_PER_UNIT = DPI * FIG_SIZE[0] / XLIM   # 1 data unit = 1.5 px
+
+BAR_X, BAR_Y = 40, 90
+BAR_W, BAR_H = 720, 40
+BUBBLE_W, BUBBLE_H = 70, 34
+BUBBLE_Y = BAR_Y + BAR_H + 25
+BUBBLE_SUPERSAMPLE = 4     # 버블 안티앨리어싱용 슈퍼샘플링 배율
+CROP_PAD = 15              # bbox_inches='tight' 기본 여백(0.1in)과 동일
+
+# 그래프 모양이 바뀌면 올려서 공유 차트 캐시(chart_cache)를 무효화
+RENDERER_VERSION = 1
+
+# 지원하는 출력 포맷 (?format=png|svg)
+IMAGE_MIME_TYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+def to_px(x, y):
+    """축 좌표 → 캔버스 픽셀 좌표 (원점: 좌상단)"""
+    return x * PX_PER_UNIT, (YLIM - y) * PX_PER_UNIT
+
+def bubble_color(t, reverse=False):
+    """위험도에 따라 버블 색상 결정"""
+    if reverse:
+        if t > 0.66:
+            return "#2ecc71"
+        elif t > 0.33:
+            return "#f1c40f"
+        return "#e74c3c"
+    if t < 0.33:
+        return "#2ecc71"  # 녹색
+    elif t < 0.66:
+        return "#f1c40f"  # 노랑
+    return "#e74c3c"      # 빨강
+
+@lru_cache(maxsize=None)
+def _bubble_font(size_px):
+    path = font_manager.findfont(font_manager.FontProperties(weight="bold"))
+    return ImageFont.truetype(path, size_px)
+
+# -------------------- Static background --------------------
+# (indicator, gender) → (RGBA 배경 이미지, crop box)
+_BACKGROUNDS = {}
+_BACKGROUNDS_LOCK = threading.Lock()
+
+def _render_background(indicator, gender):
+    """값과 무관한 정적 요소(제목, 그림자, 그라데이션 바, 라벨)만 한 번 렌더링"""
     config = INDICATORS[indicator]
-    title = config['title']
-    unit = config['unit']
-    vmin = config['vmin']
-    vmax = config['vmax']
-    ranges = config['ranges']
-    labels = config['labels']
-    reverse = config.get('reverse', False)
-    discrete = config.get('discrete', False)
-    
-    # ALBI Grade 특수 처리
-    if indicator == 'albi_grade':
-        # Grade 문자열을 숫자로 변환
-        if isinstance(value, str):
-            if 'Grade 1' in value or value == '1':
-                value = 1
-            elif 'Grade 2' in value or value == '2':
-                value = 2
-            elif 'Grade 3' in value or value == '3':
-                value = 3
-        display_value = config['display_map'].get(int(value), f'Grade {int(value)}')
-    else:
-        display_value = value
-    
-    # Figure
-    fig = plt.figure(figsize=(8, 2.5))
-    ax = plt.axes([0,0,1,1])
-    ax.set_xlim(0, 800)
-    ax.set_ylim(0, 250)
+    vmin, vmax = config['vmin'], config['vmax']
+    radius = BAR_H / 2
+
+    fig = Figure(figsize=FIG_SIZE, dpi=DPI)
+    canvas = FigureCanvasAgg(fig)
+    fig.patch.set_alpha(0)
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_xlim(0, XLIM)
+    ax.set_ylim(0, YLIM)
     ax.axis('off')
-    
+
     # Title (볼드, 크게)
-    ax.text(20, 220, title, fontsize=18, fontweight="bold", va="top")
-    
-    # Bar geometry
-    bar_x, bar_y = 40, 90
-    bar_w, bar_h = 720, 40
-    radius = bar_h / 2
-    
+    ax.text(20, 220, config['title'], fontsize=18, fontweight="bold", va="top")
+
     # Shadow
     shadow = FancyBboxPatch(
-        (bar_x, bar_y-5), bar_w, bar_h, 
+        (BAR_X, BAR_Y-5), BAR_W, BAR_H,
         boxstyle=f"round,pad=0,rounding_size={radius}",
         ec="none", fc="#e6e6e6", zorder=0
     )
     ax.add_patch(shadow)
-    
+
     # White housing
     housing = FancyBboxPatch(
-        (bar_x, bar_y), bar_w, bar_h, 
+        (BAR_X, BAR_Y), BAR_W, BAR_H,
         boxstyle=f"round,pad=0,rounding_size={radius}",
         ec="none", fc="white", zorder=1
     )
     ax.add_patch(housing)
-    
+
     # Gradient
-    custom_colors = config.get('colors')
-    grad = gradient_colors(1000, reverse=reverse, custom_colors=custom_colors)
+    grad = gradient_colors(1000, reverse=config.get('reverse', False), custom_colors=config.get('colors'))
     im = ax.imshow(
-        grad.transpose(1,0,2), 
-        extent=(bar_x, bar_x+bar_w, bar_y, bar_y+bar_h),
+        grad.transpose(1,0,2),
+        extent=(BAR_X, BAR_X+BAR_W, BAR_Y, BAR_Y+BAR_H),
         origin="lower", zorder=2, interpolation="bicubic"
     )
     im.set_clip_path(housing)
-    
+
     # Outline
     outline = FancyBboxPatch(
-        (bar_x, bar_y), bar_w, bar_h, 
+        (BAR_X, BAR_Y), BAR_W, BAR_H,
         boxstyle=f"round,pad=0,rounding_size={radius}",
         ec="#cccccc", fc="none", lw=2, zorder=3
     )
     ax.add_patch(outline)
-    
+
+    # Unit label
+    if config['unit']:
+        ax.text(BAR_X + BAR_W, BAR_Y - 15, config['unit'], fontsize=10, ha="right", va="top", color="#666666")
+
+    # Range labels
+    for (a, b), lab in zip(config['ranges'], config['labels']):
+        ta = (a - vmin) / (vmax - vmin)
+        tb = (b - vmin) / (vmax - vmin)
+        mx = BAR_X + (ta + tb)/2 * BAR_W
+        ax.text(mx, BAR_Y - 15, lab, fontsize=9, ha="center", va="top", color="#555555")
+
+    canvas.draw()
+    pixels = np.asarray(canvas.buffer_rgba()).copy()
+    background = Image.fromarray(pixels, mode="RGBA")
+
+    # crop box = 정적 요소의 bbox ∪ 버블이 이동할 수 있는 전체 영역
+    # (값에 상관없이 같은 크기의 이미지가 나오도록 고정)
+    static_box = background.getchannel("A").getbbox() or (0, 0, 0, 0)
+    sweep_l, sweep_t = to_px(BAR_X - BUBBLE_W/2, BUBBLE_Y + BUBBLE_H)
+    sweep_r, sweep_b = to_px(BAR_X + BAR_W + BUBBLE_W/2, BUBBLE_Y - 8)
+    crop_box = (
+        max(0, int(min(static_box[0], sweep_l)) - CROP_PAD),
+        max(0, int(min(static_box[1], sweep_t)) - CROP_PAD),
+        min(background.width, int(max(static_box[2], sweep_r)) + CROP_PAD),
+        min(background.height, int(max(static_box[3], sweep_b)) + CROP_PAD),
+    )
+    return background, crop_box
+
+def get_background(indicator, gender='male'):
+    key = (indicator, gender)
+    background = _BACKGROUNDS.get(key)
+    if background is None:
+        # 여러 스레드가 동시에 첫 요청을 받아도 한 번만 렌더링
+        with _BACKGROUNDS_LOCK:
+            background = _BACKGROUNDS.get(key)
+            if background is None:
+                background = _BACKGROUNDS[key] = _render_background(indicator, gender)
+    return background
+
+def warm_backgrounds(genders=('male', 'female')):
+    """서버 시작 시 모든 지표의 정적 배경을 미리 렌더링"""
+    for indicator in INDICATORS:
+        for gender in genders:
+            get_background(indicator, gender)
+
+# -------------------- Value bubble --------------------
+def stamp_value_bubble(image, x, y, text, fontsize=14, color="black"):
+    """값 표시 버블을 배경 이미지 위에 직접 합성 (x, y: 축 좌표)"""
+    ss = BUBBLE_SUPERSAMPLE
+    margin = 40  # 버블보다 긴 텍스트("Grade 1" 등)가 잘리지 않도록 여유
+    left, top = to_px(x - BUBBLE_W/2 - margin, y + BUBBLE_H + 2)
+    right, bottom = to_px(x + BUBBLE_W/2 + margin, y - 10)
+    ox, oy = int(left), int(top)
+    size = (int(right) - ox + 1, int(bottom) - oy + 1)
+
+    def p(dx, dy):
+        px, py = to_px(dx, dy)
+        return ((px - ox) * ss, (py - oy) * ss)
+
+    layer = Image.new("RGBA", (size[0]*ss, size[1]*ss), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    (x0, y0), (x1, y1) = p(x - BUBBLE_W/2, y + BUBBLE_H), p(x + BUBBLE_W/2, y)
+    draw.rounded_rectangle([x0, y0, x1, y1], radius=8 * PX_PER_UNIT * ss, fill=color)
+    # 삼각형 포인터
+    draw.polygon([p(x-6, y), p(x+6, y), p(x, y-8)], fill=color)
+    font = _bubble_font(round(fontsize * DPI / 72 * ss))
+    draw.text(p(x, y + BUBBLE_H*0.55), text, font=font, fill="white", anchor="mm")
+    layer = layer.resize(size, Image.BOX)
+
+    # 캔버스 밖으로 나가는 부분은 잘라낸 뒤 합성
+    src_l, src_t = max(0, -ox), max(0, -oy)
+    src_r = min(size[0], image.width - ox)
+    src_b = min(size[1], image.height - oy)
+    image.alpha_composite(layer, dest=(ox + src_l, oy + src_t), source=(src_l, src_t, src_r, src_b))
+
+def to_numeric_value(indicator, value):
+    """ALBI Grade 문자열('Grade 2' 등)을 숫자로 변환, 나머지는 그대로"""
+    if indicator == 'albi_grade' and isinstance(value, str):
+        if 'Grade 1' in value or value == '1':
+            return 1
+        elif 'Grade 2' in value or value == '2':
+            return 2
+        elif 'Grade 3' in value or value == '3':
+            return 3
+    return value
+
+def render_risk_bar(indicator, value, gender='male', fmt='png'):
+    """
+    간 검사 지표 그래프를 bytes로 생성 (fmt: 'png' 또는 'svg')
+    PNG는 미리 렌더링된 정적 배경을 복사한 뒤 값 버블만 합성하고,
+    SVG는 matplotlib 없이 문자열 템플릿으로 만든다.
+    """
+    if indicator not in INDICATORS:
+        raise ValueError(f"Invalid indicator: {indicator}")
+    if fmt not in IMAGE_MIME_TYPES:
+        raise ValueError(f"Invalid image format: {fmt}")
+
+    value = to_numeric_value(indicator, value)
+    if fmt == 'svg':
+        from .dashboard_svg import risk_bar_svg
+        return risk_bar_svg(indicator, value, gender).encode('utf-8')
+
+    config = INDICATORS[indicator]
+    vmin = config['vmin']
+    vmax = config['vmax']
+    reverse = config.get('reverse', False)
+    discrete = config.get('discrete', False)
+
+    background, crop_box = get_background(indicator, gender)
+    image = background.copy()
+
     # Value mapping
     v = max(vmin, min(vmax, value))
     t = (v - vmin) / (vmax - vmin + 1e-9)
-    px = bar_x + t * bar_w
-    
-    # 위험도에 따라 버블 색상 변경
-    if t < 0.33:
-        bubble_color = "#2ecc71"  # 녹색
-    elif t < 0.66:
-        bubble_color = "#f1c40f"  # 노랑
-    else:
-        bubble_color = "#e74c3c"  # 빨강
-    
-    if reverse:
-        if t > 0.66:
-            bubble_color = "#2ecc71"
-        elif t > 0.33:
-            bubble_color = "#f1c40f"
-        else:
-            bubble_color = "#e74c3c"
-    
+    px = BAR_X + t * BAR_W
+
     # Value bubble
     if discrete:
-        bubble_text = display_value
+        bubble_text = config['display_map'].get(int(value), f'Grade {int(value)}')
     else:
-        bubble_text = f"{display_value:.1f}"
-    
-    draw_value_bubble(ax, px, bar_y + bar_h + 25, bubble_text, fontsize=14, color=bubble_color)
-    
-    # Unit label
-    if unit:
-        ax.text(bar_x + bar_w, bar_y - 15, f"{unit}", fontsize=10, ha="right", va="top", color="#666666")
-    
-    # Range labels
-    for (a, b), lab in zip(ranges, labels):
-        ta = (a - vmin) / (vmax - vmin)
-        tb = (b - vmin) / (vmax - vmin)
-        mx = bar_x + (ta + tb)/2 * bar_w
-        ax.text(mx, bar_y - 15, lab, fontsize=9, ha="center", va="top", color="#555555")
-    
-    # Convert to base64
+        bubble_text = f"{value:.1f}"
+
+    stamp_value_bubble(image, px, BUBBLE_Y, bubble_text, fontsize=14, color=bubble_color(t, reverse))
+
     buf = io.BytesIO()
-    plt.savefig(buf, format='png', bbox_inches='tight', dpi=150, transparent=True)
-    buf.seek(0)
-    img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-    plt.close(fig)
-    
-    return img_base64
+    image.crop(crop_box).save(buf, format='PNG')
+    return buf.getvalue()
+
+def generate_risk_bar(indicator, value, gender='male', fmt='png'):
+    """
+    간 검사 지표 그래프 생성 (base64, data URI 용)
+
+    Args:
+        indicator: 'afp', 'ast', 'alt', 'albi_grade', 'ggt', 'r_gtp', etc.
+        value: 수치
+        gender: 'male' 또는 'female' (성별 기준 적용)
+        fmt: 'png' 또는 'svg'
+    """
+    return base64.b64encode(render_risk_bar(indicator, value, gender, fmt)).decode('utf-8')
+
+def to_data_uri(img_base64, fmt='png'):
+    return f"data:{IMAGE_MIME_TYPES[fmt]};base64,{img_base64}"
 #     left  = np.array(mpl.colors.to_rgb("#2ecc71"))  # green
 #     mid   = np.array(mpl.colors.to_rgb("#f1c40f"))  # yellow
 #     right = np.array(mpl.colors.to_rgb("#e74c3c"))  # red
@@ -0,0 +1,231 @@
+# SVG version of the dashboard charts.
+# Built by plain string templating from the INDICATORS config (no matplotlib round-trip),
+# so a chart is a few hundred bytes and takes microseconds to build. The client scales it freely.
+
+import math
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+
+from .dashboard_bar import (
+    INDICATORS, XLIM, YLIM, DPI, PX_PER_UNIT,
+    BAR_X, BAR_Y, BAR_W, BAR_H, BUBBLE_W, BUBBLE_H, BUBBLE_Y,
+    bubble_color,
+)
+
+# matplotlib pt → viewBox 단위 (PNG 버전과 같은 비율이 되도록)
+PT = DPI / 72 / PX_PER_UNIT
+FONT_FAMILY = "DejaVu Sans, Helvetica, Arial, sans-serif"
+DEFAULT_COLORS = ['#2ecc71', '#f1c40f', '#e74c3c']
+
+def _fmt(v):
+    return f"{v:.1f}".rstrip('0').rstrip('.')
+
+def _multiline_text(x, y, text, size, color, anchor="middle"):
+    """'\\n' 으로 구분된 라벨을 tspan 여러 줄로 변환 (y: 첫 줄 상단)"""
+    lines = text.split('\n')
+    tspans = ''.join(
+        f'<tspan x="{_fmt(x)}" dy="{_fmt(size * (0.9 if i == 0 else 1.2))}">{escape(line)}</tspan>'
+        for i, line in enumerate(lines)
+    )
+    return (f'<text y="{_fmt(y)}" font-size="{_fmt(size)}" fill="{color}" '
+            f'text-anchor="{anchor}">{tspans}</text>')
+
+# -------------------- Risk bar --------------------
+def risk_bar_svg(indicator, value, gender='male'):
+    """generate_risk_bar 와 같은 레이아웃의 SVG 문자열 생성"""
+    config = INDICATORS[indicator]
+    vmin, vmax = config['vmin'], config['vmax']
+    reverse = config.get('reverse', False)
+
+    if config.get('discrete'):
+        bubble_text = config['display_map'].get(int(value), f'Grade {int(value)}')
+    else:
+        bubble_text = f"{value:.1f}"
+
+    colors = config.get('colors') or (DEFAULT_COLORS[::-1] if reverse else DEFAULT_COLORS)
+    stops = ''.join(
+        f'<stop offset="{i / (len(colors) - 1):.3f}" stop-color="{c}"/>'
+        for i, c in enumerate(colors)
+    )
+
+    # SVG 는 y 축이 아래로 향하므로 축 좌표를 뒤집어 사용
+    bar_top = YLIM - BAR_Y - BAR_H
+    radius = BAR_H / 2
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {XLIM} {YLIM}" '
+        f'font-family="{FONT_FAMILY}">',
+        f'<defs><linearGradient id="grad-{indicator}">{stops}</linearGradient></defs>',
+        f'<text x="20" y="{_fmt(YLIM - 220 + 18 * PT * 0.9)}" font-size="{_fmt(18 * PT)}" '
+        f'font-weight="bold">{escape(config["title"])}</text>',
+        # Shadow / gradient bar / outline
+        f'<rect x="{BAR_X}" y="{bar_top + 5}" width="{BAR_W}" height="{BAR_H}" rx="{radius}" fill="#e6e6e6"/>',
+        f'<rect x="{BAR_X}" y="{bar_top}" width="{BAR_W}" height="{BAR_H}" rx="{radius}" '
+        f'fill="url(#grad-{indicator})" stroke="#cccccc" stroke-width="{_fmt(2 * PT)}"/>',
+    ]
+
+    # Unit label
+    if config['unit']:
+        parts.append(_multiline_text(BAR_X + BAR_W, YLIM - BAR_Y + 15, config['unit'],
+                                     10 * PT, "#666666", anchor="end"))
+
+    # Range labels
+    for (a, b), lab in zip(config['ranges'], config['labels']):
+        ta = (a - vmin) / (vmax - vmin)
+        tb = (b - vmin) / (vmax - vmin)
+        mx = BAR_X + (ta + tb)/2 * BAR_W
+        parts.append(_multiline_text(mx, YLIM - BAR_Y + 15, lab, 9 * PT, "#555555"))
+
+    # Value bubble
+    v = max(vmin, min(vmax, value))
+    t = (v - vmin) / (vmax - vmin + 1e-9)
+    px = BAR_X + t * BAR_W
+    color = bubble_color(t, reverse)
+    bubble_top = YLIM - BUBBLE_Y - BUBBLE_H
+    base = YLIM - BUBBLE_Y
+    parts += [
+        f'<rect x="{_fmt(px - BUBBLE_W/2)}" y="{bubble_top}" width="{BUBBLE_W}" height="{BUBBLE_H}" '
+        f'rx="8" fill="{color}"/>',
+        f'<polygon points="{_fmt(px - 6)},{base} {_fmt(px + 6)},{base} {_fmt(px)},{base + 8}" fill="{color}"/>',
+        f'<text x="{_fmt(px)}" y="{_fmt(YLIM - BUBBLE_Y - BUBBLE_H*0.55)}" font-size="{_fmt(14 * PT)}" '
+        f'font-weight="bold" fill="white" text-anchor="middle" dominant-baseline="central">'
+        f'{escape(bubble_text)}</text>',
+        '</svg>',
+    ]
+    return ''.join(parts)
+
+# -------------------- Time series --------------------
+TS_WIDTH, TS_HEIGHT = 1000, 400
+TS_LEFT, TS_RIGHT, TS_TOP, TS_BOTTOM = 90, 20, 45, 85
+
+def _nice_ticks(lo, hi, count=5):
+    """lo~hi 구간을 1/2/5 × 10^n 간격으로 나눈 눈금 값"""
+    if hi <= lo:
+        hi = lo + 1
+    raw = (hi - lo) / count
+    mag = 10 ** math.floor(math.log10(raw))
+    step = next(m * mag for m in (1, 2, 5, 10) if m * mag >= raw)
+    first = math.ceil(lo / step) * step
+    ticks = []
+    v = first
+    while v <= hi + step * 1e-9:
+        ticks.append(round(v, 10))
+        v += step
+    return ticks
+
+def _to_ordinal(d):
+    if isinstance(d, datetime):
+        return d.toordinal() + (d.hour * 3600 + d.minute * 60 + d.second) / 86400
+    if isinstance(d, date):
+        return d.toordinal()
+    return date.fromisoformat(str(d)[:10]).toordinal()
+
+def time_series_svg(dates, values, field, title=None, unit=None):
+    """DashboardTimeSeriesView 의 시계열 그래프를 SVG 로 생성"""
+    config = INDICATORS.get(field, {})
+    title = title or config.get('title', field.upper())
+    unit = config.get('unit', '') if unit is None else unit
+    normal_range = config['ranges'][0] if config.get('ranges') else None
+
+    # y 범위: 값 + 정상 범위를 포함하고 위아래 5% 여백
+    lo, hi = min(values), max(values)
+    if normal_range:
+        lo, hi = min(lo, normal_range[0]), max(hi, normal_range[1])
+    span = (hi - lo) or abs(hi) or 1
+    lo, hi = lo - span * 0.05, hi + span * 0.05
+
+    xs = [_to_ordinal(d) for d in dates]
+    x_lo, x_hi = min(xs), max(xs)
+    if x_hi == x_lo:
+        x_lo, x_hi = x_lo - 1, x_hi + 1
+
+    plot_w = TS_WIDTH - TS_LEFT - TS_RIGHT
+    plot_h = TS_HEIGHT - TS_TOP - TS_BOTTOM
+
+    def sx(x):
+        return TS_LEFT + (x - x_lo) / (x_hi - x_lo) * plot_w
+
+    def sy(y):
+        return TS_TOP + (hi - y) / (hi - lo) * plot_h
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {TS_WIDTH} {TS_HEIGHT}" '
+        f'font-family="{FONT_FAMILY}">',
+        f'<text x="{TS_LEFT + plot_w / 2}" y="28" font-size="19" font-weight="bold" '
+        f'text-anchor="middle">{escape(title)} Trend</text>',
+    ]
+
+    # 정상 범위 표시
+    if normal_range:
+        band_top = sy(min(hi, normal_range[1]))
+        band_bottom = sy(max(lo, normal_range[0]))
+        parts.append(
+            f'<rect x="{TS_LEFT}" y="{_fmt(band_top)}" width="{plot_w}" '
+            f'height="{_fmt(band_bottom - band_top)}" fill="green" fill-opacity="0.2"/>'
+        )
+
+    # y 눈금 + 격자
+    for tick in _nice_ticks(lo, hi):
+        y = sy(tick)
+        parts.append(
+            f'<line x1="{TS_LEFT}" y1="{_fmt(y)}" x2="{TS_LEFT + plot_w}" y2="{_fmt(y)}" '
+            f'stroke="#b0b0b0" stroke-opacity="0.3" stroke-dasharray="4 4"/>'
+            f'<text x="{TS_LEFT - 8}" y="{_fmt(y)}" font-size="12" text-anchor="end" '
+            f'dominant-baseline="central">{tick:g}</text>'
+        )
+
+    # x 눈금 (최대 6개 날짜)
+    n = len(dates)
+    step = max(1, math.ceil(n / 6))
+    for i in range(0, n, step):
+        x = sx(xs[i])
+        label = str(dates[i])[:10]
+        parts.append(
+            f'<line x1="{_fmt(x)}" y1="{TS_TOP}" x2="{_fmt(x)}" y2="{TS_TOP + plot_h}" '
+            f'stroke="#b0b0b0" stroke-opacity="0.3" stroke-dasharray="4 4"/>'
+            f'<text x="{_fmt(x)}" y="{TS_TOP + plot_h + 14}" font-size="12" text-anchor="end" '
+            f'transform="rotate(-30 {_fmt(x)} {TS_TOP + plot_h + 14})">{label}</text>'
+        )
+
+    # 축 테두리 + 라벨
+    parts += [
+        f'<rect x="{TS_LEFT}" y="{TS_TOP}" width="{plot_w}" height="{plot_h}" fill="none" stroke="black"/>',
+        f'<text x="{TS_LEFT + plot_w / 2}" y="{TS_HEIGHT - 8}" font-size="16" text-anchor="middle">Date</text>',
+        f'<text x="20" y="{TS_TOP + plot_h / 2}" font-size="16" text-anchor="middle" '
+        f'transform="rotate(-90 20 {TS_TOP + plot_h / 2})">{escape(f"{title} ({unit})")}</text>',
+    ]
+
+    # 선 그래프 + 마커
+    points = ' '.join(f'{_fmt(sx(x))},{_fmt(sy(y))}' for x, y in zip(xs, values))
+    parts.append(f'<polyline points="{points}" fill="none" stroke="#3498db" stroke-width="2.8"/>')
+    parts.extend(
+        f'<circle cx="{_fmt(sx(x))}" cy="{_fmt(sy(y))}" r="4" fill="#3498db"/>'
+        for x, y in zip(xs, values)
+    )
+
+    # 범례
+    if normal_range:
+        lx = TS_LEFT + plot_w - 150
+        parts.append(
+            f'<rect x="{lx}" y="{TS_TOP + 10}" width="140" height="28" fill="white" stroke="#cccccc" rx="4"/>'
+            f'<rect x="{lx + 10}" y="{TS_TOP + 18}" width="24" height="12" fill="green" fill-opacity="0.2"/>'
+            f'<text x="{lx + 42}" y="{TS_TOP + 24}" font-size="13" dominant-baseline="central">Normal Range</text>'
+        )
+
+    parts.append('</svg>')
+    return ''.join(parts)
+
+def time_series_sheet_svg(series):
+    """render_time_series_sheet 의 SVG 버전: 지표별 그래프를 세로로 이어 붙인 SVG 와 패널 영역"""
+    parts = []
+    panels = {}
+    for i, (field, (dates, values)) in enumerate(series.items()):
+        y = i * TS_HEIGHT
+        panel = time_series_svg(dates, values, field)
+        parts.append(panel.replace('<svg ', f'<svg x="0" y="{y}" width="{TS_WIDTH}" height="{TS_HEIGHT}" ', 1))
+        panels[field] = {"x": 0, "y": y, "width": TS_WIDTH, "height": TS_HEIGHT}
+
+    height = TS_HEIGHT * len(panels)
+    svg = (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {TS_WIDTH} {height}" '
+           f'width="{TS_WIDTH}" height="{height}">' + ''.join(parts) + '</svg>')
+    return svg.encode('utf-8'), panels
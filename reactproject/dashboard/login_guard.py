@@ -0,0 +1,139 @@
+# dashboard/login_guard.py
+# 로그인 비밀번호 검증 보호
+# - 해시 검증(PBKDF2)은 크기가 정해진 스레드 풀에서 실행
+#   hashlib 의 PBKDF2 는 GIL 을 놓으므로 스레드끼리 병렬로 계산되고,
+#   대기 중인 검증이 HASH_QUEUE_SIZE 를 넘으면 해시 없이 바로 거절(503) → 로그인 폭주 때 워커가 묶이지 않음
+# - 사용자별/IP별 실패 횟수를 캐시에 기록해 기준을 넘으면 해시 전에 거절(429)
+# - 없는 user_id 도 같은 비용의 해시를 계산해 응답 시간으로 가입 여부를 알 수 없도록
+# - 해시 시간/대기 수는 [LOGIN] 로그와 stats() 로 확인
+
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import cache
+
+HASH_WORKERS = getattr(settings, "LOGIN_HASH_WORKERS", min(4, os.cpu_count() or 1))
+HASH_QUEUE_SIZE = getattr(settings, "LOGIN_HASH_QUEUE_SIZE", 32)  # 실행 중 + 대기 중 검증 최대 수
+HASH_TIMEOUT = getattr(settings, "LOGIN_HASH_TIMEOUT", 10.0)
+
+# 실패 횟수 제한 (FAILURE_WINDOW 초 동안)
+FAILURE_WINDOW = getattr(settings, "LOGIN_FAILURE_WINDOW", 15 * 60)
+MAX_USER_FAILURES = getattr(settings, "LOGIN_MAX_USER_FAILURES", 5)
+MAX_IP_FAILURES = getattr(settings, "LOGIN_MAX_IP_FAILURES", 30)
+
+
+class LoginThrottled(Exception):
+    """실패 횟수 초과 (retry_after: 초)"""
+
+    def __init__(self, retry_after):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+
+class LoginBusy(Exception):
+    """검증 대기열이 가득 참"""
+
+
+# -------------------- 실패 횟수 --------------------
+def _user_key(user_id):
+    return f"login_failures_user_{user_id}"
+
+
+def _ip_key(ip):
+    return f"login_failures_ip_{ip}"
+
+
+def check_throttle(user_id, ip):
+    """해시 전에 호출 — 사용자/IP 실패 횟수가 기준 이상이면 LoginThrottled"""
+    counts = cache.get_many([_user_key(user_id), _ip_key(ip)])
+    if counts.get(_user_key(user_id), 0) >= MAX_USER_FAILURES or counts.get(_ip_key(ip), 0) >= MAX_IP_FAILURES:
+        raise LoginThrottled(FAILURE_WINDOW)
+
+
+def record_failure(user_id, ip):
+    # 첫 실패부터 FAILURE_WINDOW 동안 누적 (고정 구간)
+    for key in (_user_key(user_id), _ip_key(ip)):
+        cache.add(key, 0, FAILURE_WINDOW)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, FAILURE_WINDOW)
+
+
+def record_success(user_id):
+    cache.delete(_user_key(user_id))
+
+
+# -------------------- 해시 검증 풀 --------------------
+_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="login-hash")
+_slots = threading.BoundedSemaphore(HASH_QUEUE_SIZE)
+_dummy_password = None
+
+_stats_lock = threading.Lock()
+_latencies = deque(maxlen=1000)  # 최근 해시 시간 (ms)
+_stats = {'verified': 0, 'rejected_busy': 0, 'in_flight': 0, 'max_in_flight': 0}
+
+
+def _dummy_hash():
+    """없는 사용자용 해시 (현재 기본 hasher/반복 횟수로 한 번만 생성)"""
+    global _dummy_password
+    if _dummy_password is None:
+        _dummy_password = make_password("dummy-password-for-timing")
+    return _dummy_password
+
+
+def _timed_check(password, encoded):
+    start = time.perf_counter()
+    ok = check_password(password, encoded)
+    return ok, (time.perf_counter() - start) * 1000
+
+
+def _finished(future):
+    # 제한 시간이 지나 요청이 먼저 끝나도 해시가 끝날 때까지는 대기열 자리를 차지
+    _slots.release()
+    with _stats_lock:
+        _stats['in_flight'] -= 1
+        if not future.cancelled() and future.exception() is None:
+            _stats['verified'] += 1
+            _latencies.append(future.result()[1])
+
+
+def verify_password(password, encoded):
+    """
+    비밀번호 검증 (encoded 가 None 이면 없는 사용자 → 같은 비용으로 계산하고 False)
+    대기열이 가득 차거나 HASH_TIMEOUT 안에 끝나지 않으면 LoginBusy
+    """
+    if not _slots.acquire(blocking=False):
+        with _stats_lock:
+            _stats['rejected_busy'] += 1
+        raise LoginBusy()
+
+    with _stats_lock:
+        _stats['in_flight'] += 1
+        _stats['max_in_flight'] = max(_stats['max_in_flight'], _stats['in_flight'])
+        queue_depth = _stats['in_flight']
+    future = _executor.submit(_timed_check, password, encoded or _dummy_hash())
+    future.add_done_callback(_finished)
+    try:
+        ok, elapsed_ms = future.result(timeout=HASH_TIMEOUT)
+    except FutureTimeoutError:
+        raise LoginBusy()
+
+    print(f"[LOGIN] hash {elapsed_ms:.1f}ms, queue {queue_depth}/{HASH_QUEUE_SIZE}")
+    return ok and encoded is not None
+
+
+def stats():
+    """해시 검증 지표 (이 프로세스 기준)"""
+    with _stats_lock:
+        latencies = sorted(_latencies)
+        snapshot = dict(_stats)
+    if latencies:
+        snapshot['hash_ms_avg'] = sum(latencies) / len(latencies)
+        snapshot['hash_ms_p95'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return snapshot
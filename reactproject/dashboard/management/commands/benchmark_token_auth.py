@@ -0,0 +1,56 @@
+# dashboard/management/commands/benchmark_token_auth.py
+"""
+PatientJWTAuthentication 인증 비용 측정 (DB 조회 없음)
+
+    python manage.py benchmark_token_auth                  # 기본 20000회
+    python manage.py benchmark_token_auth --iterations 100000
+
+같은 access 토큰으로 authenticate() 를 반복해
+- 서명 검증을 매번 하는 경우 (검증 캐시 비움)
+- 검증된 토큰 캐시를 쓰는 경우
+요청당 시간(µs)을 비교합니다.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from dashboard.authentication import PatientJWTAuthentication, clear_verified_tokens
+
+
+class Command(BaseCommand):
+    help = "JWT 인증(서명 검증 + request.user 생성)의 요청당 시간을 검증 캐시 사용 여부별로 측정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20000, help="반복 횟수 (기본 20000)")
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+
+        token = AccessToken()
+        token["patient_id"] = "00000000-0000-0000-0000-000000000000"
+        token["user_id"], token["name"], token["sex"] = "benchmark", "벤치마크", "male"
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        auth = PatientJWTAuthentication()
+
+        def uncached():
+            clear_verified_tokens()
+            auth.authenticate(request)
+
+        def cached():
+            auth.authenticate(request)
+
+        clear_verified_tokens()
+        cached()  # 캐시 채우기
+        results = {}
+        for label, func in (("서명 검증", uncached), ("검증 캐시", cached)):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                func()
+            results[label] = (time.perf_counter() - start) / iterations * 1e6
+            self.stdout.write(f"{label}: {results[label]:.1f}µs/요청")
+
+        clear_verified_tokens()
+        speedup = results["서명 검증"] / results["검증 캐시"]
+        self.stdout.write(self.style.SUCCESS(f"{iterations}회 반복, 캐시 사용 시 {speedup:.1f}배 빠름"))
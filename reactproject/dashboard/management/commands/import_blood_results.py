@@ -0,0 +1,212 @@
+# dashboard/management/commands/import_blood_results.py
+"""
+과거 혈액검사 결과 파일(CSV / NDJSON) 가져오기
+
+    python manage.py import_blood_results results.csv
+    python manage.py import_blood_results results.ndjson.gz --chunk-size 20000 --workers 4
+    python manage.py import_blood_results results.csv --dry-run      # 검증만
+
+각 행은 user_id(로그인 ID) 또는 patient_id 로 환자를 지정하고, 나머지 열은 API 와 같은 필드 이름
+(taken_at, ast, alt, ..., bilirubin, albumin ...)을 쓴다. albi / albi_grade / risk_level 은 계산해서 넣는다.
+
+파일은 청크 단위로 읽어 바로 저장하므로 파일 크기와 관계없이 메모리 사용량이 일정하다.
+--workers 가 2 이상이면 청크 변환(JSON/숫자 변환, 검증, ALBI 계산)을 여러 프로세스에서 하고
+저장은 이 프로세스에서 청크 순서대로 한다.
+저장은 bulk_create 대신 INSERT 문 하나를 executemany 로 실행한다
+(행 × 필드마다 ORM 값 변환/SQL 조립을 거치지 않음, 프로파일상 bulk_create 가 전체 시간의 3/4).
+청크마다 커밋하므로 중간에 실패하면 출력된 줄 수만큼 --skip 으로 건너뛰고 다시 실행한다.
+
+벤치마크용 파일은 make_synthetic_blood_results 명령으로 만든다 (같은 --seed 면 같은 파일).
+"""
+import csv
+import gzip
+import json
+import time
+import multiprocessing
+from collections import deque
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from dashboard.models import DbrPatients, DbrBloodResults
+from dashboard.blood_ingest import InvalidLine, RECORD_FIELDS, build_records
+from dashboard.chart_cache import bump_patient_generation
+
+MAX_PRINTED_ERRORS = 20
+
+# 변환 프로세스에서 쓰는 환자 조회표 (_init_worker 에서 설정)
+_patients = {}           # user_id → patient_id(문자열)
+_patient_db_values = {}  # patient_id(문자열) → DB 에 넣을 값
+
+
+def _init_worker(patients, patient_db_values):
+    global _patients, _patient_db_values
+    _patients = patients
+    _patient_db_values = patient_db_values
+
+
+def _build_chunk(chunk):
+    """
+    (줄 번호 목록, 레코드 목록) → (INSERT 값 튜플 목록, 환자 목록, {줄 번호: 오류})
+    레코드: CSV 는 dict, NDJSON 은 원본 줄(str)
+    """
+    line_numbers, records = chunk
+    rows = []
+    for record in records:
+        if isinstance(record, str):
+            try:
+                record = json.loads(record)
+            except ValueError as e:
+                rows.append(InvalidLine(f"JSON 형식 오류: {e}"))
+                continue
+        if isinstance(record, dict) and not record.get('patient_id') and 'user_id' in record:
+            record['patient_id'] = _patients.get(str(record.pop('user_id')), '')
+        rows.append(record)
+
+    records, errors = build_records(rows, known_patients=_patient_db_values)
+    values = [(_patient_db_values[record[0]],) + record[1:] for record in records]
+    patient_ids = {record[0] for record in records}
+    return values, patient_ids, {line_numbers[i]: error for i, error in errors.items()}
+
+
+def _open(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8-sig', newline='')
+    return open(path, 'r', encoding='utf-8-sig', newline='')
+
+
+def _records(stream, fmt):
+    """파일 → (줄 번호, 레코드) 스트림"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    else:
+        for line_number, line in enumerate(stream, 1):
+            line = line.strip()
+            if line:
+                yield line_number, line
+
+
+def _insert_sql():
+    """RECORD_FIELDS + created_at 순서의 INSERT 문"""
+    qn = connection.ops.quote_name
+    columns = [DbrBloodResults._meta.get_field(field).column for field in RECORD_FIELDS] + ['created_at']
+    return "INSERT INTO %s (%s) VALUES (%s)" % (
+        qn(DbrBloodResults._meta.db_table),
+        ", ".join(qn(column) for column in columns),
+        ", ".join(["%s"] * len(columns)),
+    )
+
+
+def _chunks(records, size):
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield [line_number for line_number, _ in chunk], [record for _, record in chunk]
+
+
+def _bounded_imap(pool, func, iterable, window):
+    """
+    순서를 유지하는 pool.imap (Pool.imap 은 입력을 끝까지 미리 읽어 버리므로
+    처리 중인 청크를 window 개로 제한해 메모리 사용량을 일정하게 유지)
+    """
+    pending = deque()
+    for item in iterable:
+        pending.append(pool.apply_async(func, (item,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+class Command(BaseCommand):
+    help = "혈액검사 결과 CSV / NDJSON 파일을 청크 단위로 읽어 일괄 등록합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="가져올 파일 (.csv / .ndjson / .jsonl, .gz 가능)")
+        parser.add_argument("--format", choices=["csv", "ndjson"], default=None, help="파일 형식 (기본: 확장자로 판단)")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="한 번에 변환/저장할 행 수 (기본 5000)")
+        parser.add_argument("--workers", type=int, default=1, help="변환 프로세스 수 (기본 1 = 이 프로세스에서)")
+        parser.add_argument("--skip", type=int, default=0, help="앞에서부터 건너뛸 행 수 (이어서 가져오기)")
+        parser.add_argument("--dry-run", action="store_true", help="저장하지 않고 변환/검증만")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or self._guess_format(path)
+        chunk_size = options["chunk_size"]
+        workers = options["workers"]
+        dry_run = options["dry_run"]
+
+        # user_id → patient_id 조회표 (한 번만 읽음)
+        patients = {}
+        patient_db_values = {}
+        patient_field = DbrPatients._meta.pk
+        for user_id, patient_id in DbrPatients.objects.values_list("user_id", "patient_id"):
+            patients[user_id] = str(patient_id)
+            patient_db_values[str(patient_id)] = patient_field.get_db_prep_value(patient_id, connection)
+        self.stdout.write(f"{path} ({fmt}) 가져오기: 환자 {len(patients)}명, 청크 {chunk_size}, 변환 프로세스 {workers}")
+
+        pool = None
+        if workers > 1:
+            if "fork" not in multiprocessing.get_all_start_methods():
+                raise CommandError("--workers 는 fork 를 지원하는 환경에서만 사용할 수 있습니다.")
+            pool = multiprocessing.get_context("fork").Pool(workers, initializer=_init_worker,
+                                                             initargs=(patients, patient_db_values))
+        else:
+            _init_worker(patients, patient_db_values)
+        insert_sql = _insert_sql()
+
+        started = time.perf_counter()
+        read = created = failed = 0
+        touched = set()
+        try:
+            with _open(path) as stream:
+                chunks = _chunks(islice(_records(stream, fmt), options["skip"], None), chunk_size)
+                results = _bounded_imap(pool, _build_chunk, chunks, workers * 2) if pool else map(_build_chunk, chunks)
+
+                for values, patient_ids, errors in results:
+                    if not dry_run and values:
+                        created_at = connection.ops.adapt_datetimefield_value(timezone.now())
+                        with transaction.atomic(), connection.cursor() as cursor:
+                            cursor.executemany(insert_sql, [row + (created_at,) for row in values])
+                        touched.update(patient_ids)
+
+                    for line_number, error in sorted(errors.items()):
+                        if failed < MAX_PRINTED_ERRORS:
+                            self.stderr.write(f"  {line_number}번째 줄: {error}")
+                        failed += 1
+                    read += len(values) + len(errors)
+                    created += len(values)
+
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(f"  {read}행 처리 ({read / elapsed:,.0f} rows/s), 등록 {created}, 오류 {failed}")
+        except KeyboardInterrupt:
+            self.stderr.write(f"중단됨: --skip {options['skip'] + read} 로 이어서 가져올 수 있습니다.")
+        finally:
+            if pool:
+                pool.terminate()
+            # INSERT 문으로 넣었으므로 시그널이 없음 → 대시보드 캐시 무효화를 직접
+            # (과거 결과이므로 렌더링 작업은 등록하지 않음, 그래프는 다음 조회 때 렌더링)
+            for patient_id in touched:
+                bump_patient_generation(patient_id)
+
+        elapsed = time.perf_counter() - started
+        if failed > MAX_PRINTED_ERRORS:
+            self.stderr.write(f"  ... 오류 {failed - MAX_PRINTED_ERRORS}건 더")
+        self.stdout.write(self.style.SUCCESS(
+            f"{'검증' if dry_run else '등록'} 완료: 정상 {created}행, 오류 {failed}행 "
+            f"({elapsed:.1f}s, {read / elapsed if elapsed else 0:,.0f} rows/s)"
+        ))
+
+    def _guess_format(self, path):
+        name = path[:-3] if path.endswith('.gz') else path
+        if name.endswith('.csv'):
+            return 'csv'
+        if name.endswith(('.ndjson', '.jsonl')):
+            return 'ndjson'
+        raise CommandError("파일 형식을 알 수 없습니다. --format csv|ndjson 을 지정하세요.")
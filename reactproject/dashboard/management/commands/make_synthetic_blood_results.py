@@ -0,0 +1,95 @@
+# dashboard/management/commands/make_synthetic_blood_results.py
+"""
+import_blood_results 벤치마크용 합성 혈액검사 결과 파일 생성 (같은 --seed 면 같은 파일)
+
+    python manage.py make_synthetic_blood_results /tmp/synthetic.csv --rows 1000000 --create-patients
+    python manage.py import_blood_results /tmp/synthetic.csv --workers 4
+
+환자는 synthetic_0000 ~ 형식의 user_id 로 지정한다. --create-patients 로 DB 에 없으면 만든다.
+--error-rate 비율만큼 일부러 잘못된 값(숫자 아님, 날짜 형식 오류)을 섞어 오류 처리 경로도 함께 측정한다.
+"""
+import csv
+import gzip
+import json
+import random
+import datetime
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.models import DbrPatients
+
+# (필드, 평균, 표준편차) — 간질환 환자군 정도의 분포, 음수는 잘라냄
+FIELD_DISTRIBUTIONS = (
+    ('ast', 45, 25), ('alt', 45, 30), ('alp', 110, 40), ('ggt', 70, 50),
+    ('bilirubin', 1.2, 0.8), ('albumin', 3.8, 0.5), ('inr', 1.1, 0.2), ('platelet', 190, 60),
+    ('afp', 15, 40), ('r_gtp', 60, 45), ('total_protein', 7.0, 0.6), ('pt', 12.5, 1.2),
+)
+FIELDS = ['user_id', 'taken_at'] + [field for field, _, _ in FIELD_DISTRIBUTIONS]
+START_DATE = datetime.date(2015, 1, 1)
+
+
+def synthetic_rows(rows, patients, seed, error_rate):
+    rng = random.Random(seed)
+    for _ in range(rows):
+        row = {
+            'user_id': f"synthetic_{rng.randrange(patients):04d}",
+            'taken_at': (START_DATE + datetime.timedelta(days=rng.randrange(3650))).isoformat(),
+        }
+        for field, mean, sd in FIELD_DISTRIBUTIONS:
+            row[field] = round(max(rng.gauss(mean, sd), 0.01), 2)
+        if rng.random() < error_rate:
+            if rng.random() < 0.5:
+                row['ast'] = 'N/A'
+            else:
+                row['taken_at'] = row['taken_at'].replace('-', '/')
+        yield row
+
+
+class Command(BaseCommand):
+    help = "import_blood_results 벤치마크용 합성 혈액검사 결과 파일(CSV / NDJSON)을 만듭니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="만들 파일 (.csv / .ndjson / .jsonl, .gz 가능)")
+        parser.add_argument("--rows", type=int, default=100000, help="행 수 (기본 100000)")
+        parser.add_argument("--patients", type=int, default=100, help="환자 수 (기본 100)")
+        parser.add_argument("--seed", type=int, default=42, help="난수 시드 (기본 42)")
+        parser.add_argument("--error-rate", type=float, default=0.001, help="잘못된 행 비율 (기본 0.001)")
+        parser.add_argument("--create-patients", action="store_true", help="synthetic_* 환자가 없으면 만들기")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        name = path[:-3] if path.endswith('.gz') else path
+        if name.endswith('.csv'):
+            fmt = 'csv'
+        elif name.endswith(('.ndjson', '.jsonl')):
+            fmt = 'ndjson'
+        else:
+            raise CommandError("확장자는 .csv / .ndjson / .jsonl 이어야 합니다.")
+
+        if options["create_patients"]:
+            self._create_patients(options["patients"])
+
+        rows = synthetic_rows(options["rows"], options["patients"], options["seed"], options["error_rate"])
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'wt', encoding='utf-8', newline='') as stream:
+            if fmt == 'csv':
+                writer = csv.DictWriter(stream, fieldnames=FIELDS)
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                for row in rows:
+                    stream.write(json.dumps(row) + '\n')
+
+        self.stdout.write(self.style.SUCCESS(f"{path}: {options['rows']}행 생성 (seed {options['seed']})"))
+
+    def _create_patients(self, count):
+        user_ids = [f"synthetic_{i:04d}" for i in range(count)]
+        existing = set(DbrPatients.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+        password = make_password(None)  # 로그인 불가
+        DbrPatients.objects.bulk_create([
+            DbrPatients(user_id=user_id, password=password, name=f"합성환자 {user_id[-4:]}",
+                        birth_date=datetime.date(1960 + i % 40, 1, 1), sex='male' if i % 2 else 'female')
+            for i, user_id in enumerate(user_ids) if user_id not in existing
+        ])
+        self.stdout.write(f"환자 {count - len(existing)}명 생성")
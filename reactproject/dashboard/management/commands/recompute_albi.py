@@ -0,0 +1,129 @@
+# dashboard/management/commands/recompute_albi.py
+"""
+모든 혈액검사 결과의 albi / albi_grade / risk_level 재계산
+
+    python manage.py recompute_albi                   # 처음부터
+    python manage.py recompute_albi --resume          # 마지막 체크포인트 이후부터
+    python manage.py recompute_albi --start-id 500000 --chunk-size 20000
+
+행마다 save() 를 호출하지 않고, 기본 키 구간별로 집합 UPDATE 두 번(albi → grade)을 실행한다.
+식과 기준값은 clinical_rules 와 같으므로 DbrBloodResults.save(), MySQL 트리거와 결과가 일치한다.
+"""
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Case, ExpressionWrapper, F, FloatField, Max, Value, When
+from django.db.models.functions import Log, Round
+
+from dashboard.models import DbrBloodResults
+from dashboard.chart_cache import bump_patient_generation
+from dashboard.clinical_rules import (
+    ALBI_LOG_COEF, BILIRUBIN_UMOL_PER_MG_DL, ALBI_ALBUMIN_COEF, ALBI_GRADE_CUTS, ALBI_RISK_LEVELS,
+)
+
+DEFAULT_CHECKPOINT = Path(settings.BASE_DIR) / ".cache" / "recompute_albi.checkpoint"
+
+
+def albi_expression():
+    """clinical_rules.albi_scores 와 같은 식의 SQL 표현식 (소수 둘째 자리 반올림)"""
+    bilirubin_umol = ExpressionWrapper(
+        Value(BILIRUBIN_UMOL_PER_MG_DL) * F('bilirubin'), output_field=FloatField()
+    )
+    score = ExpressionWrapper(
+        Value(ALBI_LOG_COEF) * Log(Value(10.0), bilirubin_umol) - Value(ALBI_ALBUMIN_COEF) * F('albumin'),
+        output_field=FloatField(),
+    )
+    return Round(score, 2)
+
+
+def grade_expressions():
+    """albi 컬럼 → (albi_grade, risk_level) CASE 표현식"""
+    grade_whens = [
+        When(albi__lte=float(cut), then=Value(f'Grade {i + 1}'))
+        for i, cut in enumerate(ALBI_GRADE_CUTS)
+    ]
+    risk_whens = [
+        When(albi__lte=float(cut), then=Value(ALBI_RISK_LEVELS[i]))
+        for i, cut in enumerate(ALBI_GRADE_CUTS)
+    ]
+    return (
+        Case(*grade_whens, default=Value(f'Grade {len(ALBI_GRADE_CUTS) + 1}')),
+        Case(*risk_whens, default=Value(ALBI_RISK_LEVELS[-1])),
+    )
+
+
+class Command(BaseCommand):
+    help = "모든 혈액검사 결과의 ALBI score / grade / risk_level 을 기본 키 구간 단위 집합 UPDATE 로 재계산합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=10000, help="한 번에 처리할 기본 키 구간 크기 (기본 10000)")
+        parser.add_argument("--start-id", type=int, default=None, help="이 blood_result_id 다음부터 처리")
+        parser.add_argument("--resume", action="store_true", help="체크포인트 파일의 위치부터 이어서 처리")
+        parser.add_argument("--checkpoint", default=str(DEFAULT_CHECKPOINT), help="체크포인트 파일 경로")
+
+    def handle(self, *args, **options):
+        checkpoint = Path(options["checkpoint"])
+        chunk_size = options["chunk_size"]
+
+        start_id = options["start_id"]
+        if start_id is None:
+            start_id = self._read_checkpoint(checkpoint) if options["resume"] else 0
+
+        max_id = DbrBloodResults.objects.aggregate(max_id=Max("blood_result_id"))["max_id"] or 0
+        if start_id >= max_id:
+            self.stdout.write(self.style.SUCCESS("처리할 행이 없습니다."))
+            return
+
+        albi = albi_expression()
+        albi_grade, risk_level = grade_expressions()
+        self.stdout.write(f"blood_result_id {start_id + 1} ~ {max_id} 재계산 (구간 {chunk_size})")
+
+        started = time.perf_counter()
+        updated_total = 0
+        lo = start_id
+        try:
+            while lo < max_id:
+                hi = min(lo + chunk_size, max_id)
+                chunk_started = time.perf_counter()
+
+                with transaction.atomic():
+                    rows = DbrBloodResults.objects.filter(blood_result_id__gt=lo, blood_result_id__lte=hi)
+                    computable = rows.filter(bilirubin__gt=0, albumin__isnull=False)
+                    # albi 를 먼저 갱신한 뒤 저장된 값(반올림 후)으로 grade 판정 → save() 와 같은 결과
+                    updated = computable.update(albi=albi)
+                    computable.update(albi_grade=albi_grade, risk_level=risk_level)
+                    patient_ids = set(rows.values_list("patient_id", flat=True).distinct())
+
+                # 집합 UPDATE 는 시그널이 없으므로 캐시 무효화를 직접
+                for patient_id in patient_ids:
+                    bump_patient_generation(patient_id)
+                self._write_checkpoint(checkpoint, hi)
+
+                updated_total += updated
+                elapsed = time.perf_counter() - chunk_started
+                self.stdout.write(
+                    f"  ~{hi}: {updated}행 ({updated / elapsed if elapsed else 0:,.0f} rows/s), "
+                    f"진행 {(hi - start_id) / (max_id - start_id):.1%}"
+                )
+                lo = hi
+        except KeyboardInterrupt:
+            self.stderr.write(f"중단됨: --resume 또는 --start-id {lo} 로 이어서 실행할 수 있습니다.")
+            return
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{updated_total}행 재계산 완료 ({elapsed:.1f}s, {updated_total / elapsed if elapsed else 0:,.0f} rows/s)"
+        ))
+
+    def _read_checkpoint(self, path):
+        try:
+            return int(path.read_text().strip())
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _write_checkpoint(self, path, last_id):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(str(last_id))
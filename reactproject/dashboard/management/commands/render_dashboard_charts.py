@@ -0,0 +1,66 @@
+# dashboard/management/commands/render_dashboard_charts.py
+"""
+대시보드 그래프 미리 렌더링 워커
+
+    python manage.py render_dashboard_charts            # 계속 실행 (작업이 없으면 --sleep 초 대기)
+    python manage.py render_dashboard_charts --once     # 대기 중인 작업만 처리하고 종료
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Max
+
+from dashboard.dashboard_bar import IMAGE_MIME_TYPES
+from dashboard.models import DbrRenderJobs
+from dashboard.render_jobs import claim_jobs, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = "혈액검사 결과 저장 시 등록된 그래프 렌더링 작업을 처리해 그래프 캐시를 미리 채웁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="대기 중인 작업을 모두 처리하면 종료")
+        parser.add_argument("--batch", type=int, default=20, help="한 번에 가져올 작업 수 (기본 20)")
+        parser.add_argument("--sleep", type=float, default=2.0, help="작업이 없을 때 대기 시간(초, 기본 2)")
+        parser.add_argument(
+            "--formats", default="png",
+            help=f"미리 렌더링할 이미지 포맷 (쉼표 구분, {'/'.join(IMAGE_MIME_TYPES)}, 기본 png)",
+        )
+
+    def handle(self, *args, **options):
+        formats = tuple(fmt.strip() for fmt in options["formats"].split(",") if fmt.strip())
+        for fmt in formats:
+            if fmt not in IMAGE_MIME_TYPES:
+                self.stderr.write(self.style.ERROR(f"지원하지 않는 포맷: {fmt}"))
+                return
+
+        processed = 0
+        try:
+            while True:
+                requeue_stale_jobs()
+                jobs = claim_jobs(options["batch"])
+                for job in jobs:
+                    run_job(job, formats)
+                processed += len(jobs)
+
+                if not jobs:
+                    if options["once"]:
+                        break
+                    time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"{processed}개 작업 처리"))
+        self._print_stats()
+
+    def _print_stats(self):
+        """상태별 작업 수와 렌더링 시간 요약"""
+        stats = (
+            DbrRenderJobs.objects.values("status")
+            .annotate(count=Count("job_id"), avg_ms=Avg("render_ms"), max_ms=Max("render_ms"))
+            .order_by("status")
+        )
+        for row in stats:
+            avg_ms = f"{row['avg_ms']:.1f}" if row["avg_ms"] is not None else "-"
+            max_ms = f"{row['max_ms']:.1f}" if row["max_ms"] is not None else "-"
+            self.stdout.write(f"  {row['status']:<8} {row['count']:>6}개  평균 {avg_ms}ms  최대 {max_ms}ms")
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0008_rename_patient_dbrappointments_patient_id_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="dbrbloodresults",
+            index=models.Index(
+                fields=["patient_id", "taken_at"], name="dbr_blood_patient_taken_idx"
+            ),
+        ),
+    ]
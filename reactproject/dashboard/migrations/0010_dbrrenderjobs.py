@@ -0,0 +1,79 @@
+# Generated by Django 5.2.8 on 2026-10-17 03:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0009_dbrbloodresults_patient_taken_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DbrRenderJobs",
+            fields=[
+                ("job_id", models.AutoField(primary_key=True, serialize=False)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "대기"),
+                            ("running", "처리 중"),
+                            ("done", "완료"),
+                            ("failed", "실패"),
+                        ],
+                        default="pending",
+                        max_length=7,
+                        verbose_name="상태",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, verbose_name="시도 횟수"),
+                ),
+                ("enqueued_at", models.DateTimeField(verbose_name="등록 시각")),
+                (
+                    "started_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="시작 시각"),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="완료 시각"),
+                ),
+                (
+                    "render_ms",
+                    models.FloatField(blank=True, null=True, verbose_name="렌더링 시간(ms)"),
+                ),
+                (
+                    "chart_count",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="렌더링한 그래프 수"
+                    ),
+                ),
+                ("error", models.TextField(blank=True, null=True, verbose_name="오류")),
+                (
+                    "blood_result_id",
+                    models.OneToOneField(
+                        db_column="blood_result_id",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="render_job",
+                        to="dashboard.dbrbloodresults",
+                        verbose_name="혈액검사 결과 ID",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "그래프 렌더링 작업",
+                "verbose_name_plural": "그래프 렌더링 작업 목록",
+                "db_table": "dbr_render_jobs",
+                "managed": True,
+                "indexes": [
+                    models.Index(
+                        fields=["status", "enqueued_at"], name="dbr_render_status_idx"
+                    )
+                ],
+            },
+        ),
+    ]
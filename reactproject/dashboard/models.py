@@ -86,22 +86,20 @@ class DbrBloodResults(models.Model):
         db_table = "dbr_blood_results"
         verbose_name = "혈액검사 결과"
         verbose_name_plural = "혈액검사 결과 목록"
+        indexes = [
+            # 환자별 시계열 조회 (patient_id = ? ORDER BY taken_at)
+            models.Index(fields=['patient_id', 'taken_at'], name='dbr_blood_patient_taken_idx'),
+        ]
 
     def save(self, *args, **kwargs):
-        if self.bilirubin and self.albumin > 0:
-            import math
-            log10_bilirubin = math.log10(float(self.bilirubin))
-            self.albi = (0.66 * log10_bilirubin) - (0.085 * float(self.albumin))
-        
-            if self.albi <= -2.60:
-                self.albi_grade = 'Grade 1'
-                self.risk_level = 'safe'
-            elif self.albi <= -1.39:
-                self.albi_grade = 'Grade 2'
-                self.risk_level = 'warning'
-            else:
-                self.albi_grade = 'Grade 3'
-                self.risk_level = 'danger'
+        if self.bilirubin is not None and self.albumin is not None and self.bilirubin > 0:
+            # ALBI 식/Grade 기준값은 clinical_rules 와 공유 (트리거, recompute_albi 명령과 같은 식)
+            from .clinical_rules import albi_scores, albi_grades
+            scores = albi_scores([self.bilirubin], [self.albumin])
+            grades, risk_levels = albi_grades(scores)
+            self.albi = float(scores[0])
+            self.albi_grade = f'Grade {grades[0]}'
+            self.risk_level = risk_levels[0]
         super().save(*args, **kwargs)
         
     def __str__(self):
@@ -247,6 +245,51 @@ class MedicationLog(models.Model):
     def __str__(self):
         return f"{self.medication.medication_name} - {self.taken_date}"
 
+
+# ----------------------------------------
+# 6. 대시보드 그래프 렌더링 작업 큐 (dbr_render_jobs)
+# ----------------------------------------
+class DbrRenderJobs(models.Model):
+    """
+    혈액검사 결과 저장 시 그래프를 미리 렌더링하기 위한 작업 (DB 테이블 기반 큐)
+    결과당 한 행만 유지하므로 같은 결과가 여러 번 저장돼도 작업은 하나 (render_dashboard_charts 가 처리)
+    """
+    STATUS_CHOICES = [
+        ('pending', '대기'),
+        ('running', '처리 중'),
+        ('done', '완료'),
+        ('failed', '실패'),
+    ]
+
+    job_id = models.AutoField(primary_key=True)
+    blood_result_id = models.OneToOneField(
+        DbrBloodResults,
+        on_delete=models.CASCADE,
+        related_name="render_job",
+        db_column="blood_result_id",
+        verbose_name="혈액검사 결과 ID"
+    )
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default='pending', verbose_name="상태")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="시도 횟수")
+    enqueued_at = models.DateTimeField(verbose_name="등록 시각")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="시작 시각")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="완료 시각")
+    render_ms = models.FloatField(null=True, blank=True, verbose_name="렌더링 시간(ms)")
+    chart_count = models.PositiveSmallIntegerField(default=0, verbose_name="렌더링한 그래프 수")
+    error = models.TextField(blank=True, null=True, verbose_name="오류")
+
+    class Meta:
+        managed = True
+        db_table = "dbr_render_jobs"
+        verbose_name = "그래프 렌더링 작업"
+        verbose_name_plural = "그래프 렌더링 작업 목록"
+        indexes = [
+            models.Index(fields=['status', 'enqueued_at'], name='dbr_render_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.blood_result_id_id} - {self.status}"
+
 # (추가) 6. DUR Drug Info (기존 DB 읽기용)
 # (DDI 검사 시 약물 이름 <-> DrugBank ID 변환용)
 # ----------------------------------------
@@ -0,0 +1,102 @@
+# dashboard/principal_cache.py
+# 인증된 환자(request.user) 캐시 — PatientJWTAuthentication 이 요청마다 DB 를 조회하지 않도록
+# - 프로세스 내 LRU → 공유 캐시(default) → DB 순서로 조회
+# - 캐시 키에 환자의 updated_at(버전)을 넣고, 환자가 저장/삭제되면 signals 에서 버전 키를 바꿈
+#   → 공유 캐시는 즉시, 다른 프로세스의 LRU 는 LOCAL_TTL 이내에 새 정보를 봄
+# - 비밀번호 해시는 캐시에 넣지 않음 (필요하면 접근 시 DB 에서 지연 로딩)
+
+import time
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import DbrPatients
+
+# LRU 항목을 공유 캐시의 버전 확인 없이 쓰는 시간 (초)
+LOCAL_TTL = getattr(settings, "PATIENT_PRINCIPAL_LOCAL_TTL", 5)
+# 로컬 메모리 캐시면 다른 프로세스의 버전 변경이 보이지 않으므로 LOCAL_TTL 만큼만
+PRINCIPAL_TIMEOUT = getattr(
+    settings, "PATIENT_PRINCIPAL_TIMEOUT", 300 if getattr(settings, "SHARED_CACHE", False) else LOCAL_TTL
+)
+LOCAL_MAX_ENTRIES = 1024
+
+PRINCIPAL_FIELDS = tuple(
+    field.attname for field in DbrPatients._meta.concrete_fields if field.attname != 'password'
+)
+
+_local = OrderedDict()  # patient_id → (버전, 필드 값 튜플, 확인 시각)
+_lock = threading.Lock()
+
+
+def _version_key(patient_id):
+    return f"patient_principal_version_{patient_id}"
+
+
+def _principal_key(patient_id, version):
+    return f"patient_principal_{patient_id}_{version}"
+
+
+def _version(updated_at):
+    return updated_at.isoformat()
+
+
+def _remember(patient_id, version, values, checked_at):
+    with _lock:
+        _local[patient_id] = (version, values, checked_at)
+        _local.move_to_end(patient_id)
+        while len(_local) > LOCAL_MAX_ENTRIES:
+            _local.popitem(last=False)
+
+
+def _build(values):
+    # 요청마다 새 인스턴스 (스레드 간에 같은 객체를 공유하지 않도록), password 는 지연 로딩 필드
+    return DbrPatients.from_db(DEFAULT_DB_ALIAS, PRINCIPAL_FIELDS, values)
+
+
+def get_patient(patient_id):
+    """토큰의 patient_id → DbrPatients (없으면 None)"""
+    patient_id = str(patient_id)
+    now = time.monotonic()
+    with _lock:
+        entry = _local.get(patient_id)
+    if entry is not None and now - entry[2] < LOCAL_TTL:
+        return _build(entry[1])
+
+    version = cache.get(_version_key(patient_id))
+    if entry is not None and version == entry[0]:
+        _remember(patient_id, version, entry[1], now)
+        return _build(entry[1])
+
+    values = cache.get(_principal_key(patient_id, version)) if version is not None else None
+    if values is None:
+        values = DbrPatients.objects.filter(patient_id=patient_id).values_list(*PRINCIPAL_FIELDS).first()
+        if values is None:
+            forget_patient(patient_id)
+            return None
+        version = _version(values[PRINCIPAL_FIELDS.index('updated_at')])
+        # 그 사이 저장이 있었다면 signals 가 넣은 새 버전을 덮어쓰지 않도록 add
+        cache.add(_version_key(patient_id), version, PRINCIPAL_TIMEOUT)
+        cache.set(_principal_key(patient_id, version), values, PRINCIPAL_TIMEOUT)
+
+    _remember(patient_id, version, values, now)
+    return _build(values)
+
+
+def forget_patient(patient_id):
+    with _lock:
+        _local.pop(str(patient_id), None)
+
+
+def invalidate_patient(patient):
+    """환자 저장 시 (signals) — 새 updated_at 을 버전으로"""
+    cache.set(_version_key(patient.patient_id), _version(patient.updated_at), PRINCIPAL_TIMEOUT)
+    forget_patient(patient.patient_id)
+
+
+def delete_patient(patient_id):
+    """환자 삭제 시 (signals)"""
+    cache.delete(_version_key(patient_id))
+    forget_patient(patient_id)
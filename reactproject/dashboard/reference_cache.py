@@ -0,0 +1,102 @@
+# dashboard/reference_cache.py
+# 혈액검사 기준(DbrBloodTestReferences) 프로세스 내 스냅샷
+# - 처음 필요할 때 DB 에서 한 번 읽고, 이후에는 메모리에서 제공
+# - 기준이 저장/삭제되면 signals 에서 캐시의 버전 키를 올리고,
+#   각 프로세스는 다음 조회 때 버전이 바뀐 것을 보고 다시 읽음
+# - 로컬 메모리 캐시(SHARED_CACHE=False)면 다른 프로세스의 버전 변경이 보이지 않으므로
+#   스냅샷을 LOCAL_MAX_AGE 초마다 다시 읽음
+
+import re
+import json
+import time
+import hashlib
+import threading
+from types import MappingProxyType
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+VERSION_KEY = "blood_test_references_version"
+LOCAL_MAX_AGE = None if getattr(settings, "SHARED_CACHE", False) else 60
+
+
+class ReferenceSnapshot(NamedTuple):
+    version: int
+    rows: tuple            # 직렬화된 기준 목록 (BloodTestReferenceSerializer 결과, 읽기 전용)
+    by_field: MappingProxyType  # 정규화한 이름 → 행
+    etag: str
+    loaded_at: float       # time.monotonic()
+
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+def normalize_name(name):
+    """'r-GTP', 'R_GTP', 'rgtp' 를 같은 키로 (영숫자만, 소문자)"""
+    return re.sub(r'[^0-9a-z]', '', str(name).lower())
+
+
+def references_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # 처음이거나 eviction → 이전 값과 겹치지 않도록 현재 시각으로 시작
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_references_version():
+    """기준 저장/삭제 시 호출 (모든 프로세스의 스냅샷 무효화)"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def _load(version):
+    from .models import DbrBloodTestReferences
+    from .serializers import BloodTestReferenceSerializer
+
+    queryset = DbrBloodTestReferences.objects.all()
+    rows = tuple(
+        MappingProxyType(dict(row))
+        for row in BloodTestReferenceSerializer(queryset, many=True).data
+    )
+    body = json.dumps([dict(row) for row in rows], cls=DjangoJSONEncoder, ensure_ascii=False)
+    return ReferenceSnapshot(
+        version=version,
+        rows=rows,
+        by_field=MappingProxyType({normalize_name(row['name']): row for row in rows}),
+        etag='"%s"' % hashlib.sha1(body.encode('utf-8')).hexdigest(),
+        loaded_at=time.monotonic(),
+    )
+
+
+def get_references():
+    """현재 기준 스냅샷 (버전이 바뀌었을 때만 DB 조회)"""
+    global _snapshot
+    version = references_version()
+    snapshot = _snapshot
+    if _outdated(snapshot, version):
+        with _lock:
+            snapshot = _snapshot
+            if _outdated(snapshot, version):
+                snapshot = _snapshot = _load(version)
+    return snapshot
+
+
+def _outdated(snapshot, version):
+    if snapshot is None or snapshot.version != version:
+        return True
+    return LOCAL_MAX_AGE is not None and time.monotonic() - snapshot.loaded_at >= LOCAL_MAX_AGE
+
+
+def reference_range(field):
+    """지표의 정상 범위 {'min', 'max'} (기준 테이블에 없으면 None)"""
+    row = get_references().by_field.get(normalize_name(field))
+    if row is None or (row['normal_range_min'] is None and row['normal_range_max'] is None):
+        return None
+    return {'min': row['normal_range_min'], 'max': row['normal_range_max']}
@@ -0,0 +1,136 @@
+# dashboard/render_jobs.py
+# 혈액검사 결과 저장 시 대시보드 그래프 미리 렌더링 (DB 테이블 기반 작업 큐, 별도 브로커 없음)
+# - signals 의 post_save 에서 enqueue_render 로 작업 등록 (결과당 1행 → 중복 제거)
+# - render_dashboard_charts 관리 명령이 작업을 가져가서 공유 그래프 캐시를 채움
+#   → 첫 DashboardGraphsView 요청은 캐시 조회만 하면 됨
+
+import time
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import DbrBloodResults, DbrRenderJobs
+from .chart_cache import get_charts, result_chart_jobs
+
+# 처리 중 상태로 이 시간 이상 남아 있으면 워커가 죽은 것으로 보고 다시 대기 상태로
+STALE_AFTER = timedelta(minutes=10)
+MAX_ATTEMPTS = 3
+
+
+def enqueue_render(blood_result_id):
+    """
+    렌더링 작업 등록
+    이미 작업이 있으면 새로 만들지 않고 대기 상태로 되돌림 (처리 중이던 작업은 완료 처리되지 않고 다시 실행됨)
+    """
+    DbrRenderJobs.objects.update_or_create(
+        blood_result_id_id=blood_result_id,
+        defaults={
+            'status': 'pending',
+            'attempts': 0,
+            'enqueued_at': timezone.now(),
+            'error': None,
+        },
+    )
+
+
+def enqueue_renders(blood_result_ids):
+    """
+    새로 만든 결과 여러 건의 렌더링 작업을 한 번에 등록 (bulk_create 로 저장한 결과용)
+    이미 작업이 있는 결과는 enqueue_render 로 대기 상태로 되돌림
+    """
+    blood_result_ids = list(blood_result_ids)
+    existing = set(
+        DbrRenderJobs.objects.filter(blood_result_id__in=blood_result_ids)
+        .values_list('blood_result_id', flat=True)
+    )
+    now = timezone.now()
+    DbrRenderJobs.objects.bulk_create(
+        [DbrRenderJobs(blood_result_id_id=blood_result_id, status='pending', enqueued_at=now)
+         for blood_result_id in blood_result_ids if blood_result_id not in existing],
+        batch_size=1000,
+    )
+    for blood_result_id in existing:
+        enqueue_render(blood_result_id)
+
+
+def requeue_stale_jobs():
+    """
+    오래된 처리 중 작업을 대기 상태로 (워커 비정상 종료 대비)
+    시도 횟수를 다 쓴 작업은 실패 처리 (처리 중 상태로 계속 남지 않도록)
+
+    Returns:
+        대기 상태로 되돌린 작업 수
+    """
+    now = timezone.now()
+    stale = DbrRenderJobs.objects.filter(status='running', started_at__lt=now - STALE_AFTER)
+    stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status='failed',
+        finished_at=now,
+        error=f"처리 중 {MAX_ATTEMPTS}회 중단되었습니다 (워커 비정상 종료).",
+    )
+    return stale.filter(attempts__lt=MAX_ATTEMPTS).update(status='pending')
+
+
+def claim_jobs(limit=20):
+    """
+    대기 중인 작업을 가져와 처리 중으로 표시
+    조건부 UPDATE 로 가져가므로 워커를 여러 개 띄워도 같은 작업을 두 번 처리하지 않음
+    """
+    claimed = []
+    candidates = DbrRenderJobs.objects.filter(status='pending').order_by('enqueued_at')[:limit]
+    for job in candidates:
+        started_at = timezone.now()
+        updated = DbrRenderJobs.objects.filter(job_id=job.job_id, status='pending').update(
+            status='running', started_at=started_at, attempts=job.attempts + 1,
+        )
+        if updated:
+            job.status, job.started_at, job.attempts = 'running', started_at, job.attempts + 1
+            claimed.append(job)
+    return claimed
+
+
+def run_job(job, formats=('png',)):
+    """
+    작업 하나 처리: 결과의 지표 그래프를 공유 그래프 캐시에 렌더링하고 소요 시간 기록
+
+    Returns:
+        갱신된 작업 상태 ('done' / 'failed' / 'pending')
+    """
+    start = time.perf_counter()
+    chart_count = 0
+    error = None
+    try:
+        blood_result = DbrBloodResults.objects.select_related('patient_id').get(
+            blood_result_id=job.blood_result_id_id
+        )
+        gender = blood_result.patient_id.sex
+        jobs = [(indicator, value, gender) for _, indicator, value in result_chart_jobs(blood_result)]
+        for fmt in formats:
+            images = get_charts(jobs, fmt)
+            chart_count += sum(image is not None for image in images)
+            if any(image is None for image in images):
+                error = f"{images.count(None)}개 그래프 렌더링 실패 ({fmt})"
+    except DbrBloodResults.DoesNotExist:
+        error = "혈액검사 결과가 삭제되었습니다."
+    except Exception as e:
+        error = str(e)
+
+    render_ms = (time.perf_counter() - start) * 1000
+    if error is None:
+        status = 'done'
+    elif job.attempts < MAX_ATTEMPTS:
+        status = 'pending'  # 다음 루프에서 재시도
+    else:
+        status = 'failed'
+
+    # 처리 중에 다시 등록된 작업(status='pending')은 덮어쓰지 않음
+    DbrRenderJobs.objects.filter(job_id=job.job_id, status='running', started_at=job.started_at).update(
+        status=status,
+        finished_at=timezone.now(),
+        render_ms=render_ms,
+        chart_count=chart_count,
+        error=error,
+    )
+    print(f"[RENDER] blood_result={job.blood_result_id_id} {status} "
+          f"{chart_count} charts {render_ms:.1f}ms" + (f" ({error})" if error else ""))
+    return status
@@ -0,0 +1,109 @@
+# dashboard/render_pool.py
+# 대시보드 그래프를 프로세스 풀에서 병렬 렌더링
+# - 워커는 시작 시 matplotlib 을 import 하고 위험도 바 배경을 미리 렌더링 (warm)
+# - 여러 (indicator, value, gender) 작업을 한 번에 제출하고, 작업별 timeout 이 지나면 None 반환
+
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from .dashboard_bar import render_risk_bar, warm_backgrounds
+
+# 워커 수 (0 이면 풀을 쓰지 않고 요청 스레드에서 직접 렌더링)
+RENDER_WORKERS = getattr(settings, "DASHBOARD_RENDER_WORKERS", min(4, os.cpu_count() or 1))
+# 작업별 제한 시간 (초)
+RENDER_TIMEOUT = getattr(settings, "DASHBOARD_RENDER_TIMEOUT", 5.0)
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if RENDER_WORKERS <= 0:
+        return None
+    with _lock:
+        if _executor is None:
+            # spawn: 스레드가 있는 웹 워커에서 fork 하지 않도록
+            _executor = ProcessPoolExecutor(
+                max_workers=RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                # 워커는 dashboard_bar 만 import 하므로 Django 설정이 필요 없음
+                initializer=warm_backgrounds,
+            )
+        return _executor
+
+
+def _reset_executor(broken):
+    global _executor
+    with _lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def warm_pool():
+    """워커 프로세스를 모두 띄워 두어 첫 요청이 기동 비용을 내지 않도록"""
+    executor = get_executor()
+    if executor is None:
+        return
+    futures = [executor.submit(os.getpid) for _ in range(RENDER_WORKERS)]
+    for future in futures:
+        future.result()
+
+
+def render_batch(jobs, fmt='png', timeout=None):
+    """
+    여러 그래프를 동시에 렌더링
+
+    Args:
+        jobs: [(indicator, value, gender), ...]
+        fmt: 'png' 또는 'svg'
+        timeout: 작업별 제한 시간 (초, 기본 RENDER_TIMEOUT)
+
+    Returns:
+        jobs 와 같은 순서의 이미지 bytes 리스트 (실패/시간 초과 시 None)
+    """
+    timeout = RENDER_TIMEOUT if timeout is None else timeout
+    executor = get_executor()
+
+    # SVG 는 수십 μs 짜리 문자열 템플릿이라 프로세스 왕복이 오히려 더 비쌈
+    if executor is None or fmt == 'svg':
+        return [_render_inline(job, fmt) for job in jobs]
+
+    try:
+        deadline = time.monotonic() + timeout
+        futures = [executor.submit(render_risk_bar, *job, fmt) for job in jobs]
+    except BrokenProcessPool:
+        _reset_executor(executor)
+        return [_render_inline(job, fmt) for job in jobs]
+
+    results = []
+    for job, future in zip(jobs, futures):
+        try:
+            results.append(future.result(timeout=max(0, deadline - time.monotonic())))
+        except FutureTimeoutError:
+            future.cancel()
+            print(f"[ERROR] Rendering {job[0]} graph timed out ({timeout}s)")
+            results.append(None)
+        except BrokenProcessPool:
+            _reset_executor(executor)
+            results.append(_render_inline(job, fmt))
+        except Exception as e:
+            print(f"[ERROR] Error generating {job[0]} graph: {e}")
+            results.append(None)
+    return results
+
+
+def _render_inline(job, fmt):
+    indicator = job[0]
+    try:
+        return render_risk_bar(*job, fmt)
+    except Exception as e:
+        print(f"[ERROR] Error generating {indicator} graph: {e}")
+        return None
@@ -1,12 +1,13 @@
 # liverguard/serializers.py
 from rest_framework import serializers
-from django.contrib.auth.hashers import make_password, check_password
+from django.contrib.auth.hashers import make_password
 from django.db.models import Q
 from .models import (
     DbrPatients, DbrBloodResults, DbrAppointments, DbrBloodTestReferences,
     Medication, MedicationLog, DurDrugInfo, DurDdiDrugbank
 )
 from rest_framework_simplejwt.tokens import RefreshToken
+from .login_guard import verify_password
 from .models import DurDrugInfo,DurDrugMapping,DurDdiDrugbank
 
 # Auth serializers
@@ -44,13 +45,12 @@ class DbrPatientLoginSerializer(serializers.Serializer):
         user_id = data.get("user_id")
         password = data.get("password")
 
-        try:
-            user = DbrPatients.objects.get(user_id=user_id)
-        except DbrPatients.DoesNotExist:
-            raise serializers.ValidationError({"user_id": "존재하지 않는 사용자입니다."})
+        user = DbrPatients.objects.filter(user_id=user_id).first()
 
-        if not check_password(password, user.password):
-            raise serializers.ValidationError({"password": "비밀번호가 올바르지 않습니다."})
+        # 해시 검증은 login_guard 의 스레드 풀에서 (없는 사용자도 같은 비용으로 계산, 대기열이 차면 LoginBusy)
+        # 가입 여부를 알 수 없도록 없는 사용자 / 틀린 비밀번호는 같은 오류
+        if not verify_password(password, user.password if user else None):
+            raise serializers.ValidationError("아이디 또는 비밀번호가 올바르지 않습니다.")
 
         # ✅ 검증 통과 시 user 객체만 전달
         data["user"] = user
@@ -200,14 +200,15 @@ class MedicationCreateUpdateSerializer(serializers.ModelSerializer):
             return data # DDI 검사를 건너뛰고 그냥 반환
 
         # 3. 현재 환자가 복용 중인 다른 약물들 조회
-        patient = self.context['request'].user
+        # request.user 는 PatientPrincipal (DbrPatients 인스턴스가 아님) → patient_id 로 필터링
+        patient_id = self.context['request'].user.patient_id
         
         exclude_kwargs = {}
         if self.instance:
             exclude_kwargs['pk'] = self.instance.pk
             
         active_medications = Medication.objects.filter(
-            patient_id=patient, 
+            patient_id=patient_id, 
             is_active=True
         ).exclude(**exclude_kwargs)
 
@@ -0,0 +1,45 @@
+# dashboard/signals.py
+"""
+혈액검사 결과/환자 정보가 바뀌면 환자별 캐시 세대 번호를 올리고(환자는 인증 캐시도), 대시보드 그래프 렌더링 작업 등록
+(QuerySet.update / bulk_create 는 시그널이 발생하지 않으므로 호출하는 쪽에서 직접 처리)
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import DbrPatients, DbrBloodResults, DbrBloodTestReferences
+from .chart_cache import bump_patient_generation
+from .reference_cache import bump_references_version
+from .principal_cache import invalidate_patient, delete_patient
+from .render_jobs import enqueue_render
+
+
+@receiver(post_save, sender=DbrBloodResults)
+@receiver(post_delete, sender=DbrBloodResults)
+def invalidate_patient_cache(sender, instance, **kwargs):
+    bump_patient_generation(instance.patient_id_id)
+
+
+@receiver(post_save, sender=DbrPatients)
+def invalidate_patient_info(sender, instance, **kwargs):
+    # 이름/성별이 응답과 그래프(성별 기준)에 들어가므로
+    bump_patient_generation(instance.patient_id)
+    # 인증 캐시 (PatientDetailView, admin 에서의 수정)
+    invalidate_patient(instance)
+
+
+@receiver(post_delete, sender=DbrPatients)
+def invalidate_deleted_patient(sender, instance, **kwargs):
+    delete_patient(instance.patient_id)
+
+
+@receiver(post_save, sender=DbrBloodResults)
+def enqueue_chart_render(sender, instance, raw=False, **kwargs):
+    # loaddata(raw) 로 들어온 데이터는 제외
+    if not raw:
+        enqueue_render(instance.blood_result_id)
+
+
+@receiver(post_save, sender=DbrBloodTestReferences)
+@receiver(post_delete, sender=DbrBloodTestReferences)
+def invalidate_references(sender, **kwargs):
+    bump_references_version()
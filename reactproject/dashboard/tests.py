@@ -1,3 +1,621 @@
-from django.test import TestCase
+import threading
+import time
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .blood_ingest import InvalidLine, MAX_VALUE, validate_rows
+from .chart_cache import get_or_compute
+from .clinical_rules import albi_grades, classify, level_name, warning_status
+from .dashboard_bar import INDICATORS, render_risk_bar, _BACKGROUNDS
+from .models import DbrBloodResults, DbrPatients, DbrRenderJobs, DurDdiDrugbank, DurDrugMapping, Medication
+from . import render_jobs, token_revocation
+from .time_series_graph import MAX_POINTS, TIME_SERIES_FIELDS, columnar_series, downsample, lttb, render_time_series, render_time_series_sheet
+
+
+class ConcurrentRenderingTests(SimpleTestCase):
+    """
+    여러 스레드에서 동시에 그래프를 렌더링해도 결과가 순차 렌더링과 같은지 확인
+    (gthread / ASGI 스레드 풀에서 워커당 동시 요청 수를 늘리기 위한 stress test)
+    """
+    THREADS = 16
+    ROUNDS = 4
+
+    def _assert_same_as_serial(self, render, jobs):
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            concurrent = list(executor.map(lambda job: render(*job), jobs * self.ROUNDS))
+
+        expected = [render(*job) for job in jobs]
+        for i, image in enumerate(concurrent):
+            self.assertEqual(image, expected[i % len(jobs)], f"job {jobs[i % len(jobs)][:2]} differs")
+
+    def test_risk_bar(self):
+        # 배경 캐시를 비워서 첫 렌더링(배경 생성)도 동시에 일어나도록
+        _BACKGROUNDS.clear()
+        jobs = []
+        for indicator, config in INDICATORS.items():
+            for gender in ('male', 'female'):
+                jobs.append((indicator, config['vmin'], gender))
+                jobs.append((indicator, (config['vmin'] + config['vmax']) / 2, gender))
+        self._assert_same_as_serial(render_risk_bar, jobs)
+
+    def test_time_series(self):
+        dates = [date(2024, 1, 1) + timedelta(days=30 * i) for i in range(12)]
+        jobs = [
+            (dates, [float(10 + i * k) for i in range(12)], field)
+            for k, field in enumerate(['afp', 'ast', 'alt', 'albumin'], start=1)
+        ]
+        self._assert_same_as_serial(render_time_series, jobs)
+
+    def test_time_series_sheet(self):
+        dates = [date(2024, 1, 1) + timedelta(days=30 * i) for i in range(6)]
+        jobs = [
+            ({'ast': (dates, [30.0 + i for i in range(6)]), 'alt': (dates, [25.0 + k * i for i in range(6)])},)
+            for k in range(1, 4)
+        ]
+        self._assert_same_as_serial(lambda series: render_time_series_sheet(series)[0], jobs)
+
+
+def make_patient(user_id, sex='male'):
+    return DbrPatients.objects.create(
+        user_id=user_id, password=make_password('pw1234!!'), name=user_id,
+        birth_date=date(1970, 1, 1), sex=sex,
+    )
+
+
+def client_for(patient):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(patient).access_token}")
+    return client
+
+
+class MedicationInteractionTests(TestCase):
+    """약물 등록/수정 시 DDI 검사가 MedicationViewSet 을 거쳐 실제로 수행되는지"""
+    # DUR 테이블은 managed=False 라 테스트 DB 에 직접 만든다
+    UNMANAGED = (DurDrugMapping, DurDdiDrugbank)
+
+    @classmethod
+    def setUpClass(cls):
+        with connection.schema_editor() as editor:
+            for model in cls.UNMANAGED:
+                editor.create_model(model)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            for model in cls.UNMANAGED:
+                editor.delete_model(model)
+
+    @classmethod
+    def setUpTestData(cls):
+        DurDrugMapping.objects.create(KoreanName='와파린', EnglishName='warfarin', DrugBank_ID='DB00682')
+        DurDrugMapping.objects.create(KoreanName='아스피린', EnglishName='aspirin', DrugBank_ID='DB00945')
+        DurDrugMapping.objects.create(KoreanName='아세트아미노펜', EnglishName='acetaminophen', DrugBank_ID='DB00316')
+        DurDdiDrugbank.objects.create(drug1_id='DB00682', drug2_id='DB00945', interaction_type=1)
+
+        cls.patient = make_patient('ddi_patient')
+        cls.warfarin = Medication.objects.create(
+            patient_id=cls.patient, medication_name='와파린', dosage='5mg',
+            frequency='1일 1회', timing='저녁', start_date=date(2024, 1, 1),
+        )
+        # 다른 환자의 약은 검사 대상이 아님
+        other = make_patient('ddi_other')
+        Medication.objects.create(
+            patient_id=other, medication_name='아세트아미노펜', dosage='500mg',
+            frequency='1일 3회', timing='식후', start_date=date(2024, 1, 1),
+        )
+
+    def _payload(self, name, **extra):
+        return {
+            'medication_name': name, 'dosage': '100mg', 'frequency': '1일 1회',
+            'timing': '아침', 'start_date': '2024-02-01', **extra,
+        }
+
+    def test_create_conflict_rejected(self):
+        response = client_for(self.patient).post('/api/dashboard/medications/', self._payload('아스피린'), format='json')
+        self.assertEqual(response.status_code, 400, response.data)
+        self.assertEqual(response.data['status'][0], 'DDI_CONFLICT')
+        self.assertEqual(response.data['conflict_with'][0], '와파린')
+
+    def test_create_without_conflict(self):
+        response = client_for(self.patient).post('/api/dashboard/medications/', self._payload('아세트아미노펜'), format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertTrue(Medication.objects.filter(patient_id=self.patient, medication_name='아세트아미노펜').exists())
+
+    def test_override(self):
+        response = client_for(self.patient).post(
+            '/api/dashboard/medications/', self._payload('아스피린', override_ddi_check=True), format='json'
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+
+    def test_update(self):
+        client = client_for(self.patient)
+        # 수정하는 약 자신과는 비교하지 않음
+        response = client.patch(
+            f'/api/dashboard/medications/{self.warfarin.pk}/', {'medication_name': '와파린', 'dosage': '2mg'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+
+        other = Medication.objects.create(
+            patient_id=self.patient, medication_name='아세트아미노펜', dosage='500mg',
+            frequency='1일 3회', timing='식후', start_date=date(2024, 1, 1),
+        )
+        response = client.patch(f'/api/dashboard/medications/{other.pk}/', {'medication_name': '아스피린'}, format='json')
+        self.assertEqual(response.status_code, 400, response.data)
+        self.assertEqual(response.data['status'][0], 'DDI_CONFLICT')
+
+    def test_deleted_patient(self):
+        # 삭제된 환자의 토큰은 만료 전까지 인증되지만 저장은 404 (IntegrityError 500 이 아님)
+        patient = make_patient('ddi_deleted')
+        client = client_for(patient)
+        patient.delete()
+        response = client.post('/api/dashboard/medications/', self._payload('아세트아미노펜'), format='json')
+        self.assertEqual(response.status_code, 404, response.data)
+
+
+class SingleFlightTests(SimpleTestCase):
+    """get_or_compute: 동시에 같은 키를 요청해도 계산은 lease 를 얻은 한 요청만"""
+    THREADS = 8
+
+    def setUp(self):
+        self.backend = LocMemCache(f"single-flight-{self.id()}", {})
+        self.calls = 0
+        self.calls_lock = threading.Lock()
+
+    def _slow_compute(self, seconds, value):
+        def compute():
+            with self.calls_lock:
+                self.calls += 1
+            time.sleep(seconds)
+            return value
+        return compute
+
+    def test_concurrent_callers_compute_once(self):
+        compute = self._slow_compute(0.5, 'value')
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            results = list(executor.map(
+                lambda _: get_or_compute('k', compute, 60, wait=5.0, backend=self.backend), range(self.THREADS)
+            ))
+        self.assertEqual(results, ['value'] * self.THREADS)
+        self.assertEqual(self.calls, 1)
+
+    def test_waiter_timeout_keeps_owner_lease(self):
+        # 기다리다 포기하고 직접 계산한 요청이 계산 중인 요청의 lease 를 지우면 안 됨
+        started = threading.Event()
+
+        def owner_compute():
+            started.set()
+            time.sleep(1.0)
+            return 'owner'
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            owner = executor.submit(get_or_compute, 'k', owner_compute, 60, backend=self.backend)
+            started.wait(5)
+            result = get_or_compute('k', self._slow_compute(0, 'waiter'), 60, wait=0.1, backend=self.backend)
+            self.assertEqual(result, 'waiter')
+            self.assertIsNotNone(self.backend.get('k:lease:None'), "owner lease was released by a waiter")
+            self.assertEqual(owner.result(), 'owner')
+        self.assertIsNone(self.backend.get('k:lease:None'))
+
+
+class BloodResultBulkCreateTests(TestCase):
+    """일괄 등록 API 는 로그인한 환자의 결과만 등록"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = make_patient('bulk_owner')
+        cls.other = make_patient('bulk_other', sex='female')
+
+    def test_rows_for_other_patient_rejected(self):
+        rows = [
+            {'taken_at': '2024-05-01', 'albumin': 4.0},
+            {'taken_at': '2024-05-02', 'albumin': 4.0, 'patient_id': str(self.patient.patient_id)},
+            {'taken_at': '2024-05-03', 'albumin': 4.0, 'patient_id': str(self.other.patient_id)},
+        ]
+        response = client_for(self.patient).post('/api/dashboard/blood-results/bulk/', rows, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(
+            response.data['errors'],
+            [{'index': 2, 'errors': {'patient_id': "다른 환자의 결과는 등록할 수 없습니다."}}],
+        )
+        self.assertEqual(DbrBloodResults.objects.filter(patient_id=self.patient).count(), 2)
+        self.assertFalse(DbrBloodResults.objects.filter(patient_id=self.other).exists())
+
+    def test_deleted_owner(self):
+        # 삭제된 환자의 토큰으로 등록하면 404 (bulk_create FK 오류 500 이 아님)
+        patient = make_patient('bulk_deleted')
+        client = client_for(patient)
+        patient.delete()
+        response = client.post('/api/dashboard/blood-results/bulk/', [{'taken_at': '2024-05-01', 'albumin': 4.0}], format='json')
+        self.assertEqual(response.status_code, 404, response.data)
+        self.assertFalse(DbrBloodResults.objects.exists())
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'chart-image-default'},
+    'charts': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'chart-image-charts'},
+})
+class DashboardChartImageTests(TestCase):
+    """지표 그래프 이미지: 인증 필요, 임의 값은 그래프 범위로 제한, ?result= 는 본인 결과만"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = make_patient('chart_owner')
+        cls.result = DbrBloodResults.objects.create(patient_id=cls.patient, taken_at=date(2024, 1, 1), afp=12.3)
+        other = make_patient('chart_other')
+        cls.other_result = DbrBloodResults.objects.create(patient_id=other, taken_at=date(2024, 1, 1), afp=45.6)
+
+    def test_requires_authentication(self):
+        response = APIClient().get('/api/dashboard/dashboard/charts/afp.svg', {'value': 10})
+        self.assertEqual(response.status_code, 401)
+
+    def test_value_clamped_to_plotted_range(self):
+        client = client_for(self.patient)
+        vmax = INDICATORS['afp']['vmax']
+        clamped = client.get('/api/dashboard/dashboard/charts/afp.svg', {'value': 1e9, 'gender': 'male'})
+        at_max = client.get('/api/dashboard/dashboard/charts/afp.svg', {'value': vmax, 'gender': 'male'})
+        self.assertEqual(clamped.status_code, 200)
+        self.assertEqual(clamped['ETag'], at_max['ETag'])
+        self.assertEqual(clamped.content, at_max.content)
+
+    def test_result_addressing(self):
+        client = client_for(self.patient)
+        response = client.get('/api/dashboard/dashboard/charts/afp.svg', {'result': self.result.pk})
+        self.assertEqual(response.status_code, 200)
+        by_value = client.get('/api/dashboard/dashboard/charts/afp.svg', {'value': 12.3, 'gender': 'male'})
+        self.assertEqual(response['ETag'], by_value['ETag'])
+
+        response = client.get('/api/dashboard/dashboard/charts/afp.svg', {'result': self.other_result.pk})
+        self.assertEqual(response.status_code, 404)
+
+    def test_result_uses_current_patient(self):
+        # 성별은 토큰 claim 이 아닌 현재 환자 정보, 삭제된 환자는 404
+        patient = make_patient('chart_changed')
+        result = DbrBloodResults.objects.create(patient_id=patient, taken_at=date(2024, 1, 1), afp=12.3)
+        client = client_for(patient)
+        patient.sex = 'female'
+        patient.save()
+        response = client.get('/api/dashboard/dashboard/charts/afp.svg', {'result': result.pk})
+        by_value = client.get('/api/dashboard/dashboard/charts/afp.svg', {'value': 12.3, 'gender': 'female'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], by_value['ETag'])
+
+        patient.delete()
+        response = client.get('/api/dashboard/dashboard/charts/afp.svg', {'result': result.pk})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoginErrorTests(TestCase):
+    """없는 사용자와 틀린 비밀번호는 같은 응답 (가입 여부를 알 수 없도록)"""
+
+    def test_same_error_for_unknown_user_and_wrong_password(self):
+        make_patient('login_known')
+        client = APIClient()
+        wrong_password = client.post(
+            '/api/dashboard/auth/login/', {'user_id': 'login_known', 'password': 'wrong'}, format='json'
+        )
+        unknown_user = client.post(
+            '/api/dashboard/auth/login/', {'user_id': 'login_unknown', 'password': 'wrong'}, format='json'
+        )
+        self.assertEqual(wrong_password.status_code, 400)
+        self.assertEqual(unknown_user.status_code, 400)
+        self.assertEqual(wrong_password.data, unknown_user.data)
+
+        ok = client.post('/api/dashboard/auth/login/', {'user_id': 'login_known', 'password': 'pw1234!!'}, format='json')
+        self.assertEqual(ok.status_code, 200)
+
+
+class ClinicalRuleBoundaryTests(SimpleTestCase):
+    """판정 기준값 경계 (바로 아래 / 기준값 / 바로 위), 기준값과 같으면 위쪽 구간"""
+    EPS = 0.01
+
+    # (지표, 성별, 기준값, 기준값 미만 단계, 기준값 이상 단계)
+    BOUNDARIES = [
+        ('afp', 'male', 10, 'safe', 'warning'),
+        ('afp', 'male', 100, 'warning', 'danger'),
+        ('afp', 'male', 400, 'danger', 'critical'),
+        ('afp', 'female', 10, 'safe', 'warning'),
+        ('afp', 'female', 100, 'warning', 'danger'),
+        ('afp', 'female', 400, 'danger', 'critical'),
+        ('ast', 'male', 40, 'safe', 'warning'),
+        ('ast', 'male', 50, 'warning', 'danger'),
+        ('ast', 'female', 32, 'safe', 'warning'),
+        ('ast', 'female', 50, 'warning', 'danger'),
+        ('alt', 'male', 40, 'safe', 'warning'),
+        ('alt', 'male', 50, 'warning', 'danger'),
+        ('alt', 'female', 35, 'safe', 'warning'),
+        ('alt', 'female', 50, 'warning', 'danger'),
+        ('ggt', 'male', 71, 'safe', 'warning'),
+        ('ggt', 'male', 100, 'warning', 'danger'),
+        ('ggt', 'female', 42, 'safe', 'warning'),
+        ('ggt', 'female', 100, 'warning', 'danger'),
+        ('r_gtp', 'male', 63, 'safe', 'warning'),
+        ('r_gtp', 'male', 77, 'warning', 'danger'),
+        ('r_gtp', 'female', 35, 'safe', 'warning'),
+        ('r_gtp', 'female', 77, 'warning', 'danger'),
+        ('bilirubin', 'male', 1.2, 'safe', 'warning'),
+        ('bilirubin', 'male', 2.5, 'warning', 'danger'),
+        ('bilirubin', 'female', 1.2, 'safe', 'warning'),
+        ('bilirubin', 'female', 2.5, 'warning', 'danger'),
+        ('albumin', 'male', 2.0, 'critical', 'danger'),
+        ('albumin', 'male', 2.5, 'danger', 'warning'),
+        ('albumin', 'male', 3.5, 'warning', 'safe'),
+        ('albumin', 'female', 2.0, 'critical', 'danger'),
+        ('albumin', 'female', 2.5, 'danger', 'warning'),
+        ('albumin', 'female', 3.5, 'warning', 'safe'),
+        ('alp', 'male', 120, 'safe', 'warning'),
+        ('alp', 'male', 160, 'warning', 'danger'),
+        ('alp', 'female', 104, 'safe', 'warning'),
+        ('alp', 'female', 160, 'warning', 'danger'),
+        ('pt', 'male', 13, 'safe', 'warning'),
+        ('pt', 'female', 13, 'safe', 'warning'),
+        ('platelet', 'male', 150, 'warning', 'safe'),
+        ('platelet', 'female', 150, 'warning', 'safe'),
+    ]
+
+    def test_classify_boundaries(self):
+        for field, sex, cut, below, at_or_above in self.BOUNDARIES:
+            with self.subTest(field=field, sex=sex, cut=cut):
+                levels, _ = classify(field, [cut - self.EPS, cut, cut + self.EPS], sex)
+                self.assertEqual([level_name(code) for code in levels], [below, at_or_above, at_or_above])
+
+    def test_missing_value(self):
+        levels, _ = classify('afp', [None], 'male')
+        self.assertIsNone(level_name(levels[0]))
+
+    def test_warning_status_boundaries(self):
+        for field, sex, cut, below, at_or_above in self.BOUNDARIES:
+            with self.subTest(field=field, sex=sex, cut=cut):
+                for value, expected in ((cut - self.EPS, below), (cut, at_or_above), (cut + self.EPS, at_or_above)):
+                    warning = warning_status(SimpleNamespace(**{field: value}), sex).get(field)
+                    self.assertEqual(warning['level'] if warning else 'safe', expected, value)
+
+    def test_warning_status_message_uses_sex_threshold(self):
+        male = warning_status(SimpleNamespace(ast=35), 'male')
+        female = warning_status(SimpleNamespace(ast=35), 'female')
+        self.assertNotIn('ast', male)
+        self.assertIn('32 U/L 이상', female['ast']['message'])
+
+    def test_albi_grade_boundaries(self):
+        scores = [-2.61, -2.60, -2.59, -1.40, -1.39, -1.38, None]
+        grades, risk_levels = albi_grades(scores)
+        self.assertEqual(list(grades), [1, 1, 2, 2, 2, 3, 0])
+        self.assertEqual(list(risk_levels), ['safe', 'safe', 'warning', 'warning', 'warning', 'danger', None])
+
+
+class ValidateRowsTests(SimpleTestCase):
+    """일괄 등록 검증: 행별 오류가 올바른 필드로 매핑되고 나머지 행은 유효"""
+    PATIENT = '00000000-0000-0000-0000-000000000001'
+
+    def _validate(self, rows):
+        return validate_rows(rows, known_patients={self.PATIENT}, owner_patient_id=self.PATIENT)
+
+    def test_error_mapping(self):
+        rows = [
+            {'taken_at': '2024-01-01', 'ast': '33', 'albumin': 4.1},              # 0 정상
+            {'taken_at': '2024-01-01', 'ast': 'abc'},                           # 1 숫자 아님
+            {'taken_at': '2024-01-01', 'alt': MAX_VALUE},                       # 2 범위 초과
+            {'taken_at': '2024-01-01', 'afp': 12.345},                          # 3 소수 셋째 자리
+            {'taken_at': '2024-13-01'},                                         # 4 날짜 오류
+            {'ast': 10},                                                        # 5 날짜 없음
+            {'taken_at': '2024-01-01', 'patient_id': '00000000-0000-0000-0000-000000000002'},  # 6 다른 환자
+            InvalidLine("JSON 형식 오류"),                                       # 7 NDJSON 오류 줄
+            5,                                                                  # 8 객체 아님
+            {'taken_at': '2024-01-02', 'ast': '', 'alt': None},                 # 9 빈 값은 오류 아님
+        ]
+        valid, columns, taken_at, patient_ids, errors = self._validate(rows)
+
+        self.assertEqual(list(valid), [0, 9])
+        self.assertEqual(errors[1], {'ast': "숫자가 아닙니다."})
+        self.assertEqual(list(errors[2]), ['alt'])
+        self.assertEqual(list(errors[3]), ['afp'])
+        self.assertEqual(list(errors[4]), ['taken_at'])
+        self.assertEqual(list(errors[5]), ['taken_at'])
+        self.assertEqual(errors[6], {'patient_id': "다른 환자의 결과는 등록할 수 없습니다."})
+        self.assertEqual(errors[7], {'non_field_errors': "JSON 형식 오류"})
+        self.assertEqual(list(errors[8]), ['non_field_errors'])
+
+        self.assertEqual(columns['ast'][0], 33.0)
+        self.assertTrue(np.isnan(columns['ast'][9]))
+        self.assertEqual(taken_at[0], date(2024, 1, 1))
+        self.assertEqual(patient_ids[0], self.PATIENT)
+
+    def test_unknown_patient(self):
+        # 삭제된 환자 (owner 로 지정됐지만 존재하지 않음)
+        valid, _, _, _, errors = validate_rows(
+            [{'taken_at': '2024-01-01'}], known_patients=set(), owner_patient_id=self.PATIENT
+        )
+        self.assertEqual(list(valid), [])
+        self.assertEqual(errors[0], {'patient_id': "존재하지 않는 환자입니다."})
+
+        # 관리 명령처럼 행마다 patient_id 를 적는 경우
+        _, _, _, _, errors = validate_rows(
+            [{'taken_at': '2024-01-01', 'patient_id': 'nope'}], known_patients={self.PATIENT}
+        )
+        self.assertEqual(errors[0], {'patient_id': "존재하지 않는 환자입니다."})
+
+
+class LTTBTests(SimpleTestCase):
+    """시계열 다운샘플링: 끝점 유지, MAX_POINTS 개, 짧으면 그대로"""
+
+    def test_short_series_unchanged(self):
+        for n in (0, 1, 2, 5, MAX_POINTS):
+            with self.subTest(n=n):
+                self.assertEqual(list(lttb(range(n), range(n), MAX_POINTS)), list(range(n)))
+                dates = [date(2024, 1, 1) + timedelta(days=i) for i in range(n)]
+                values = [float(i) for i in range(n)]
+                self.assertEqual(downsample(dates, values), (dates, values))
+
+    def test_long_series(self):
+        rng = np.random.default_rng(0)
+        n = MAX_POINTS * 10
+        x = np.arange(n, dtype=float)
+        y = rng.normal(size=n)
+        y[n // 3] = 100.0  # 튀는 값은 남아야 함
+
+        selected = lttb(x, y, MAX_POINTS)
+        self.assertEqual(len(selected), MAX_POINTS)
+        self.assertEqual(selected[0], 0)
+        self.assertEqual(selected[-1], n - 1)
+        self.assertTrue(np.all(np.diff(selected) > 0))
+        self.assertIn(n // 3, selected)
+
+    def test_downsample_dates(self):
+        n = MAX_POINTS + 1
+        dates = [date(2020, 1, 1) + timedelta(days=i) for i in range(n)]
+        values = [float(i % 7) for i in range(n)]
+        sampled_dates, sampled_values = downsample(dates, values)
+        self.assertEqual(len(sampled_dates), MAX_POINTS)
+        self.assertEqual((sampled_dates[0], sampled_dates[-1]), (dates[0], dates[-1]))
+        self.assertEqual(sampled_values, [values[dates.index(d)] for d in sampled_dates])
+
+
+    def setUp(self):
+        # 정상 범위(기준 테이블 조회)는 여기서 보지 않음
+        patcher = mock.patch('dashboard.time_series_graph.normal_range', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _rows(self, n, gaps=False):
+        rng = np.random.default_rng(1)
+        rows = []
+        for i in range(n):
+            values = [float(v) for v in rng.uniform(1, 100, len(TIME_SERIES_FIELDS)).round(2)]
+            if gaps:
+                # 지표마다 검사하지 않은 날 (None / 0)
+                values = [None if (i + k) % 5 == 0 else 0 if (i + k) % 7 == 0 else v for k, v in enumerate(values)]
+            rows.append((date(2000, 1, 1) + timedelta(days=i), *values))
+        return rows
+
+    def test_columnar_series_shared_dates(self):
+        for gaps in (False, True):
+            with self.subTest(gaps=gaps):
+                rows = self._rows(2000, gaps)
+                by_date = {row[0].isoformat(): row for row in rows}
+                data = columnar_series(rows, target=50)
+
+                self.assertLessEqual(len(data['dates']), 50)
+                self.assertEqual(data['dates'], sorted(data['dates']))
+                for column, field in enumerate(TIME_SERIES_FIELDS, start=1):
+                    values = data['series'][field]
+                    self.assertEqual(len(values), len(data['dates']))
+                    for day, value in zip(data['dates'], values):
+                        source = by_date[day][column]
+                        # 남긴 날짜에 값이 있으면 그 값 그대로, 없으면(None/0) null
+                        self.assertEqual(value, float(source) if source else None, (field, day))
+
+    def test_columnar_series_short(self):
+        rows = self._rows(10, gaps=True)
+        data = columnar_series(rows, target=50)
+        self.assertEqual(len(data['dates']), 10)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'token-revocation'},
+})
+class TokenRevocationTests(SimpleTestCase):
+    """refresh 토큰 폐기 (공유 캐시 + 프로세스별 Bloom filter)"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        # 이 테스트의 "프로세스" 필터
+        patcher = mock.patch.object(token_revocation, '_filter', token_revocation._RevocationFilter())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_round_trip(self):
+        token, other = RefreshToken(), RefreshToken()
+        self.assertFalse(token_revocation.is_revoked(token))
+        token_revocation.revoke(token)
+        self.assertTrue(token_revocation.is_revoked(token))
+        self.assertFalse(token_revocation.is_revoked(other))
+
+    def test_revocation_from_other_process(self):
+        token = RefreshToken()
+        self.assertFalse(token_revocation.is_revoked(token))  # 필터 생성
+
+        # 다른 프로세스의 폐기: 공유 캐시에만 기록되고 이 프로세스의 필터에는 추가되지 않음
+        with mock.patch.object(token_revocation._filter, 'add'):
+            token_revocation.revoke(token)
+        self.assertFalse(token_revocation.is_revoked(token))  # REFRESH_INTERVAL 전
+
+        token_revocation._filter.refreshed_at -= token_revocation.REFRESH_INTERVAL
+        self.assertTrue(token_revocation.is_revoked(token))
+
+    def test_rebuild_advances_first_key(self):
+        from django.core.cache import cache
+        past = time.time() - 10
+        for n in range(1, 4):
+            cache.set(token_revocation._entry_key(n), (f"expired-{n}", past))
+        cache.set(token_revocation.SEQ_KEY, 3)
+
+        # 살아 있는 항목이 없으면 다음 재구성은 seq 다음부터
+        token_revocation._filter.refresh(force=True)
+        self.assertEqual(cache.get(token_revocation.FIRST_KEY), 4)
+
+        token = RefreshToken()
+        token_revocation.revoke(token)
+        token_revocation._RevocationFilter().refresh(force=True)
+        self.assertEqual(cache.get(token_revocation.FIRST_KEY), 4)
+        self.assertTrue(token_revocation.is_revoked(token))
+
+
+class RenderJobTests(TestCase):
+    """그래프 미리 렌더링 작업 큐: 중단된 작업 재시도 / 실패 처리"""
+
+    def test_requeue_stale_jobs(self):
+        patient = make_patient('render_stale')
+        started_at = timezone.now() - render_jobs.STALE_AFTER - timedelta(minutes=1)
+        jobs = {}
+        for attempts in (1, render_jobs.MAX_ATTEMPTS):
+            result = DbrBloodResults.objects.create(patient_id=patient, taken_at=date(2024, 1, attempts), ast=30)
+            jobs[attempts] = DbrRenderJobs.objects.get(blood_result_id=result)
+            DbrRenderJobs.objects.filter(pk=jobs[attempts].pk).update(
+                status='running', started_at=started_at, attempts=attempts,
+            )
+
+        self.assertEqual(render_jobs.requeue_stale_jobs(), 1)
+        retried = DbrRenderJobs.objects.get(pk=jobs[1].pk)
+        failed = DbrRenderJobs.objects.get(pk=jobs[render_jobs.MAX_ATTEMPTS].pk)
+        self.assertEqual(retried.status, 'pending')
+        self.assertEqual(failed.status, 'failed')
+        self.assertIsNotNone(failed.finished_at)
+        self.assertTrue(failed.error)
+
+
+class TokenRefreshTests(TestCase):
+    """삭제된 환자의 refresh token 으로는 access token 을 새로 받을 수 없음"""
+
+    def test_deleted_patient(self):
+        patient = make_patient('refresh_deleted')
+        refresh = str(RefreshToken.for_user(patient))
+        patient.delete()
+        response = APIClient().post('/api/dashboard/auth/refresh/', {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, 401, response.data)
+        self.assertNotIn('access', response.data)
+        self.assertTrue(token_revocation.is_revoked(RefreshToken(refresh)))
+
+
+class DashboardTimeSeriesLayoutTests(TestCase):
+    """?layout= 는 캐시 키에 들어가므로 알려진 값만"""
+
+    def test_unknown_layout_rejected(self):
+        patient = make_patient('layout_patient')
+        DbrBloodResults.objects.create(patient_id=patient, taken_at=date(2024, 1, 1), ast=30)
+        response = client_for(patient).get('/api/dashboard/dashboard/time-series/', {'layout': 'x1'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,295 @@
+# dashboard/time_series_graph.py
+# 혈액검사 지표별 시계열 그래프 (PNG: matplotlib, SVG: dashboard_svg 템플릿)
+# pyplot 없이 Figure + FigureCanvasAgg 로 렌더링 (스레드 워커에서도 안전)
+
+import io
+import hashlib
+import numpy as np
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from django.conf import settings
+
+from .dashboard_bar import INDICATORS, IMAGE_MIME_TYPES, RENDERER_VERSION
+from .reference_cache import reference_range
+
+# 필드 목록 (dashboard_bar.py의 INDICATORS와 동일)
+TIME_SERIES_FIELDS = [
+    'afp', 'ast', 'alt', 'ggt', 'r_gtp', 'alp',
+    'bilirubin', 'albumin', 'total_protein',
+    'platelet', 'pt', 'albi'
+]
+
+# 그래프/데이터 응답에 포함할 지표별 최대 점 개수 (이보다 길면 LTTB 로 다운샘플링)
+MAX_POINTS = getattr(settings, "DASHBOARD_TIME_SERIES_POINTS", 200)
+
+
+def lttb(x, y, target):
+    """
+    Largest-Triangle-Three-Buckets 다운샘플링
+    첫/마지막 점은 유지하고, 나머지를 target-2 개 구간으로 나눠 구간마다
+    (이전 선택 점, 다음 구간 평균) 과 만드는 삼각형 넓이가 가장 큰 점을 선택
+
+    Returns:
+        선택된 점의 인덱스 배열 (오름차순)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if target >= n or target < 3:
+        return np.arange(n)
+
+    # 가운데 점(1 ~ n-2)을 target-2 개 구간으로 나눔
+    edges = np.linspace(1, n - 1, target - 1).astype(int)
+    # 구간별 평균 (다음 구간 평균을 미리 계산, 마지막 구간 다음은 마지막 점)
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])[1:]
+    avg_y = np.append(sums_y / counts, y[-1])[1:]
+
+    selected = np.empty(target, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(target - 2):
+        start, end = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[a] - avg_x[i]) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y[i] - y[a])
+        )
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def _date_axis(dates):
+    return np.array([d.toordinal() for d in dates], dtype=float)
+
+
+def downsample(dates, values, target=None):
+    """시계열이 target 개보다 길면 LTTB 로 줄임 (dates, values 리스트 반환)"""
+    target = MAX_POINTS if target is None else target
+    if len(values) <= target:
+        return dates, values
+    selected = lttb(_date_axis(dates), values, target)
+    return [dates[i] for i in selected], [values[i] for i in selected]
+
+
+def extract_series(rows, field):
+    """
+    (taken_at, value) 행에서 유효한 값(None, 0 제외)만 추출
+
+    Args:
+        rows: DbrBloodResults 객체 또는 (taken_at, value) 튜플의 iterable
+    """
+    dates = []
+    values = []
+    for row in rows:
+        if isinstance(row, tuple):
+            taken_at, value = row
+        else:
+            taken_at, value = row.taken_at, getattr(row, field, None)
+        if value is not None and float(value) != 0:
+            dates.append(taken_at)
+            values.append(float(value))
+    return dates, values
+
+
+def normal_range(field):
+    """정상 범위: 혈액검사 기준 테이블 (메모리 스냅샷) → 없으면 INDICATORS 의 '정상' 구간 → 없으면 None"""
+    reference = reference_range(field)
+    if reference is not None:
+        return reference
+    config = INDICATORS.get(field, {})
+    for (lo, hi), label in zip(config.get('ranges', []), config.get('labels', [])):
+        if label.startswith('정상'):
+            return {'min': lo, 'max': hi}
+    return None
+
+
+def _measured(value):
+    return value is not None and float(value) != 0
+
+
+def _pick_series(x, values, k):
+    """점이 k 개보다 많으면 LTTB 로 k 개 인덱스 (k < 3 이면 끝점만)"""
+    if len(values) <= k:
+        return np.arange(len(values))
+    if k >= 3:
+        return lttb(x, values, k)
+    return np.array([len(values) - 1, 0][:k], dtype=int)
+
+
+def columnar_series(rows, fields=TIME_SERIES_FIELDS, target=None):
+    """
+    (taken_at, *fields) 행 → 클라이언트 차트용 컬럼형 데이터
+    dates 하나와 필드별 값 배열 (None/0 은 null), 정상 범위 밴드
+    모든 지표가 같은 날짜 목록을 쓰므로, 남길 날짜를 target 개 이내로 한 번 정하고
+    그 날짜의 모든 지표 실제 값을 채움 (남긴 날짜에 값이 있으면 null 이 아님)
+    - target 을 지표들에 나눠 주고(점이 적은 지표부터, 남는 몫은 다음 지표로) 지표별 LTTB 로 날짜 선택
+    """
+    target = MAX_POINTS if target is None else target
+    columns = {
+        field: [i for i, row in enumerate(rows) if _measured(row[column])]
+        for column, field in enumerate(fields, start=1)
+    }
+    measured = sorted(set().union(*columns.values())) if columns else []
+
+    if len(measured) <= target:
+        kept = measured
+    else:
+        x = _date_axis([row[0] for row in rows])
+        keep = set()
+        budget = target
+        remaining = sorted((field for field in fields if columns[field]), key=lambda field: len(columns[field]))
+        for n, field in enumerate(remaining):
+            share = budget // (len(remaining) - n)
+            indices = columns[field]
+            column = fields.index(field) + 1
+            selected = _pick_series(x[indices], [float(rows[i][column]) for i in indices], share)
+            before = len(keep)
+            keep.update(indices[i] for i in selected)
+            budget -= len(keep) - before  # 다른 지표가 이미 고른 날짜는 몫을 쓰지 않음
+        kept = sorted(keep)
+
+    dates = [rows[i][0].isoformat() for i in kept]
+    series = {
+        field: [float(rows[i][column]) if _measured(rows[i][column]) else None for i in kept]
+        for column, field in enumerate(fields, start=1)
+    }
+
+    return {
+        "dates": dates,
+        "series": series,
+        "units": {field: INDICATORS.get(field, {}).get('unit', '') for field in fields},
+        "normal_ranges": {field: normal_range(field) for field in fields},
+    }
+
+
+def series_etag(dates, values, field, fmt='png'):
+    """그래프 입력 데이터 기반 strong ETag (렌더링 없이 계산 가능)"""
+    digest = hashlib.sha1(
+        f"{RENDERER_VERSION}:{fmt}:{field}:{list(zip(map(str, dates), values))}".encode('utf-8')
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+# 멀티 패널(스프라이트 시트) 설정: 패널 하나는 개별 그래프와 같은 크기
+PANEL_SIZE = (10, 4)  # inch
+PANEL_DPI = 100
+PANEL_MARGINS = (0.08, 0.02, 0.28, 0.1)  # left, right, bottom, top (패널 대비 비율)
+
+
+def _field_config(field, values):
+    return INDICATORS.get(field, {
+        'title': field.upper(),
+        'unit': '',
+        'vmin': min(values) * 0.9 if values else 0,
+        'vmax': max(values) * 1.1 if values else 100,
+    })
+
+
+def _draw_series(ax, dates, values, field):
+    """축 하나에 시계열 그래프 그리기 (개별 그래프/멀티 패널 공용)"""
+    config = _field_config(field, values)
+    title = config.get('title', field.upper())
+    unit = config.get('unit', '')
+
+    # 선 그래프
+    ax.plot(dates, values, marker='o', linewidth=2, markersize=6, color='#3498db')
+
+    # 정상 범위 표시 (있는 경우)
+    if 'ranges' in config and len(config['ranges']) > 0:
+        normal_range = config['ranges'][0]
+        ax.axhspan(normal_range[0], normal_range[1], alpha=0.2, color='green', label='Normal Range')
+
+    # 축 설정
+    ax.set_xlabel('Date', fontsize=12)
+    ax.set_ylabel(f'{title} ({unit})', fontsize=12)
+    ax.set_title(f'{title} Trend', fontsize=14, fontweight='bold')
+    ax.grid(True, alpha=0.3, linestyle='--')
+
+    # 날짜 포맷
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+
+    # 범례
+    if 'ranges' in config:
+        ax.legend(loc='upper right')
+
+
+def render_time_series(dates, values, field, fmt='png'):
+    """시계열 그래프를 bytes로 생성 (fmt='svg' 이면 matplotlib 없이 SVG 템플릿 사용)"""
+    if fmt not in IMAGE_MIME_TYPES:
+        raise ValueError(f"Invalid image format: {fmt}")
+
+    # 점이 너무 많으면 렌더링 전에 다운샘플링
+    dates, values = downsample(dates, values)
+
+    if fmt == 'svg':
+        from .dashboard_svg import time_series_svg
+        return time_series_svg(dates, values, field).encode('utf-8')
+
+    # Figure 생성
+    fig = Figure(figsize=PANEL_SIZE)
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    _draw_series(ax, dates, values, field)
+    fig.autofmt_xdate()
+
+    buf = io.BytesIO()
+    fig.tight_layout()
+    fig.savefig(buf, format='png', dpi=PANEL_DPI, bbox_inches='tight')
+
+    return buf.getvalue()
+
+
+def render_time_series_sheet(series, fmt='png'):
+    """
+    여러 지표의 시계열 그래프를 하나의 이미지(세로 스프라이트 시트)로 생성
+    Figure 생성/PNG 인코딩을 지표마다 반복하지 않고 한 번만 수행
+
+    Args:
+        series: {field: (dates, values)} (값이 없는 지표는 제외하고 전달)
+
+    Returns:
+        (image bytes, {field: {"x", "y", "width", "height"}})  # 패널별 픽셀 영역 (클라이언트 crop 용)
+    """
+    if fmt not in IMAGE_MIME_TYPES:
+        raise ValueError(f"Invalid image format: {fmt}")
+
+    series = {field: downsample(dates, values) for field, (dates, values) in series.items()}
+    fields = list(series)
+    if fmt == 'svg':
+        from .dashboard_svg import time_series_sheet_svg
+        return time_series_sheet_svg(series)
+
+    panel_w = round(PANEL_SIZE[0] * PANEL_DPI)
+    panel_h = round(PANEL_SIZE[1] * PANEL_DPI)
+    n = len(fields)
+    fig = Figure(figsize=(PANEL_SIZE[0], PANEL_SIZE[1] * n))
+    FigureCanvasAgg(fig)
+
+    # 패널 위치를 고정 격자로 배치해야 bbox_inches='tight' 없이도 crop 영역이 정확함
+    left, right, bottom, top = PANEL_MARGINS
+    panels = {}
+    shared_ax = None
+    for i, field in enumerate(fields):
+        dates, values = series[field]
+        panel_bottom = (n - 1 - i) / n
+        ax = fig.add_axes(
+            [left, panel_bottom + bottom / n, 1 - left - right, (1 - bottom - top) / n],
+            sharex=shared_ax,
+        )
+        shared_ax = shared_ax or ax
+        _draw_series(ax, dates, values, field)
+        # 패널을 잘라서 따로 보여 주므로 모든 패널에 날짜 라벨 표시
+        ax.tick_params(axis='x', labelbottom=True)
+        for label in ax.get_xticklabels():
+            label.set_rotation(30)
+            label.set_horizontalalignment('right')
+        panels[field] = {"x": 0, "y": i * panel_h, "width": panel_w, "height": panel_h}
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=PANEL_DPI)
+
+    return buf.getvalue(), panels
@@ -0,0 +1,137 @@
+# dashboard/token_revocation.py
+# refresh 토큰 폐기 목록 (로그아웃) — simplejwt 의 DB blacklist 대신 공유 캐시 사용
+# - 폐기한 토큰의 jti 를 토큰 남은 수명만큼 캐시에 저장 (만료된 토큰은 어차피 거절되므로 자동 정리)
+# - 프로세스마다 Bloom filter 를 두고 주기적으로 새 폐기 항목을 반영
+#   → 폐기되지 않은 토큰(대부분)은 메모리에서 바로 판정, "있을 수도 있음"일 때만 캐시 조회
+# - 다른 프로세스에서 폐기한 토큰은 최대 REFRESH_INTERVAL 초 늦게 반영됨
+# - 캐시가 항목을 임의로 지우면(eviction) 폐기가 풀리므로 운영에서는 eviction 없는 Redis 설정 권장
+# - 로컬 메모리 캐시(개발용, DEBUG 에서만 허용)면 폐기가 그 프로세스 안에서만 유효
+
+import math
+import time
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.settings import api_settings
+
+REFRESH_INTERVAL = getattr(settings, "TOKEN_REVOCATION_REFRESH_INTERVAL", 5)
+REBUILD_INTERVAL = 3600  # 만료된 항목을 비우기 위해 필터를 새로 만드는 주기
+BLOOM_CAPACITY = 100000
+BLOOM_ERROR_RATE = 0.001
+FETCH_BATCH = 1000
+
+SEQ_KEY = "revoked_jti_seq"      # 폐기 항목 일련번호 (마지막 번호)
+FIRST_KEY = "revoked_jti_first"  # 아직 살아 있을 수 있는 가장 오래된 번호
+
+
+def _revoked_key(jti):
+    return f"revoked_jti_{jti}"
+
+
+def _entry_key(seq):
+    return f"revoked_jti_entry_{seq}"
+
+
+class BloomFilter:
+    """jti 문자열용 Bloom filter (false positive 만 있고 false negative 없음)"""
+
+    def __init__(self, capacity=BLOOM_CAPACITY, error_rate=BLOOM_ERROR_RATE):
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        # 해시 두 개로 k 개 위치 생성 (Kirsch–Mitzenmacher)
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class _RevocationFilter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.last_seq = 0
+        self.refreshed_at = 0.0
+        self.built_at = 0.0
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        if not force and now - self.refreshed_at < REFRESH_INTERVAL:
+            return
+        with self.lock:
+            if not force and now - self.refreshed_at < REFRESH_INTERVAL:
+                return
+            seq = cache.get(SEQ_KEY) or 0
+            if self.bloom is None or seq < self.last_seq or now - self.built_at >= REBUILD_INTERVAL:
+                self._rebuild(seq)
+                self.built_at = now
+            elif seq > self.last_seq:
+                for jti, _ in self._entries(self.last_seq + 1, seq):
+                    self.bloom.add(jti)
+            self.last_seq = seq
+            self.refreshed_at = now
+
+    def _rebuild(self, seq):
+        bloom = BloomFilter()
+        first = cache.get(FIRST_KEY) or 1
+        first_alive = None
+        now = time.time()
+        for n, (jti, exp) in self._entries(first, seq, with_seq=True):
+            if exp > now:
+                bloom.add(jti)
+                first_alive = first_alive or n
+        # 살아 있는 항목이 없으면 지금까지의 항목은 다음 재구성 때 다시 읽지 않도록 seq 다음부터
+        first_alive = first_alive or seq + 1
+        if first_alive > first:
+            cache.set(FIRST_KEY, first_alive, None)
+        self.bloom = bloom
+
+    def _entries(self, start, end, with_seq=False):
+        for batch_start in range(start, end + 1, FETCH_BATCH):
+            seqs = range(batch_start, min(batch_start + FETCH_BATCH, end + 1))
+            found = cache.get_many([_entry_key(n) for n in seqs])
+            for n in seqs:
+                entry = found.get(_entry_key(n))
+                if entry is not None:
+                    yield (n, entry) if with_seq else entry
+
+    def add(self, jti):
+        with self.lock:
+            if self.bloom is not None:
+                self.bloom.add(jti)
+
+
+_filter = _RevocationFilter()
+
+
+def revoke(token):
+    """refresh 토큰 폐기 (로그아웃) — 토큰이 만료될 때까지만 기억"""
+    jti, exp = token[api_settings.JTI_CLAIM], token['exp']
+    ttl = math.ceil(exp - time.time())
+    if ttl <= 0:
+        return
+    cache.set(_revoked_key(jti), True, ttl)
+    cache.add(SEQ_KEY, 0, None)
+    seq = cache.incr(SEQ_KEY)
+    cache.set(_entry_key(seq), (jti, exp), ttl)
+    _filter.add(jti)
+
+
+def is_revoked(token):
+    """폐기된 refresh 토큰인지 (대부분 Bloom filter 에서 바로 False)"""
+    jti = token[api_settings.JTI_CLAIM]
+    _filter.refresh()
+    if jti not in _filter.bloom:
+        return False
+    return cache.get(_revoked_key(jti)) is not None
@@ -8,16 +8,18 @@ from .views import (
     # 환자
     PatientListView, PatientDetailView,
     # 혈액검사
-    BloodResultListView, BloodResultDetailView, LatestBloodResultView,
+    BloodResultListView, BloodResultBulkCreateView, BloodResultExportView, BloodResultDetailView, LatestBloodResultView,
     # 일정
     AppointmentListView, AppointmentDetailView,
     # 혈액검사 기준
     BloodTestReferenceListView, BloodTestReferenceDetailView,
     # Auth
     DbrPatientRegisterView, DbrPatientLoginView, DbrPatientLogoutView, DbrPatientUserView, DbrPatientTokenRefreshView,
+    LoginStatsView,
     # Dashboard
     DashboardGraphsView,
     DashboardTimeSeriesView, 
+    DashboardChartImageView, DashboardTimeSeriesChartView,
     # 약물
     # ✍️ (2/4) 기존 View 2개(ListView, DetailView)는 import 목록에서 제거합니다.
     PatientMedicationsView, MedicationViewSet, DrugSearchAPIView,
@@ -51,10 +53,13 @@ urlpatterns = [
     path("auth/logout/", DbrPatientLogoutView.as_view(), name="patient-logout"),
     path("auth/user/", DbrPatientUserView.as_view(), name="patient-user"),
     path("auth/refresh/", DbrPatientTokenRefreshView.as_view(), name="patient_token_refresh"),
+    path("auth/login-stats/", LoginStatsView.as_view(), name="login-stats"),
     
     # ==================== Dashboard ====================
     path('dashboard/graphs/', DashboardGraphsView.as_view(), name='dashboard-graphs'),
     path('dashboard/time-series/', DashboardTimeSeriesView.as_view(), name='dashboard-time-series'),
+    path('dashboard/charts/<slug:indicator>.<slug:fmt>', DashboardChartImageView.as_view(), name='dashboard-chart'),
+    path('dashboard/time-series/charts/<slug:field>.<slug:fmt>', DashboardTimeSeriesChartView.as_view(), name='dashboard-time-series-chart'),
     
     # ==================== 환자 ====================
     path('patients/', PatientListView.as_view(), name='patient-list'),
@@ -62,6 +67,8 @@ urlpatterns = [
 
     # ==================== 혈액검사 결과 ====================
     path('blood-results/', BloodResultListView.as_view(), name='blood-result-list'),
+    path('blood-results/bulk/', BloodResultBulkCreateView.as_view(), name='blood-result-bulk'),
+    path('blood-results/export.<slug:fmt>', BloodResultExportView.as_view(), name='blood-result-export'),
     path('blood-results/latest/', LatestBloodResultView.as_view(), name='blood-result-latest'),
     path('blood-results/<int:blood_result_id>/', BloodResultDetailView.as_view(), name='blood-result-detail'),
 
@@ -1,5 +1,6 @@
 # liverguard/views.py
 
+import os
 from django.shortcuts import render, get_object_or_404
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -20,15 +21,25 @@ from .serializers import (
     MedicationCreateUpdateSerializer,
     DurDrugInfoSearchSerializer
 )
-from dashboard.authentication import PatientJWTAuthentication
+from dashboard.authentication import PatientJWTAuthentication, add_patient_claims
+from .principal_cache import get_patient
+from .token_revocation import revoke, is_revoked
+from .login_guard import LoginBusy, LoginThrottled, check_throttle, record_failure, record_success
+from .login_guard import stats as login_stats
+from rest_framework.throttling import BaseThrottle
+from .blood_ingest import ingest, NDJSONParser, MAX_ROWS as MAX_BULK_ROWS
+from .blood_export import export_response, CONTENT_TYPES as EXPORT_CONTENT_TYPES
 # from rest_framework import status # 👈 상단에서 이미 import 됨
 from django.contrib.auth import authenticate, login
 from rest_framework.decorators import api_view
 from django.contrib.auth.hashers import check_password
-from rest_framework.permissions import AllowAny, IsAuthenticated # 👈 IsAuthenticated 이미 있음
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser # 👈 IsAuthenticated 이미 있음
+from rest_framework.authentication import SessionAuthentication
 from rest_framework_simplejwt.tokens import RefreshToken, AccessToken, TokenError
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+from rest_framework.parsers import JSONParser
+from rest_framework.exceptions import NotFound
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from flask_services.survival_service import predict_survival_from_flask
@@ -102,20 +113,43 @@ class DbrPatientLoginView(APIView):
                 description="로그인 실패",
                 examples={
                     "application/json": {
-                        "user_id": ["존재하지 않는 사용자입니다."],
-                        "password": ["비밀번호가 올바르지 않습니다."]
+                        "non_field_errors": ["아이디 또는 비밀번호가 올바르지 않습니다."]
                     }
                 }
             ),
+            429: "로그인 실패가 많은 사용자/IP (Retry-After 초 후 재시도)",
+            503: "로그인 요청 폭주로 비밀번호 검증 대기열이 가득 참 (Retry-After 초 후 재시도)",
         },
     )
     def post(self, request):
+        # 실패가 많은 사용자/IP 는 비밀번호 해시 전에 거절
+        user_id = str(request.data.get("user_id") or "")
+        ip = BaseThrottle().get_ident(request)
+        try:
+            check_throttle(user_id, ip)
+        except LoginThrottled as e:
+            return Response(
+                {"error": "로그인 시도가 너무 많습니다. 잠시 후 다시 시도해주세요."},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+
         serializer = DbrPatientLoginSerializer(data=request.data)
-        if serializer.is_valid():
+        try:
+            is_valid = serializer.is_valid()
+        except LoginBusy:
+            return Response(
+                {"error": "로그인 요청이 많습니다. 잠시 후 다시 시도해주세요."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "1"},
+            )
+
+        if is_valid:
+            record_success(user_id)
             user = serializer.validated_data["user"]
 
             # [OK] JWT 발급 로직은 View에서 처리
-            refresh = RefreshToken.for_user(user)
+            refresh = add_patient_claims(RefreshToken.for_user(user), user)
             access = refresh.access_token
             
             response_data = {
@@ -135,9 +169,31 @@ class DbrPatientLoginView(APIView):
 
         # [ERROR] 로그인 실패
         print("[ERROR] Login errors:", serializer.errors)
+        if user_id and request.data.get("password"):
+            record_failure(user_id, ip)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class LoginStatsView(APIView):
+    """
+    로그인 비밀번호 검증 지표 (관리자 전용, Django admin 로그인 세션)
+    지표는 프로세스별이므로 응답한 워커의 pid 를 함께 돌려줌
+    """
+    authentication_classes = [SessionAuthentication]
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        tags=["Auth"],
+        operation_summary="로그인 해시 검증 지표 (관리자)",
+        responses={
+            200: "pid, verified, rejected_busy, in_flight, max_in_flight, hash_ms_avg, hash_ms_p95",
+            403: "관리자가 아님",
+        }
+    )
+    def get(self, request):
+        return Response({"pid": os.getpid(), **login_stats()})
+
+
 # logout view
 class DbrPatientLogoutView(APIView):
     """
@@ -189,7 +245,7 @@ class DbrPatientLogoutView(APIView):
                 )
 
             token = RefreshToken(refresh_token)
-            # token.blacklist()  # [OK] 블랙리스트에 등록 (재사용 불가)
+            revoke(token)  # 폐기 목록에 등록 (재사용 불가, token_revocation)
 
             return Response(
                 {"message": "로그아웃되었습니다."},
@@ -228,7 +284,10 @@ class DbrPatientUserView(APIView):
         security=[{"Bearer": []}]
     )
     def get(self, request):
-        user = request.user
+        # 토큰 발급 후 바뀌었을 수 있는 정보까지 최신 값으로
+        user = request.user.patient
+        if user is None:
+            return Response({"error": "환자 정보를 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
         return Response({
             "patient_id": str(user.patient_id),
             "user_id": user.user_id,
@@ -274,6 +333,7 @@ class DbrPatientTokenRefreshView(APIView):
                 description="토큰 만료 또는 유효하지 않음",
                 examples={"application/json": {"error": "유효하지 않은 refresh token"}},
             ),
+            401: "삭제된 사용자 (refresh token 폐기)",
         },
     )
     def post(self, request):
@@ -285,9 +345,21 @@ class DbrPatientTokenRefreshView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         try:
-            # 새 access token 발급
+            # 새 access token 발급 (토큰의 환자 정보는 최신 값으로)
             token = RefreshToken(refresh_token)
-            new_access = str(token.access_token)
+            if is_revoked(token):
+                # 로그아웃으로 폐기된 토큰
+                raise TokenError("revoked")
+            patient = get_patient(token["patient_id"])
+            if patient is None:
+                # 삭제된 환자 → 새 access token 을 주지 않고 refresh token 도 폐기
+                revoke(token)
+                return Response(
+                    {"error": "존재하지 않는 사용자입니다."},
+                    status=status.HTTP_401_UNAUTHORIZED
+                )
+            access = add_patient_claims(token.access_token, patient)
+            new_access = str(access)
             return Response({"access": new_access}, status=status.HTTP_200_OK)
         except TokenError:
             return Response(
@@ -359,6 +431,68 @@ class BloodResultListView(generics.ListCreateAPIView):
         return super().post(request, *args, **kwargs)
 
 
+class BloodResultBulkCreateView(APIView):
+    """혈액검사 결과 일괄 등록 (JSON 배열 또는 NDJSON)"""
+    authentication_classes = [PatientJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser, NDJSONParser]
+
+    @swagger_auto_schema(
+        tags=["Blood Results"],
+        operation_summary="혈액검사 결과 일괄 등록",
+        operation_description=(
+            "결과 목록을 JSON 배열(application/json) 또는 한 줄에 하나씩(application/x-ndjson) 보냅니다. "
+            "모든 행은 로그인한 환자의 결과로 등록합니다 (다른 환자의 patient_id 를 적은 행은 오류). "
+            "ALBI / albi_grade / risk_level 은 서버에서 계산하며, 잘못된 행은 인덱스별 오류로 돌려주고 나머지는 등록합니다."
+        ),
+        request_body=openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+        responses={
+            201: "등록 결과 {created, ids, errors: [{index, errors}]}",
+            400: "등록된 결과가 없음 (본문 형식 오류 또는 모든 행 오류)",
+            404: "환자 정보 없음 (삭제된 환자)",
+        }
+    )
+    def post(self, request):
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response({"detail": "결과 목록(JSON 배열 또는 NDJSON)이 필요합니다."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > MAX_BULK_ROWS:
+            return Response({"detail": f"한 번에 최대 {MAX_BULK_ROWS}건까지 등록할 수 있습니다."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # 삭제된 환자의 토큰도 만료 전까지는 인증되므로 저장 전에 확인 (FK 오류 500 방지)
+        if request.user.patient is None:
+            return Response({"detail": "환자 정보를 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+
+        result = ingest(rows, owner_patient_id=request.user.patient_id)
+        code = status.HTTP_201_CREATED if result['created'] or not rows else status.HTTP_400_BAD_REQUEST
+        return Response(result, status=code)
+
+
+class BloodResultExportView(APIView):
+    """로그인한 환자의 전체 혈액검사 기록 내보내기 (CSV / NDJSON 스트리밍)"""
+    authentication_classes = [PatientJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        tags=["Blood Results"],
+        operation_summary="혈액검사 기록 내보내기",
+        operation_description="blood-results/export.csv 또는 blood-results/export.ndjson (검사일자 순)",
+        responses={
+            200: "CSV 또는 NDJSON 파일",
+            404: "지원하지 않는 형식",
+        }
+    )
+    def get(self, request, fmt):
+        if fmt not in EXPORT_CONTENT_TYPES:
+            return Response({"detail": f"지원하지 않는 형식: {fmt}"}, status=status.HTTP_404_NOT_FOUND)
+
+        patient_id = request.user.patient_id
+        queryset = DbrBloodResults.objects.filter(patient_id=patient_id)
+        return export_response(queryset, fmt, f"blood_results_{patient_id}")
+
+
 class BloodResultDetailView(generics.RetrieveUpdateDestroyAPIView):
     """혈액검사 결과 상세 조회, 수정, 삭제"""
     queryset = DbrBloodResults.objects.all().select_related('patient_id')
@@ -475,7 +609,14 @@ class BloodTestReferenceListView(generics.ListCreateAPIView):
 
     @swagger_auto_schema(tags=["Blood Test References"], operation_summary="혈액검사 기준 목록 조회")
     def get(self, request, *args, **kwargs):
-        return super().get(request, *args, **kwargs)
+        # 프로세스 내 스냅샷에서 제공 (기준이 바뀔 때만 DB 조회), 변경 없으면 304
+        snapshot = get_references()
+        response = get_conditional_response(request, etag=snapshot.etag)
+        if response is None:
+            response = Response([dict(row) for row in snapshot.rows])
+        response['ETag'] = snapshot.etag
+        response['Cache-Control'] = 'public, max-age=300'
+        return response
 
     @swagger_auto_schema(tags=["Blood Test References"], operation_summary="혈액검사 기준 등록")
     def post(self, request, *args, **kwargs):
@@ -506,10 +647,60 @@ class BloodTestReferenceDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 
 # ==================== Dashboard Graph Views ====================
-from .dashboard_bar import generate_risk_bar
-from django.http import JsonResponse
-from django.core.cache import cache
+from .dashboard_bar import INDICATORS, to_data_uri, to_numeric_value, IMAGE_MIME_TYPES
+from .chart_cache import (
+    get_charts, quantize, chart_etag, get_or_compute, PATIENT_CACHE_TIMEOUT,
+    PRIMARY_INDICATORS, SECONDARY_INDICATORS, result_chart_jobs,
+)
+from .time_series_graph import (
+    TIME_SERIES_FIELDS, extract_series, series_etag, render_time_series, columnar_series,
+    render_time_series_sheet,
+)
+from .clinical_rules import warning_status
+from . import clinical_rules
+from .reference_cache import get_references, references_version
+from types import SimpleNamespace
+from django.http import JsonResponse, HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from urllib.parse import urlencode
+import math
+from rest_framework.negotiation import DefaultContentNegotiation
 import hashlib
+import base64
+
+
+class ImageFormatContentNegotiation(DefaultContentNegotiation):
+    """
+    ?format=png|svg 는 그래프 이미지 포맷 선택용으로 사용하므로
+    DRF 렌더러 선택(URL_FORMAT_OVERRIDE)에서는 무시
+    """
+    def filter_renderers(self, renderers, format):
+        if format in IMAGE_MIME_TYPES:
+            return renderers
+        return super().filter_renderers(renderers, format)
+
+
+def get_image_format(request):
+    """
+    쿼리 파라미터에서 이미지 포맷 추출 (기본: png)
+    json 등 그 외 값은 DRF 렌더러 선택용이므로 png 로 취급
+    """
+    fmt = request.query_params.get('format', 'png').lower()
+    return fmt if fmt in IMAGE_MIME_TYPES else 'png'
+
+
+def wants_image_urls(request):
+    """?images=url 이면 base64 대신 이미지 URL 반환 (기본: inline data URI)"""
+    return request.query_params.get('images') == 'url'
+
+
+def chart_url(request, indicator, blood_result, fmt='png'):
+    """혈액검사 결과 하나의 지표 그래프 이미지 URL"""
+    path = reverse('dashboard-chart', kwargs={'indicator': indicator, 'fmt': fmt})
+    query = urlencode({'result': blood_result.blood_result_id})
+    return request.build_absolute_uri(f"{path}?{query}")
+
 
 class DashboardGraphsView(APIView):
     """
@@ -517,11 +708,24 @@ class DashboardGraphsView(APIView):
     """
     authentication_classes = [PatientJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    content_negotiation_class = ImageFormatContentNegotiation
     
     @swagger_auto_schema(
         operation_description="혈액검사 결과 그래프 조회 (핵심 지표)",
         operation_summary="혈액검사 그래프",
         tags=["Dashboard"],
+        manual_parameters=[
+            openapi.Parameter(
+                'format', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                enum=list(IMAGE_MIME_TYPES), default='png',
+                description="그래프 이미지 포맷 (svg: 벡터, 클라이언트에서 자유롭게 확대 가능)"
+            ),
+            openapi.Parameter(
+                'images', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                enum=['inline', 'url'], default='inline',
+                description="url: base64 대신 ETag/Cache-Control 이 붙는 이미지 URL 반환"
+            ),
+        ],
         responses={
             200: openapi.Response(
                 description="그래프 생성 성공",
@@ -546,114 +750,29 @@ class DashboardGraphsView(APIView):
     )
     def get(self, request):
         try:
-            patient = request.user
-
-            # 최신 혈액검사 결과
-            latest_result = DbrBloodResults.objects.filter(
-                patient=patient
-            ).order_by('-taken_at').first()
+            # 성별(그래프 기준), 이름이 응답에 들어가므로 토큰 값이 아닌 최신 환자 정보
+            patient = request.user.patient
+            if patient is None:
+                return Response({"error": "환자 정보를 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+            fmt = get_image_format(request)
+            as_url = wants_image_urls(request)
+
+            # 캐시 확인 (혈액검사 결과/환자 정보가 바뀌면 세대 번호가 올라가 자동 무효화)
+            # 동시 요청은 한 요청만 그래프를 만들고, 만료 직전에는 확률적으로 미리 갱신
+            cache_key = f"graphs_v6_{patient.patient_id}_{fmt}{'_url' if as_url else ''}"
+            response_data = get_or_compute(
+                cache_key,
+                lambda: self._build_graphs(request, patient, fmt, as_url),
+                timeout=PATIENT_CACHE_TIMEOUT,
+                patient_id=patient.patient_id,
+            )
 
-            if not latest_result:
+            if response_data is None:
                 return Response(
                     {"error": "혈액검사 결과가 없습니다."},
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-            # 캐시 키
-            cache_key = f"graphs_v3_{patient.patient_id}_{latest_result.blood_result_id}"
-            
-            # 캐시 확인
-            cached_graphs = cache.get(cache_key)
-            if cached_graphs:
-                return Response(cached_graphs, status=status.HTTP_200_OK)
-
-            # [FIRE] 핵심 지표 우선순위 (중요한 순서대로)
-            primary_indicators = [
-                'afp',         # 1. 종양 표지자
-                'ast',         # 2. 간세포 손상
-                'alt',         # 3. 간세포 손상
-                'albi_grade',  # 4. 간 기능 종합
-            ]
-            
-            secondary_indicators = [
-                'ggt',         # 5. 담도/알코올
-                'r_gtp',       # 6. 알코올
-                'bilirubin',   # 7. 황달
-                'albumin',     # 8. 간 합성
-            ]
-
-            graphs = {
-                'primary': {},    # 핵심 지표
-                'secondary': {},  # 부가 지표
-            }
-            
-            gender = patient.sex
-
-            # [FIRE] 핵심 지표 그래프 생성
-            for indicator in primary_indicators:
-                value = getattr(latest_result, indicator, None)
-                
-                if value is None:
-                    graphs['primary'][indicator] = None
-                else:
-                    try:
-                        img_base64 = generate_risk_bar(indicator, float(value), gender)
-                        graphs['primary'][indicator] = f"data:image/png;base64,{img_base64}"
-                    except Exception as e:
-                        print(f"[ERROR] Error generating {indicator} graph: {e}")
-                        graphs['primary'][indicator] = None
-
-            # 📊 부가 지표 그래프 생성
-            for indicator in secondary_indicators:
-                value = getattr(latest_result, indicator, None)
-                
-                if value is None:
-                    graphs['secondary'][indicator] = None
-                else:
-                    try:
-                        img_base64 = generate_risk_bar(indicator, float(value), gender)
-                        graphs['secondary'][indicator] = f"data:image/png;base64,{img_base64}"
-                    except Exception as e:
-                        print(f"[ERROR] Error generating {indicator} graph: {e}")
-                        graphs['secondary'][indicator] = None
-
-            # 📊 수치 요약
-            summary = {
-                'afp': {
-                    'value': float(latest_result.afp) if latest_result.afp else None,
-                    'status': self._get_afp_status(latest_result.afp),
-                    'importance': 'critical'
-                },
-                'ast': {
-                    'value': float(latest_result.ast) if latest_result.ast else None,
-                    'status': self._get_ast_status(latest_result.ast, gender),
-                    'importance': 'high'
-                },
-                'alt': {
-                    'value': float(latest_result.alt) if latest_result.alt else None,
-                    'status': self._get_alt_status(latest_result.alt, gender),
-                    'importance': 'high'
-                },
-                'albi': {
-                    'score': float(latest_result.albi) if latest_result.albi else None,
-                    'grade': latest_result.albi_grade,
-                    'status': latest_result.risk_level,
-                    'importance': 'high'
-                }
-            }
-
-            response_data = {
-                "patient_name": patient.name,
-                "test_date": latest_result.taken_at,
-                "gender": gender,
-                "graphs": graphs,
-                "summary": summary,
-                "message": "핵심 간 검사 지표 위주로 표시됩니다."
-            }
-
-            # 캐시 저장 (1시간)
-            cache.set(cache_key, response_data, 3600)
-
             return Response(response_data, status=status.HTTP_200_OK)
 
         except Exception as e:
@@ -662,43 +781,75 @@ class DashboardGraphsView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
-    # 헬퍼 메서드
-    def _get_afp_status(self, afp):
-        if not afp:
-            return None
-        afp = float(afp)
-        if afp <= 10:
-            return 'safe'
-        elif afp <= 100:
-            return 'warning'
-        elif afp <= 400:
-            return 'danger'
-        else:
-            return 'critical'
-    
-    def _get_ast_status(self, ast, gender):
-        if not ast:
-            return None
-        ast = float(ast)
-        threshold = 40 if gender == 'male' else 32
-        if ast <= threshold:
-            return 'safe'
-        elif ast <= threshold + 10:
-            return 'warning'
-        else:
-            return 'danger'
-    
-    def _get_alt_status(self, alt, gender):
-        if not alt:
+    def _build_graphs(self, request, patient, fmt='png', as_url=False):
+        """최신 혈액검사 결과로 그래프 + 수치 요약 응답 생성 (결과가 없으면 None)"""
+        # 최신 혈액검사 결과
+        latest_result = DbrBloodResults.objects.filter(
+            patient_id=patient
+        ).order_by('-taken_at').first()
+
+        if not latest_result:
             return None
-        alt = float(alt)
-        threshold = 40 if gender == 'male' else 35
-        if alt <= threshold:
-            return 'safe'
-        elif alt <= threshold + 10:
-            return 'warning'
+
+        # [FIRE] 핵심 지표 / 부가 지표 (값이 없으면 None)
+        graphs = {
+            'primary': dict.fromkeys(PRIMARY_INDICATORS),      # 핵심 지표
+            'secondary': dict.fromkeys(SECONDARY_INDICATORS),  # 부가 지표
+        }
+
+        gender = patient.sex
+
+        # [FIRE] 핵심 + 부가 지표 그래프
+        jobs = result_chart_jobs(latest_result)
+
+        if as_url:
+            # 이미지 URL 만 반환 (렌더링은 이미지 요청 시)
+            for group, indicator, _ in jobs:
+                graphs[group][indicator] = chart_url(request, indicator, latest_result, fmt)
+            images = []
         else:
-            return 'danger'
+            # 값 기반 공유 캐시에서 조립 (없는 그래프만 렌더링)
+            images = get_charts([(indicator, value, gender) for _, indicator, value in jobs], fmt)
+        for (group, indicator, _), image in zip(jobs, images):
+            if image is not None:
+                img_base64 = base64.b64encode(image).decode('utf-8')
+                graphs[group][indicator] = to_data_uri(img_base64, fmt)
+
+        # 📊 수치 요약
+        summary = {
+            'afp': {
+                'value': float(latest_result.afp) if latest_result.afp else None,
+                'status': clinical_rules.status('afp', latest_result.afp, gender),
+                'importance': 'critical'
+            },
+            'ast': {
+                'value': float(latest_result.ast) if latest_result.ast else None,
+                'status': clinical_rules.status('ast', latest_result.ast, gender),
+                'importance': 'high'
+            },
+            'alt': {
+                'value': float(latest_result.alt) if latest_result.alt else None,
+                'status': clinical_rules.status('alt', latest_result.alt, gender),
+                'importance': 'high'
+            },
+            'albi': {
+                'score': float(latest_result.albi) if latest_result.albi else None,
+                'grade': latest_result.albi_grade,
+                'status': latest_result.risk_level,
+                'importance': 'high'
+            }
+        }
+
+        response_data = {
+            "patient_name": patient.name,
+            "test_date": latest_result.taken_at,
+            "gender": gender,
+            "graphs": graphs,
+            "summary": summary,
+            "message": "핵심 간 검사 지표 위주로 표시됩니다."
+        }
+
+        return response_data
 
     # def get(self, request):
     #     try:
@@ -779,16 +930,17 @@ def blood_result_analysis(request, blood_result_id):
             'recommendations': []
         }
         
-        # AFP 분석
-        if result.afp:
+        # AFP 분석 (clinical_rules 규칙 표 기준)
+        afp_level = clinical_rules.status('afp', result.afp)
+        if afp_level:
             afp = float(result.afp)
-            if afp > 400:
+            if afp_level == 'critical':
                 analysis['recommendations'].append({
                     'priority': 'critical',
                     'title': 'AFP 매우 높음',
                     'description': f'AFP {afp} ng/mL - 즉시 병원 방문 필요'
                 })
-            elif afp > 100:
+            elif afp_level == 'danger':
                 analysis['recommendations'].append({
                     'priority': 'high',
                     'title': 'AFP 높음',
@@ -814,8 +966,6 @@ def blood_result_analysis(request, blood_result_id):
         )
 
 from datetime import datetime
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 
 class DashboardTimeSeriesView(APIView):
     """
@@ -823,55 +973,48 @@ class DashboardTimeSeriesView(APIView):
     """
     authentication_classes = [PatientJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    content_negotiation_class = ImageFormatContentNegotiation
 
     def get(self, request):
         try:
-            patient = request.user
-            
-            # 모든 혈액검사 결과
-            blood_results = DbrBloodResults.objects.filter(
-                patient=patient
-            ).order_by('taken_at')
+            # 성별(그래프 기준), 이름이 응답에 들어가므로 토큰 값이 아닌 최신 환자 정보
+            patient = request.user.patient
+            if patient is None:
+                return Response({"error": "환자 정보를 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+            fmt = get_image_format(request)
+            as_url = wants_image_urls(request)
+
+            mode = request.query_params.get('mode')
+            layout = request.query_params.get('layout') or None
+            # layout 값이 캐시 키에 들어가므로 알려진 값만 허용
+            if layout not in (None, 'sheet'):
+                return Response({"error": "layout 은 sheet 만 지원합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+            # 캐시 확인 (혈액검사 결과/환자 정보가 바뀌면 세대 번호가 올라가 자동 무효화)
+            if mode == 'data':
+                # ?mode=data: 그래프 없이 컬럼형 데이터만 (클라이언트에서 직접 그림)
+                # 정상 범위가 혈액검사 기준 테이블에서 오므로 기준 버전도 키에 포함
+                variant = f"data_r{references_version()}"
+                compute = lambda: self._time_series_data(patient)
+            elif layout == 'sheet':
+                # 시트는 한 장의 이미지라 이미지 URL(?images=url) 대상이 아님 → 항상 inline
+                variant = f"sheet_{fmt}"
+                compute = lambda: self._build_time_series(patient, fmt, False, layout)
+            else:
+                variant = f"graphs_{fmt}{'_url' if as_url else ''}"
+                compute = lambda: self._build_time_series(patient, fmt, as_url, layout)
+            response_data = get_or_compute(
+                f"timeseries_{patient.patient_id}_{variant}",
+                compute,
+                timeout=PATIENT_CACHE_TIMEOUT,
+                patient_id=patient.patient_id,
+            )
 
-            if not blood_results.exists():
+            if response_data is None:
                 return Response(
                     {"error": "검사 데이터가 없습니다."},
                     status=status.HTTP_404_NOT_FOUND
                 )
-                
-            actual_count = blood_results.count()
-            print(f"🔍 Total blood results count: {actual_count}")
-            
-            # 최신 검사 결과로 경고 상태 판단
-            latest_result = blood_results.last()
-            warning_status = self._analyze_warning_status(latest_result, patient.sex)
-
-            # 시계열 그래프 생성
-            time_series_graphs = self._generate_time_series_graphs(blood_results, patient.sex)
-
-            first_result = blood_results.first()
-            last_result = blood_results.last()
-            
-            start_date = first_result.taken_at
-            end_date = last_result.taken_at
-            
-            # datetime 객체면 문자열로 변환
-            if isinstance(start_date, datetime):
-                start_date = start_date.strftime('%Y-%m-%d')
-            if isinstance(end_date, datetime):
-                end_date = end_date.strftime('%Y-%m-%d')
-
-            response_data = {
-                "patient_name": patient.name,
-                "start_date": start_date,
-                "end_date": end_date,
-                "total_tests": actual_count, 
-                "time_series_graphs": time_series_graphs,
-                "warning_status": warning_status,
-            }
-            
-            print(f"Response data total_tests: {response_data['total_tests']}")
-            print(f"Warning status: {warning_status}")
 
             return Response(response_data, status=status.HTTP_200_OK)
 
@@ -882,28 +1025,90 @@ class DashboardTimeSeriesView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
-    def _generate_time_series_graphs(self, blood_results, gender='male'):
-        """모든 필드의 시계열 그래프 생성"""
+    def _build_time_series(self, patient, fmt='png', as_url=False, layout=None):
+        """시계열 그래프 응답 생성 (데이터가 없으면 None)"""
+        # 모든 혈액검사 결과 (쿼리 1회로 가져와서 재사용)
+        blood_results = list(DbrBloodResults.objects.filter(
+            patient_id=patient
+        ).order_by('taken_at'))
+
+        if not blood_results:
+            return None
+
+        actual_count = len(blood_results)
+        print(f"🔍 Total blood results count: {actual_count}")
+
+        # 최신 검사 결과로 경고 상태 판단
+        latest_result = blood_results[-1]
+        warning_status = self._analyze_warning_status(latest_result, patient.sex)
+
+        # ?layout=sheet: 모든 지표를 한 장의 이미지 + 패널별 영역으로
+        if layout == 'sheet':
+            time_series_graphs = None
+            time_series_sheet = self._generate_time_series_sheet(blood_results, fmt)
+        else:
+            time_series_graphs = self._generate_time_series_graphs(blood_results, patient.sex, fmt, as_url)
+            time_series_sheet = None
+
+        first_result = blood_results[0]
+        last_result = blood_results[-1]
+
+        start_date = first_result.taken_at
+        end_date = last_result.taken_at
+
+        # datetime 객체면 문자열로 변환
+        if isinstance(start_date, datetime):
+            start_date = start_date.strftime('%Y-%m-%d')
+        if isinstance(end_date, datetime):
+            end_date = end_date.strftime('%Y-%m-%d')
+
+        response_data = {
+            "patient_name": patient.name,
+            "start_date": start_date,
+            "end_date": end_date,
+            "total_tests": actual_count, 
+            "time_series_graphs": time_series_graphs,
+            "warning_status": warning_status,
+        }
+        if time_series_sheet is not None:
+            response_data["time_series_sheet"] = time_series_sheet
+
+        print(f"Response data total_tests: {response_data['total_tests']}")
+        print(f"Warning status: {warning_status}")
+
+        return response_data
+
+    def _time_series_data(self, patient):
+        """렌더링 없이 인덱스 쿼리 1회로 시계열 데이터 생성 (데이터가 없으면 None)"""
+        rows = list(
+            DbrBloodResults.objects.filter(patient_id=patient)
+            .order_by('taken_at')
+            .values_list('taken_at', *TIME_SERIES_FIELDS)
+        )
+        if not rows:
+            return None
+
+        # 최신 검사 결과로 경고 상태 판단 (같은 행 재사용)
+        latest_result = SimpleNamespace(**dict(zip(TIME_SERIES_FIELDS, rows[-1][1:])))
+
+        response_data = {
+            "patient_name": patient.name,
+            "start_date": rows[0][0],
+            "end_date": rows[-1][0],
+            "total_tests": len(rows),
+            **columnar_series(rows),
+            "warning_status": self._analyze_warning_status(latest_result, patient.sex),
+        }
+        return response_data
+
+    def _generate_time_series_graphs(self, blood_results, gender='male', fmt='png', as_url=False):
+        """모든 필드의 시계열 그래프 생성 (as_url=True 이면 이미지 대신 이미지 URL)"""
         graphs = {}
         
-        # 필드 목록 (dashboard_bar.py의 INDICATORS와 동일)
-        fields = [
-            'afp', 'ast', 'alt', 'ggt', 'r_gtp', 'alp',
-            'bilirubin', 'albumin', 'total_protein', 
-            'platelet', 'pt', 'albi'
-        ]
-        
-        for field in fields:
+        for field in TIME_SERIES_FIELDS:
             try:
                 # 데이터 추출
-                dates = []
-                values = []
-                
-                for result in blood_results:
-                    value = getattr(result, field, None)
-                    if value is not None and float(value) != 0:
-                        dates.append(result.taken_at)
-                        values.append(float(value))
+                dates, values = extract_series(blood_results, field)
                 
                 if not dates:
                     graphs[field] = None
@@ -911,15 +1116,22 @@ class DashboardTimeSeriesView(APIView):
                     continue
                 
                 print(f"{field}: {len(dates)} data points")
+
+                if as_url:
+                    graphs[field] = self.request.build_absolute_uri(reverse(
+                        'dashboard-time-series-chart', kwargs={'field': field, 'fmt': fmt}
+                    ))
+                    continue
                 
                 # 그래프 생성
                 img_base64 = self._create_time_series_graph(
                     dates, 
                     values, 
                     field,
-                    gender
+                    gender,
+                    fmt
                 )
-                graphs[field] = f"data:image/png;base64,{img_base64}"
+                graphs[field] = to_data_uri(img_base64, fmt)
                 
             except Exception as e:
                 print(f"Error generating {field} time series: {e}")
@@ -927,239 +1139,160 @@ class DashboardTimeSeriesView(APIView):
         
         return graphs
     
-    def _create_time_series_graph(self, dates, values, field, gender='male'):
-        """시계열 그래프 생성"""
-        from .dashboard_bar import INDICATORS
-        import matplotlib.pyplot as plt
-        import matplotlib.dates as mdates
-        import io
-        import base64
-        
-        # 필드 설정
-        config = INDICATORS.get(field, {
-            'title': field.upper(),
-            'unit': '',
-            'vmin': min(values) * 0.9 if values else 0,
-            'vmax': max(values) * 1.1 if values else 100,
-        })
-        
-        title = config.get('title', field.upper())
-        unit = config.get('unit', '')
-        
-        print(f"Generating graph for {field}:")
-        print(f"  - Dates: {len(dates)}")
-        print(f"  - Values: {len(values)}")
-        
-        # Figure 생성
-        fig, ax = plt.subplots(figsize=(10, 4))
-        
-        # 선 그래프
-        ax.plot(dates, values, marker='o', linewidth=2, markersize=6, color='#3498db')
-        
-        # 정상 범위 표시 (있는 경우)
-        if 'ranges' in config and len(config['ranges']) > 0:
-            normal_range = config['ranges'][0]
-            ax.axhspan(normal_range[0], normal_range[1], alpha=0.2, color='green', label='Normal Range')
-    
-        # 축 설정
-        ax.set_xlabel('Date', fontsize=12)
-        ax.set_ylabel(f'{title} ({unit})', fontsize=12)
-        ax.set_title(f'{title} Trend', fontsize=14, fontweight='bold')
-        ax.grid(True, alpha=0.3, linestyle='--')
-        
-        # 날짜 포맷
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-        fig.autofmt_xdate()
-        
-        # 범례
-        if 'ranges' in config:
-            ax.legend(loc='upper right')
-        
-        # Base64 변환
-        buf = io.BytesIO()
-        plt.tight_layout()
-        plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-        buf.seek(0)
-        img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-        plt.close(fig)
-        
-        print(f"Graph generated: {len(img_base64)} bytes")
-        
-        return img_base64
+    def _generate_time_series_sheet(self, blood_results, fmt='png'):
+        """
+        모든 필드를 하나의 멀티 패널 이미지로 생성
+        panels 의 픽셀 영역으로 클라이언트가 지표별 그래프를 잘라서 표시
+        """
+        series = {}
+        for field in TIME_SERIES_FIELDS:
+            dates, values = extract_series(blood_results, field)
+            if dates:
+                series[field] = (dates, values)
+        if not series:
+            return None
+
+        image, panels = render_time_series_sheet(series, fmt)
+        return {
+            "image": to_data_uri(base64.b64encode(image).decode('utf-8'), fmt),
+            "width": max(p["x"] + p["width"] for p in panels.values()),
+            "height": max(p["y"] + p["height"] for p in panels.values()),
+            # 값이 없는 지표는 null
+            "panels": {field: panels.get(field) for field in TIME_SERIES_FIELDS},
+        }
+
+    def _create_time_series_graph(self, dates, values, field, gender='male', fmt='png'):
+        """시계열 그래프 생성 (base64)"""
+        image = render_time_series(dates, values, field, fmt)
+        return base64.b64encode(image).decode('utf-8')
     
     
     def _analyze_warning_status(self, result, gender='male'):
         """
-        최신 검사 결과로 각 지표의 경고 상태 판단
+        최신 검사 결과로 각 지표의 경고 상태 판단 (clinical_rules 규칙 표)
         """
-        warnings = {}
-        
-        # AFP 분석
-        if result.afp is not None:
-            afp = float(result.afp)
-            if afp >= 400:
-                warnings['afp'] = {
-                    'level': 'critical',
-                    'value': afp,
-                    'message': 'AFP가 매우 높습니다 (400 ng/mL 이상). 즉시 전문의 상담이 필요합니다.'
-                }
-            elif afp >= 100:
-                warnings['afp'] = {
-                    'level': 'danger',
-                    'value': afp,
-                    'message': 'AFP가 높습니다 (100 ng/mL 이상). 간암 의심 - 정밀 검사가 필요합니다.'
-                }
-            elif afp >= 10:
-                warnings['afp'] = {
-                    'level': 'warning',
-                    'value': afp,
-                    'message': 'AFP가 약간 높습니다 (10 ng/mL 이상). 추적 관찰이 필요합니다.'
-                }
-        
-        # AST 분석
-        if result.ast is not None:
-            ast = float(result.ast)
-            threshold = 40 if gender == 'male' else 32
-            if ast >= 50:
-                warnings['ast'] = {
-                    'level': 'danger',
-                    'value': ast,
-                    'message': 'AST가 높습니다 (50 U/L 이상). 간세포 손상이 의심됩니다.'
-                }
-            elif ast >= threshold:
-                warnings['ast'] = {
-                    'level': 'warning',
-                    'value': ast,
-                    'message': f'AST가 경계선입니다 ({threshold} U/L 이상). 주의가 필요합니다.'
-                }
-        
-        # ALT 분석
-        if result.alt is not None:
-            alt = float(result.alt)
-            threshold = 40 if gender == 'male' else 35
-            if alt >= 50:
-                warnings['alt'] = {
-                    'level': 'danger',
-                    'value': alt,
-                    'message': 'ALT가 높습니다 (50 U/L 이상). 간세포 손상이 의심됩니다.'
-                }
-            elif alt >= threshold:
-                warnings['alt'] = {
-                    'level': 'warning',
-                    'value': alt,
-                    'message': f'ALT가 경계선입니다 ({threshold} U/L 이상). 주의가 필요합니다.'
-                }
-        
-        # GGT 분석
-        if result.ggt is not None:
-            ggt = float(result.ggt)
-            threshold = 71 if gender == 'male' else 42
-            if ggt >= 100:
-                warnings['ggt'] = {
-                    'level': 'danger',
-                    'value': ggt,
-                    'message': 'GGT가 높습니다 (100 U/L 이상). 담도 질환 또는 알코올성 간질환 의심.'
-                }
-            elif ggt >= threshold:
-                warnings['ggt'] = {
-                    'level': 'warning',
-                    'value': ggt,
-                    'message': f'GGT가 약간 높습니다 ({threshold} U/L 이상). 음주량 조절이 필요합니다.'
-                }
-        
-        # r-GTP 분석
-        if result.r_gtp is not None:
-            r_gtp = float(result.r_gtp)
-            threshold = 63 if gender == 'male' else 35
-            if r_gtp >= 77:
-                warnings['r_gtp'] = {
-                    'level': 'danger',
-                    'value': r_gtp,
-                    'message': 'r-GTP가 높습니다 (77 U/L 이상). 알코올성 간손상 의심.'
-                }
-            elif r_gtp >= threshold:
-                warnings['r_gtp'] = {
-                    'level': 'warning',
-                    'value': r_gtp,
-                    'message': f'r-GTP가 약간 높습니다 ({threshold} U/L 이상). 음주량 조절이 필요합니다.'
-                }
-        
-        # Bilirubin 분석
-        if result.bilirubin is not None:
-            bilirubin = float(result.bilirubin)
-            if bilirubin >= 2.5:
-                warnings['bilirubin'] = {
-                    'level': 'danger',
-                    'value': bilirubin,
-                    'message': 'Bilirubin이 높습니다 (2.5 mg/dL 이상). 황달 증상 확인 필요.'
-                }
-            elif bilirubin >= 1.2:
-                warnings['bilirubin'] = {
-                    'level': 'warning',
-                    'value': bilirubin,
-                    'message': 'Bilirubin이 약간 높습니다 (1.2 mg/dL 이상). 추적 관찰이 필요합니다.'
-                }
-        
-        # Albumin 분석 (낮을수록 위험)
-        if result.albumin is not None:
-            albumin = float(result.albumin)
-            if albumin < 2.0:
-                warnings['albumin'] = {
-                    'level': 'critical',
-                    'value': albumin,
-                    'message': 'Albumin이 매우 낮습니다 (2.0 g/dL 미만). 즉시 전문의 상담이 필요합니다.'
-                }
-            elif albumin < 2.5:
-                warnings['albumin'] = {
-                    'level': 'danger',
-                    'value': albumin,
-                    'message': 'Albumin이 낮습니다 (2.5 g/dL 미만). 간 기능 저하가 의심됩니다.'
-                }
-            elif albumin < 3.5:
-                warnings['albumin'] = {
-                    'level': 'warning',
-                    'value': albumin,
-                    'message': 'Albumin이 약간 낮습니다 (3.5 g/dL 미만). 영양 상태 개선이 필요합니다.'
-                }
-        
-        # ALP 분석
-        if result.alp is not None:
-            alp = float(result.alp)
-            threshold = 120 if gender == 'male' else 104
-            if alp >= 160:
-                warnings['alp'] = {
-                    'level': 'danger',
-                    'value': alp,
-                    'message': 'ALP가 높습니다 (160 U/L 이상). 담도 질환 의심.'
-                }
-            elif alp >= threshold:
-                warnings['alp'] = {
-                    'level': 'warning',
-                    'value': alp,
-                    'message': f'ALP가 약간 높습니다 ({threshold} U/L 이상). 추적 관찰이 필요합니다.'
-                }
-        
-        # PT 분석
-        if result.pt is not None:
-            pt = float(result.pt)
-            if pt >= 13:
-                warnings['pt'] = {
-                    'level': 'warning',
-                    'value': pt,
-                    'message': 'PT가 연장되었습니다 (13초 이상). 응고 기능 저하 의심.'
-                }
-        
-        # Platelet 분석
-        if result.platelet is not None:
-            platelet = float(result.platelet)
-            if platelet < 150:
-                warnings['platelet'] = {
-                    'level': 'warning',
-                    'value': platelet,
-                    'message': 'Platelet이 낮습니다 (150×10³/μL 미만). 간경화 또는 비장 비대 의심.'
-                }
-        
-        return warnings
+        return warning_status(result, gender)
+
+# ==================== Dashboard Chart Image Views ====================
+class DashboardChartImageView(APIView):
+    """
+    지표 그래프 이미지 (raw bytes)
+    - ?result=<id>: 로그인한 환자의 혈액검사 결과 값 (대시보드 JSON 의 ?images=url 이 돌려주는 URL)
+    - ?value=&gender=: 임의 값 (그래프 눈금 범위 vmin~vmax 로 제한)
+    이미지는 (지표, 값, 성별) 로 결정되어 환자 간에 공유 캐시되지만 값마다 렌더링/캐시 항목이 생기므로
+    인증된 환자만 요청할 수 있고, 임의 값은 범위를 제한해 캐시 키 수를 묶어 둔다.
+    """
+    authentication_classes = [PatientJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="지표 그래프 이미지",
+        tags=["Dashboard"],
+        manual_parameters=[
+            openapi.Parameter('result', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description="혈액검사 결과 ID (로그인한 환자의 결과)"),
+            openapi.Parameter('value', openapi.IN_QUERY, type=openapi.TYPE_NUMBER,
+                              description="result 대신 임의 값 (그래프 범위로 제한)"),
+            openapi.Parameter('gender', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              enum=['male', 'female'], default='male'),
+        ],
+        responses={200: "이미지 (image/png, image/svg+xml)", 304: "Not Modified", 404: "결과/값 없음"},
+        security=[{"Bearer": []}]
+    )
+    def get(self, request, indicator, fmt):
+        if indicator not in INDICATORS or fmt not in IMAGE_MIME_TYPES:
+            return Response({"error": "지원하지 않는 그래프입니다."}, status=status.HTTP_404_NOT_FOUND)
+
+        if 'result' in request.query_params:
+            # 성별은 토큰 claim 이 아닌 현재 환자 정보에서 (발급 후 수정/삭제 반영)
+            if request.user.patient is None:
+                return Response({"error": "환자 정보를 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+            value, gender = self._result_value(request, indicator)
+            if value is None:
+                return Response({"error": "혈액검사 결과 또는 지표 값이 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+            # 결과가 수정되면 같은 URL 의 이미지가 바뀌므로 ETag 로 재검증
+            cache_control = 'private, no-cache'
+        else:
+            gender = request.query_params.get('gender', 'male')
+            try:
+                value = float(to_numeric_value(indicator, request.query_params['value']))
+            except (KeyError, TypeError, ValueError):
+                value = None
+            if value is None or not math.isfinite(value) or gender not in ('male', 'female'):
+                return Response(
+                    {"error": "result 또는 value(숫자)와 gender(male/female)가 필요합니다."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            config = INDICATORS[indicator]
+            value = min(max(value, config['vmin']), config['vmax'])
+            cache_control = 'private, max-age=31536000, immutable'
+
+        value = quantize(indicator, value)
+        etag = chart_etag(indicator, value, gender, fmt)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            image = get_charts([(indicator, value, gender)], fmt)[0]
+            if image is None:
+                return Response({"error": "그래프 생성에 실패했습니다."},
+                                status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            response = HttpResponse(image, content_type=IMAGE_MIME_TYPES[fmt])
+        response['ETag'] = etag
+        response['Cache-Control'] = cache_control
+        return response
+
+    def _result_value(self, request, indicator):
+        """?result=<id> → (지표 값, 성별), 본인 결과가 아니거나 값이 없으면 (None, None)"""
+        try:
+            result_id = int(request.query_params['result'])
+        except (TypeError, ValueError):
+            return None, None
+        value = DbrBloodResults.objects.filter(
+            blood_result_id=result_id, patient_id=request.user.patient_id
+        ).values_list(indicator, flat=True).first()
+        if value is None:
+            return None, None
+        try:
+            value = float(to_numeric_value(indicator, value))
+        except (TypeError, ValueError):
+            return None, None
+        return value, request.user.patient.sex
+
+
+class DashboardTimeSeriesChartView(APIView):
+    """
+    로그인한 환자의 지표별 시계열 그래프 이미지 (raw bytes)
+    ETag 는 그래프 입력 데이터로 계산하므로 변경이 없으면 렌더링 없이 304
+    """
+    authentication_classes = [PatientJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="시계열 그래프 이미지",
+        tags=["Dashboard"],
+        responses={200: "이미지 (image/png, image/svg+xml)", 304: "Not Modified", 404: "데이터 없음"},
+        security=[{"Bearer": []}]
+    )
+    def get(self, request, field, fmt):
+        if field not in TIME_SERIES_FIELDS or fmt not in IMAGE_MIME_TYPES:
+            return Response({"error": "지원하지 않는 그래프입니다."}, status=status.HTTP_404_NOT_FOUND)
+
+        rows = DbrBloodResults.objects.filter(
+            patient_id=request.user.patient_id
+        ).order_by('taken_at').values_list('taken_at', field)
+        dates, values = extract_series(rows, field)
+        if not dates:
+            return Response({"error": "검사 데이터가 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+
+        etag = series_etag(dates, values, field, fmt)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            image = render_time_series(dates, values, field, fmt)
+            response = HttpResponse(image, content_type=IMAGE_MIME_TYPES[fmt])
+        response['ETag'] = etag
+        # 환자별 데이터: 공유 캐시 금지, 매번 ETag 로 재검증
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
 
 # ==================== 약물 관련 Views ====================
 # ✍️ (제거) 기존 MedicationListView, MedicationDetailView 삭제
@@ -1243,19 +1376,26 @@ class MedicationViewSet(viewsets.ModelViewSet):
         로그인한 사용자(request.user) 본인의 약물 기록만 조회합니다.
         """
         # ✍️ (수정) patient_id가 request.user와 일치하는 것만 필터링
-        return self.queryset.filter(patient_id=self.request.user)
+        return self.queryset.filter(patient_id=self.request.user.patient_id)
 
     def perform_create(self, serializer):
         """
         새 약물 생성 시, patient_id를 로그인한 사용자로 강제 설정합니다.
         """
-        serializer.save(patient_id=self.request.user)
+        serializer.save(patient_id=self._get_patient())
     
     def perform_update(self, serializer):
         """
         약물 수정 시, patient_id를 로그인한 사용자로 강제 설정합니다.
         """
-        serializer.save(patient_id=self.request.user)
+        serializer.save(patient_id=self._get_patient())
+
+    def _get_patient(self):
+        # 인증은 토큰 정보만 보므로 삭제된 환자의 토큰도 만료 전까지는 통과 → 저장 전에 확인
+        patient = self.request.user.patient
+        if patient is None:
+            raise NotFound("환자 정보를 찾을 수 없습니다.")
+        return patient
 
 
 # ( ... 기존 PatientMedicationsView 유지 ... )
@@ -137,6 +137,52 @@ DATABASES = {
 }
 
 
+# Cache
+# default: REDIS_URL 이 있으면 워커 간 공유 Redis, 없으면 프로세스 로컬 메모리 (개발용)
+#   환자 세대 번호 / 기준 버전 / 환자 정보 버전 / 토큰 폐기 목록이 default 캐시에 있으므로
+#   다른 프로세스(gunicorn 워커, render_dashboard_charts, import_blood_results, recompute_albi)의
+#   변경을 보려면 공유 캐시가 필요 → DEBUG 가 아니면 REDIS_URL 필수
+#   로컬 메모리일 때(SHARED_CACHE=False)는 각 모듈이 짧은 TTL 을 써서 오래된 값이 남는 시간을 제한
+# charts: 환자와 무관한 지표 그래프 이미지 (값 기반 키라 내용이 바뀌지 않음, 워커 간 공유)
+SHARED_CACHE = bool(os.getenv("REDIS_URL"))
+if SHARED_CACHE:
+    _default_cache = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("REDIS_URL"),
+    }
+elif not DEBUG:
+    raise ImproperlyConfigured("DEBUG=False 에서는 REDIS_URL(공유 캐시)을 설정해야 합니다.")
+else:
+    _default_cache = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        # 기본값(300)이면 가득 찰 때 임의 항목(토큰 폐기 등)이 지워지므로 넉넉하게
+        "OPTIONS": {"MAX_ENTRIES": 100000},
+    }
+
+# charts: Redis 가 있으면 같은 Redis (키 prefix 로 구분, 오래 안 쓴 이미지는 만료)
+#   없으면 파일 캐시 — set() 마다 디렉터리 전체를 세어 정리(cull)하므로 항목 수를 작게 유지
+#   (항목 수에 비례, 5,000개일 때 set 한 번에 약 8ms)
+if SHARED_CACHE:
+    _chart_cache = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("REDIS_URL"),
+        "KEY_PREFIX": "charts",
+        "TIMEOUT": 60 * 60 * 24 * 30,
+    }
+else:
+    _chart_cache = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("CHART_CACHE_DIR", str(BASE_DIR / ".cache" / "charts")),
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": 2000},
+    }
+
+CACHES = {
+    "default": _default_cache,
+    "charts": _chart_cache,
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "reactproject.settings")
 
 application = get_wsgi_application()
+
+# 대시보드 위험도 바의 정적 배경을 워커 시작 시 미리 렌더링
+from dashboard.dashboard_bar import warm_backgrounds
+warm_backgrounds()
+
+# 그래프 렌더링 프로세스 풀도 미리 기동
+from dashboard.render_pool import warm_pool
+warm_pool()